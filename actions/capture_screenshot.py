@@ -0,0 +1,206 @@
+import base64
+import inspect
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from actions.page_helpers import is_chromium
+from utils.artifact_store import put_artifact
+from utils.config import ARTIFACT_DIRECTORY, DEBUG_SCREENSHOT_QUALITY, DEBUG_SCREENSHOTS, SCREENSHOT_WORKERS
+from utils.error import messageError
+from utils.logging_config import get_request_id
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_FORMATS = {'png': 'png', 'jpeg': 'jpg', 'webp': 'webp'}
+
+# Rectángulo del elemento en coordenadas del documento (CSS px)
+_ELEMENT_RECT_SCRIPT = """
+const rect = arguments[0].getBoundingClientRect();
+return {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height};
+"""
+
+_executor = None
+_lock = threading.Lock()
+_stats = {'captured': 0, 'pending': 0, 'failed': 0, 'capture_time': 0.0}
+
+
+def capture_screenshot(driver, format='png', quality=None, clip=None, element=None, full_page=False,
+                       directory="logs", name=None):
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Format: {format}")
+    """
+    Toma una captura en memoria y la guarda en segundo plano en el almacén de artefactos
+
+    En el hilo de la petición solo se piden los bytes al navegador (en Chrome con CDP
+    Page.captureScreenshot, que ya codifica en JPEG/WebP y recorta). La decodificación, la
+    conversión y la escritura en disco se hacen en un pool de hilos (SCREENSHOT_WORKERS).
+
+    Args:
+        driver: WebDriver de Selenium
+        format: 'png', 'jpeg' o 'webp' (default: 'png')
+        quality: Calidad 0-100 para jpeg/webp (opcional)
+        clip: Rectángulo {'x', 'y', 'width', 'height'} en CSS px del documento (opcional)
+        element: WebElement a capturar (usa su rectángulo como clip)
+        full_page: Capturar la página completa, no solo el viewport (default: False)
+        directory: Directorio base del almacén (default: "logs")
+        name: Nombre descriptivo para el índice de la petición (opcional)
+
+    Returns:
+        Future: Se resuelve con el artefacto guardado ({'sha256', 'path', ...})
+
+    Raises:
+        messageError: Si las opciones no son válidas o el navegador no devuelve la captura
+    """
+    try:
+        if format not in _FORMATS:
+            raise ValueError(f"Formato no soportado: {format}. Opciones: {', '.join(_FORMATS)}")
+        if quality is not None and not 0 <= quality <= 100:
+            raise ValueError("quality debe estar entre 0 y 100")
+
+        start = time.monotonic()
+        if element is not None:
+            clip = driver.execute_script(_ELEMENT_RECT_SCRIPT, element)
+
+        if is_chromium(driver):
+            # CDP devuelve la imagen ya codificada y recortada
+            payload = _capture_cdp(driver, format, quality, clip, full_page)
+            encoded_format, pending_clip = format, None
+        else:
+            # WebDriver solo devuelve PNG: el recorte y la conversión se hacen en el pool
+            payload = _capture_webdriver(driver, element, full_page)
+            encoded_format = 'png'
+            pending_clip = None if element is not None else _to_image_clip(driver, clip, full_page)
+
+        with _lock:
+            _stats['captured'] += 1
+            _stats['pending'] += 1
+            _stats['capture_time'] += time.monotonic() - start
+
+        # El contexto de la petición no pasa a los hilos del pool
+        request_id = get_request_id()
+        root = os.path.join(directory, ARTIFACT_DIRECTORY)
+        return _get_executor().submit(_store, payload, encoded_format, format, quality, pending_clip,
+                                      root, name, request_id)
+
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def capture_step(driver, step, directory="logs"):
+    """
+    Captura de depuración tras un paso (solo con DEBUG_SCREENSHOTS). Un fallo de la captura
+    nunca interrumpe la acción.
+
+    Args:
+        driver: WebDriver de Selenium
+        step: Nombre del paso ('click', 'write', 'get_driver'...) para el índice de la petición
+        directory: Directorio base del almacén (default: "logs")
+
+    Returns:
+        Future | None: Future de capture_screenshot, o None si está deshabilitado o falló
+    """
+    if not DEBUG_SCREENSHOTS:
+        return None
+    try:
+        return capture_screenshot(driver, format='jpeg', quality=DEBUG_SCREENSHOT_QUALITY,
+                                  directory=directory, name=step)
+    except Exception as e:
+        logging.debug(f"Debug screenshot failed: {e}")
+        return None
+
+
+def get_screenshot_stats():
+    """
+    Devuelve los contadores de capture_screenshot en este proceso
+
+    Returns:
+        dict: {'captured', 'pending', 'failed', 'capture_time'} (capture_time: segundos en el hilo de la petición)
+    """
+    with _lock:
+        return dict(_stats)
+
+
+def _capture_cdp(driver, format, quality, clip, full_page):
+    params = {'format': format, 'fromSurface': True, 'captureBeyondViewport': bool(full_page or clip)}
+    if quality is not None and format != 'png':
+        params['quality'] = int(quality)
+    if full_page and clip is None:
+        metrics = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
+        size = metrics.get('cssContentSize') or metrics['contentSize']
+        clip = {'x': 0, 'y': 0, 'width': size['width'], 'height': size['height']}
+    if clip is not None:
+        params['clip'] = {'x': clip['x'], 'y': clip['y'], 'width': clip['width'],
+                          'height': clip['height'], 'scale': clip.get('scale', 1)}
+    # Base64: se decodifica en el pool
+    return driver.execute_cdp_cmd('Page.captureScreenshot', params)['data']
+
+
+def _capture_webdriver(driver, element, full_page):
+    if element is not None:
+        return element.screenshot_as_base64
+    if full_page and hasattr(driver, 'get_full_page_screenshot_as_base64'):
+        # Firefox
+        return driver.get_full_page_screenshot_as_base64()
+    return driver.get_screenshot_as_base64()
+
+
+def _to_image_clip(driver, clip, full_page):
+    # Del documento (CSS px) a píxeles de la imagen capturada (viewport o página completa)
+    if clip is None:
+        return None
+    scroll_x, scroll_y, ratio = driver.execute_script(
+        "return [window.scrollX, window.scrollY, window.devicePixelRatio || 1];")
+    offset_x, offset_y = (0, 0) if full_page else (scroll_x, scroll_y)
+    return {'x': (clip['x'] - offset_x) * ratio, 'y': (clip['y'] - offset_y) * ratio,
+            'width': clip['width'] * ratio, 'height': clip['height'] * ratio}
+
+
+def _store(payload, encoded_format, format, quality, clip, root, name, request_id):
+    try:
+        data = base64.b64decode(payload)
+        ext = _FORMATS[encoded_format]
+        if encoded_format != format or clip is not None:
+            data, ext = _convert(data, ext, format, quality, clip)
+        # Ya está en el formato pedido: el almacén no lo vuelve a convertir
+        return put_artifact(data, root, kind='screenshot', name=name, ext=ext, request_id=request_id,
+                            image_format='original')
+    except Exception as e:
+        with _lock:
+            _stats['failed'] += 1
+        logging.error(f"Error saving screenshot: {e}")
+        raise
+    finally:
+        with _lock:
+            _stats['pending'] -= 1
+
+
+def _convert(data, ext, format, quality, clip):
+    # Navegadores sin CDP: el recorte y el formato se aplican con Pillow, si está instalado
+    if Image is None:
+        logging.warning("Pillow no está instalado: la captura se guarda como PNG sin recortar")
+        return data, ext
+    with Image.open(io.BytesIO(data)) as image:
+        if clip is not None:
+            image = image.crop((int(clip['x']), int(clip['y']),
+                                int(clip['x'] + clip['width']), int(clip['y'] + clip['height'])))
+        if format == 'jpeg':
+            image = image.convert('RGB')
+        output = io.BytesIO()
+        options = {'quality': quality} if quality is not None and format != 'png' else {}
+        image.save(output, format=format.upper(), **options)
+    return output.getvalue(), _FORMATS[format]
+
+
+def _get_executor():
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SCREENSHOT_WORKERS, thread_name_prefix='screenshot')
+        return _executor
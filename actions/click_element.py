@@ -1,26 +1,90 @@
 import inspect
 import logging
-from time import sleep
+import threading
+import time
+from actions.capture_screenshot import capture_step
+from actions.page_helpers import call_helper, make_element_interactable
+from actions.settle import arm_effect, wait_for_activity, wait_for_effect, wait_for_element_stable, wait_for_scroll_end
+from utils.config import SETTLE_BUDGET, STRATEGY_MEMORY
 from utils.error import messageError
+from utils.retry import RetryPolicy
+from utils.strategy_memory import order_methods, record_outcome, strategy_key
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import (
-    ElementNotInteractableException,
-    ElementClickInterceptedException,
-    StaleElementReferenceException
-)
+from selenium.common.exceptions import StaleElementReferenceException
+
+# Número de clicks resueltos por cada estrategia del modo rápido
+_fast_click_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _click_basic(driver, element):
+    # Método básico (original): scroll simple, move_to_element y click
+    driver.execute_script("arguments[0].scrollIntoView(true);", element)
+    actions = ActionChains(driver)
+    actions.move_to_element(element).perform()
+    element.click()
+
+
+def _click_actions(driver, element):
+    # Click con ActionChains mejorado
+    actions = ActionChains(driver)
+    actions.move_to_element(element).click().perform()
+
+
+def _click_direct(driver, element):
+    element.click()
+
+
+def _click_javascript(driver, element):
+    driver.execute_script("arguments[0].click();", element)
+
+
+def _click_focus_enter(driver, element):
+    driver.execute_script("arguments[0].focus();", element)
+    element.send_keys(Keys.ENTER)
+
+
+def _click_actions_pause(driver, element):
+    # ActionChains avanzado con pausa
+    actions = ActionChains(driver)
+    actions.move_to_element(element).pause(0.1).click().perform()
+
+
+# Escalera de métodos en su orden por defecto. Los avanzados requieren preparar el elemento antes
+_CLICK_METHODS = {
+    'basic': _click_basic,
+    'actions': _click_actions,
+    'direct': _click_direct,
+    'javascript': _click_javascript,
+    'focus_enter': _click_focus_enter,
+    'actions_pause': _click_actions_pause
+}
 
 
 # This function searches for an element on the page, scrolls to it, and click to it with multiple fallback strategies.
-def click_element(driver, element, max_attempts=3):
+def click_element(driver, element, max_attempts=3, fast=False, locator=None, settle_budget=SETTLE_BUDGET,
+                  await_effect=None, effect_region=None, effect_timeout=None, retry_policy=None):
     logging.info(f"START || {inspect.currentframe().f_code.co_name} - Element: {element}")
     """
     Realiza un click seguro en un elemento, intentando diferentes métodos con robustez mejorada
 
+    El orden de los métodos se adapta al sitio: se empieza por el que más éxito ha tenido
+    para el dominio y el locator (ver utils/strategy_memory.py).
+
     Args:
         driver: WebDriver de Selenium
         element: Elemento a hacer click
         max_attempts: Número máximo de intentos (default: 3)
+        fast: Ejecutar la escalera dentro de la página en una sola llamada y usar el click
+            nativo solo si la página necesita eventos de confianza (default: False)
+        locator: Locator (By, valor) del elemento, para recordar el método por elemento (opcional)
+        settle_budget: Segundos máximos de cada espera a que el elemento se asiente (default: SETTLE_BUDGET)
+        await_effect: Esperar al efecto del click antes de volver: 'navigation', 'network',
+            'mutation' o 'any' (default: None, vuelve justo después del click)
+        effect_region: Elemento o selector CSS donde vigilar mutaciones (default: todo el documento)
+        effect_timeout: Segundos máximos de espera del efecto (default: timeout aprendido del dominio)
+        retry_policy: RetryPolicy para los reintentos (default: backoff de utils/retry.py con max_attempts)
 
     Returns:
         driver: WebDriver actualizado
@@ -30,34 +94,22 @@ def click_element(driver, element, max_attempts=3):
     """
     try:
 
-        # PASO 1: Intentar método básico primero (click simple)
-        try:
-
-            # Verificar que el elemento esté disponible
-            element.is_displayed()
+        # Se arma antes del click para no perder peticiones o mutaciones inmediatas
+        effect = arm_effect(driver, await_effect, effect_region) if await_effect else None
 
-            # Scroll básico al elemento
-            driver.execute_script(
-                "arguments[0].scrollIntoView(true);", element)
+        if fast and _fast_click(driver, element, effect, settle_budget):
+            return _await_effect(driver, effect, effect_timeout)
 
-            # ActionChains básico con move_to_element (método original)
-            actions = ActionChains(driver)
-            actions.move_to_element(element).perform()
-            element.click()
-
-            return driver
-
-        except (ElementNotInteractableException, ElementClickInterceptedException, StaleElementReferenceException) as e:
-            logging.debug(
-                f"⚠️ Método básico falló: {e}, pasando a métodos avanzados")
-        except Exception as e:
-            logging.debug(
-                f"⚠️ Error inesperado en método básico: {e}, pasando a métodos avanzados")
+        memory_key = strategy_key('click', driver.current_url, locator) if STRATEGY_MEMORY else None
+        methods = order_methods(memory_key, list(_CLICK_METHODS))
 
-        for attempt in range(max_attempts):
+        policy = retry_policy or RetryPolicy(max_attempts=max_attempts)
+        for attempt in range(policy.max_attempts):
+            last_error = None
             try:
-                logging.info(
-                    f"🔄 Intento avanzado {attempt + 1}/{max_attempts}")
+                if attempt > 0:
+                    logging.info(
+                        f"🔄 Intento avanzado {attempt + 1}/{policy.max_attempts}")
 
                 # Verificar que el elemento sigue siendo válido
                 try:
@@ -67,78 +119,48 @@ def click_element(driver, element, max_attempts=3):
                         "Elemento obsoleto detectado, saltando intento")
                     continue
 
-                # Scroll al elemento con JavaScript más robusto
-                try:
-                    driver.execute_script("""
-                        arguments[0].scrollIntoView({
-                            behavior: 'smooth', 
-                            block: 'center',
-                            inline: 'center'
-                        });
-                    """, element)
-                    sleep(0.5)
-                except Exception as e:
-                    logging.warning(f"Error en scroll avanzado: {e}")
-
-                # Habilitar elemento usando make_element_interactable
-                make_element_interactable(driver, element)
-                sleep(0.2)
-
-                # Método 1: Click con ActionChains mejorado
-                try:
-                    actions = ActionChains(driver)
-                    actions.move_to_element(element).click().perform()
-                    return driver
-                except (ElementNotInteractableException, ElementClickInterceptedException) as e:
-                    logging.debug(f"ActionChains avanzado falló: {e}")
-
-                # Método 2: Click directo
-                try:
-                    element.click()
-                    return driver
-                except (ElementNotInteractableException, ElementClickInterceptedException) as e:
-                    logging.debug(f"Click directo avanzado falló: {e}")
-
-                # Método 3: Click con JavaScript
-                try:
-                    driver.execute_script("arguments[0].click();", element)
-                    return driver
-                except Exception as e:
-                    logging.debug(f"Click con JavaScript falló: {e}")
-
-                # Método 4: Focus y Enter
-                try:
-                    driver.execute_script("arguments[0].focus();", element)
-                    element.send_keys(Keys.ENTER)
-                    return driver
-                except Exception as e:
-                    logging.debug(f"Focus y Enter falló: {e}")
-
-                # Método 5: ActionChains avanzado con pausa
-                try:
-                    actions = ActionChains(driver)
-                    actions.move_to_element(element).pause(
-                        0.1).click().perform()
-                    return driver
-                except Exception as e:
-                    logging.debug(f"ActionChains con pausa falló: {e}")
+                prepared = False
+                for name in methods:
+                    # El método básico solo se intenta en la primera vuelta
+                    if name == 'basic' and attempt > 0:
+                        continue
+                    if name != 'basic' and not prepared:
+                        _prepare_element(driver, element, settle_budget)
+                        prepared = True
+                    try:
+                        _CLICK_METHODS[name](driver, element)
+                        if name != 'basic':
+                            logging.info(f"✅ Click con método '{name}'")
+                        record_outcome(memory_key, name, True)
+                        return _await_effect(driver, effect, effect_timeout)
+                    except StaleElementReferenceException:
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        logging.debug(f"Método de click '{name}' falló: {e}")
+                        record_outcome(memory_key, name, False)
 
                 # Si llegamos aquí, todos los métodos fallaron en este intento
                 logging.warning(
                     f"⚠️ Todos los métodos avanzados fallaron en intento {attempt + 1}")
 
-                if attempt < max_attempts - 1:  # Si no es el último intento
-                    sleep(1)  # Esperar antes del siguiente intento
+                if not policy.should_retry(last_error, attempt):
+                    break
+                # Esperar a que el elemento se asiente y completar el backoff de la política
+                _backoff(driver, element, policy, attempt, last_error)
 
-            except StaleElementReferenceException:
+            except StaleElementReferenceException as e:
                 logging.warning(
                     "Elemento obsoleto durante click avanzado, continuando...")
+                if not policy.should_retry(e, attempt):
+                    break
                 continue
             except Exception as e:
                 logging.warning(
                     f"Error inesperado en intento avanzado {attempt + 1}: {e}")
-                if attempt < max_attempts - 1:
-                    sleep(1)
+                if not policy.should_retry(e, attempt):
+                    break
+                _backoff(driver, element, policy, attempt, e)
                 continue
 
         # Si llegamos aquí, todos los intentos fallaron
@@ -151,87 +173,91 @@ def click_element(driver, element, max_attempts=3):
             f"Error {inspect.currentframe().f_code.co_name}: {e}")
 
 
-def make_element_interactable(driver, element):
+def _await_effect(driver, effect, timeout):
+    # Sin efecto armado no se espera. En modo depuración se captura la pantalla tras el click
+    if effect is not None:
+        wait_for_effect(driver, effect, timeout)
+    capture_step(driver, 'click')
+    return driver
+
+
+def _backoff(driver, element, policy, attempt, error):
+    # La espera de estabilidad vuelve en cuanto el elemento está quieto: se duerme el resto del backoff
+    delay = policy.delay(attempt, error)
+    if delay:
+        start = time.monotonic()
+        wait_for_element_stable(driver, element, delay, replaces=1, action='click')
+        remaining = delay - (time.monotonic() - start)
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+def _prepare_element(driver, element, settle_budget=SETTLE_BUDGET):
+    # Scroll al elemento con JavaScript más robusto
+    try:
+        call_helper(driver, 'scrollIntoView', element, 'smooth')
+        wait_for_scroll_end(driver, element, settle_budget, replaces=0.5, action='click')
+    except Exception as e:
+        logging.warning(f"Error en scroll avanzado: {e}")
+
+    # Habilitar elemento usando make_element_interactable
+    make_element_interactable(driver, element)
+    wait_for_element_stable(driver, element, settle_budget, replaces=0.2, action='click')
+
+
+def _fast_click(driver, element, effect=None, settle_budget=SETTLE_BUDGET):
     """
-    Intenta hacer un elemento interactuable removiendo restricciones comunes
+    Intenta el click con __sq.fastClick (ver page_helpers.py) y, si hace falta, con un click nativo.
+
+    El click nativo solo se usa si el elemento necesita eventos de confianza (select, input file) o si
+    la página no muestra ninguna actividad en settle_budget: ni peticiones, ni cambios del DOM, ni de
+    URL (ignora los eventos sintéticos, p. ej. comprueba isTrusted). Cualquier actividad cuenta como
+    click atendido sin esperar a que se asiente, para no repetir envíos.
 
     Args:
-        driver: WebDriver de Selenium
-        element: Elemento web a hacer interactuable
+        effect: Efecto ya armado por click_element (se reutiliza: solo puede haber uno armado)
 
     Returns:
-        bool: True si el elemento fue habilitado exitosamente
+        bool: True si el click se realizó; False para continuar con la escalera normal
     """
     try:
+        probe = effect or arm_effect(driver, 'any')
+        result = call_helper(driver, 'fastClick', element)
+    except Exception as e:
+        logging.debug(f"Click rápido falló: {e}")
+        return False
 
-        # Script para habilitar elemento
-        result = driver.execute_script("""
-            var element = arguments[0];
-            
-            try {
-                // Quitar atributos restrictivos
-                element.removeAttribute('disabled');
-                element.removeAttribute('readonly');
-                element.disabled = false;
-                element.readOnly = false;
-                
-                // Quitar clases que pueden bloquear interacción
-                var restrictiveClasses = [
-                    'disabled', 'readonly', 'not-allowed', 'pointer-events-none',
-                    'dp__input_readonly', 'dp__pointer', 'dp__disabled'
-                ];
-                
-                restrictiveClasses.forEach(function(className) {
-                    element.classList.remove(className);
-                });
-                
-                // Habilitar estilos
-                element.style.pointerEvents = 'auto';
-                element.style.cursor = 'auto';
-                element.style.opacity = '1';
-                element.style.visibility = 'visible';
-                element.style.display = 'block';
-                
-                // Si es un input, asegurar que sea de tipo text
-                if (element.tagName.toLowerCase() === 'input') {
-                    if (element.getAttribute('inputmode') === 'none') {
-                        element.setAttribute('inputmode', 'text');
-                    }
-                    if (!element.type || element.type === 'hidden') {
-                        element.setAttribute('type', 'text');
-                    }
-                }
-                
-                // Habilitar contenedores padre que puedan estar bloqueando
-                var parent = element.parentElement;
-                var levels = 0;
-                while (parent && levels < 5) {
-                    parent.removeAttribute('disabled');
-                    parent.disabled = false;
-                    parent.style.pointerEvents = 'auto';
-                    
-                    restrictiveClasses.forEach(function(className) {
-                        parent.classList.remove(className);
-                    });
-                    
-                    parent = parent.parentElement;
-                    levels++;
-                }
-                
-                return true;
-                
-            } catch (error) {
-                console.error('Error habilitando elemento:', error);
-                return false;
-            }
-        """, element)
-
-        if result:
-            return True
-        else:
-            logging.warning("No se pudo habilitar el elemento")
+    if result.get('ok') and not result.get('handled'):
+        # Cualquier actividad (no solo el efecto que espera el llamador) confirma que el click se atendió
+        if wait_for_activity(driver, probe, settle_budget) == 'timeout':
+            logging.info("La página no reaccionó a los eventos sintéticos: click nativo")
+            result = dict(result, ok=False)
+
+    if result.get('ok'):
+        strategy = result['strategy']
+    else:
+        # Eventos sintéticos no válidos para este elemento: click nativo (evento de confianza)
+        try:
+            ActionChains(driver).move_to_element(element).click().perform()
+            strategy = 'native'
+        except Exception as e:
+            logging.debug(f"Click nativo en modo rápido falló: {e}")
             return False
 
-    except Exception as e:
-        logging.error(f"Error en make_element_interactable: {e}")
-        return False
+    if result.get('occluder'):
+        logging.info(f"Elemento tapado por {result['occluder']}")
+    logging.info(f"✅ Click rápido con estrategia '{strategy}'")
+    with _stats_lock:
+        _fast_click_stats[strategy] = _fast_click_stats.get(strategy, 0) + 1
+    return True
+
+
+def get_fast_click_stats():
+    """
+    Devuelve cuántos clicks en modo rápido resolvió cada estrategia
+
+    Returns:
+        dict: {estrategia: número de clicks}
+    """
+    with _stats_lock:
+        return dict(_fast_click_stats)
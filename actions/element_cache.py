@@ -0,0 +1,144 @@
+import logging
+import threading
+import uuid
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+
+# Caché de WebElements por driver (session_id). Cada entrada pertenece a una navegación:
+# cuando cambia la URL o el documento (recarga, get) se incrementa nav_id y se vacía.
+_caches = {}
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'evictions': 0,
+    'invalidations': 0
+}
+_lock = threading.Lock()
+
+# Marca el documento actual con un token para detectar recargas y navegaciones a la misma URL
+_MARK_SCRIPT = """
+    if (!window.__sqNav) window.__sqNav = arguments[0];
+    return [location.href, window.__sqNav];
+"""
+
+# Validación barata de una entrada: una sola llamada (lanza StaleElementReferenceException si procede)
+_VALIDATE_SCRIPT = """
+    return [location.href, window.__sqNav || null, arguments[0].isConnected];
+"""
+
+
+def _get_cache(driver):
+    key = getattr(driver, 'session_id', None) or id(driver)
+    cache = _caches.get(key)
+    if cache is None:
+        cache = {'nav_id': 0, 'url': None, 'token': None, 'elements': {}}
+        _caches[key] = cache
+    return cache
+
+
+def get_cached_element(driver, locator):
+    """
+    Devuelve el elemento cacheado para el locator si sigue siendo válido en la navegación actual
+
+    Args:
+        driver: WebDriver de Selenium
+        locator: Tupla (By, valor)
+
+    Returns:
+        WebElement | None: Elemento cacheado o None si no hay entrada válida
+    """
+    with _lock:
+        cache = _get_cache(driver)
+        element = cache['elements'].get(tuple(locator))
+        if element is None:
+            _stats['misses'] += 1
+            return None
+
+    try:
+        url, token, connected = driver.execute_script(_VALIDATE_SCRIPT, element)
+    except (StaleElementReferenceException, WebDriverException):
+        connected, url, token = False, cache['url'], cache['token']
+
+    with _lock:
+        if url != cache['url'] or token != cache['token']:
+            _invalidate(cache, f"navegación detectada ({url})")
+            _stats['misses'] += 1
+            return None
+        if not connected:
+            cache['elements'].pop(tuple(locator), None)
+            _stats['evictions'] += 1
+            _stats['misses'] += 1
+            return None
+        _stats['hits'] += 1
+
+    logging.debug(f"Element cache hit: {locator}")
+    return element
+
+
+def cache_element(driver, locator, element):
+    """
+    Guarda un elemento en la caché asociado a la navegación actual
+
+    Args:
+        driver: WebDriver de Selenium
+        locator: Tupla (By, valor)
+        element: WebElement encontrado
+    """
+    try:
+        url, token = driver.execute_script(_MARK_SCRIPT, uuid.uuid4().hex)
+    except WebDriverException as e:
+        logging.debug(f"No se pudo cachear el elemento {locator}: {e}")
+        return
+
+    with _lock:
+        cache = _get_cache(driver)
+        if url != cache['url'] or token != cache['token']:
+            if cache['url'] is not None:
+                _invalidate(cache, f"navegación detectada ({url})")
+            cache['url'] = url
+            cache['token'] = token
+        cache['elements'][tuple(locator)] = element
+
+
+def invalidate_element_cache(driver):
+    """
+    Incrementa el nav_id del driver y descarta todos sus elementos (llamar tras get o recarga)
+
+    Args:
+        driver: WebDriver de Selenium
+    """
+    with _lock:
+        _invalidate(_get_cache(driver), "invalidación explícita")
+
+
+def discard_element_cache(driver):
+    """
+    Elimina la caché del driver (llamar al cerrar el driver)
+
+    Args:
+        driver: WebDriver de Selenium
+    """
+    with _lock:
+        _caches.pop(getattr(driver, 'session_id', None) or id(driver), None)
+
+
+def get_element_cache_stats():
+    """
+    Devuelve una copia de las estadísticas de la caché de elementos
+
+    Returns:
+        dict: hits, misses, evictions e invalidations
+    """
+    with _lock:
+        return dict(_stats)
+
+
+def _invalidate(cache, reason):
+    # Debe llamarse con _lock adquirido
+    cache['nav_id'] += 1
+    cache['url'] = None
+    cache['token'] = None
+    if cache['elements']:
+        logging.debug(
+            f"Element cache invalidada ({reason}), nav_id={cache['nav_id']}")
+    cache['elements'] = {}
+    _stats['invalidations'] += 1
@@ -0,0 +1,158 @@
+import inspect
+import logging
+import re
+from utils.error import messageError
+from selenium.webdriver.common.by import By
+
+# Script que recorre los elementos dentro de la página y devuelve solo datos planos.
+# arguments: selector, es_xpath, campos [[nombre, subselector, atributo]], offset, limit, max_len
+_EXTRACT_SCRIPT = """
+    var selector = arguments[0], isXpath = arguments[1], fields = arguments[2];
+    var offset = arguments[3], limit = arguments[4], maxLen = arguments[5];
+
+    var nodes = [];
+    if (isXpath) {
+        var snapshot = document.evaluate(selector, document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            nodes.push(snapshot.snapshotItem(i));
+        }
+    } else {
+        nodes = Array.prototype.slice.call(document.querySelectorAll(selector));
+    }
+
+    function clip(value) {
+        if (value === null || value === undefined) return null;
+        value = String(value);
+        return (maxLen && value.length > maxLen) ? value.slice(0, maxLen) : value;
+    }
+
+    var end = limit ? Math.min(nodes.length, offset + limit) : nodes.length;
+    var rows = [];
+    for (var n = offset; n < end; n++) {
+        var row = {};
+        for (var f = 0; f < fields.length; f++) {
+            var name = fields[f][0], sub = fields[f][1], attr = fields[f][2];
+            var target = sub ? nodes[n].querySelector(sub) : nodes[n];
+            if (!target) {
+                row[name] = null;
+            } else if (attr) {
+                row[name] = clip(target.getAttribute(attr));
+            } else {
+                row[name] = clip(target.textContent.replace(/\\s+/g, ' ').trim());
+            }
+        }
+        rows.push(row);
+    }
+    return {total: nodes.length, rows: rows};
+"""
+
+
+def extract(driver, selector, fields, limit=None, offset=0, chunk_size=None, max_value_length=None):
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Selector: {selector}")
+    """
+    Extrae en una sola llamada los datos de todos los elementos que coinciden con el selector
+
+    Args:
+        driver: WebDriver de Selenium
+        selector: Selector CSS (str) o locator (By.CSS_SELECTOR | By.XPATH, valor)
+        fields: Diccionario {nombre: especificación}. Especificaciones admitidas:
+            - 'text': texto del elemento
+            - '@href': atributo del elemento
+            - '.price': texto del primer subelemento que coincide con el selector CSS
+            - 'a@href': atributo del primer subelemento
+        limit: Número máximo de filas a devolver (default: todas)
+        offset: Índice de la primera fila (default: 0)
+        chunk_size: Si se indica, recupera las filas en bloques de este tamaño (páginas enormes)
+        max_value_length: Longitud máxima de cada valor de texto (default: sin límite)
+
+    Returns:
+        list: Lista de diccionarios, una fila por elemento
+
+    Raises:
+        messageError: Si la extracción falla
+    """
+    try:
+        rows = []
+        for chunk in iter_extract(driver, selector, fields, chunk_size=chunk_size, limit=limit,
+                                  offset=offset, max_value_length=max_value_length):
+            rows.extend(chunk)
+        logging.info(f"Extraídas {len(rows)} filas")
+        return rows
+
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def iter_extract(driver, selector, fields, chunk_size=None, limit=None, offset=0, max_value_length=None):
+    """
+    Generador que devuelve las filas extraídas en bloques (una llamada a execute_script por bloque)
+
+    Args:
+        driver: WebDriver de Selenium
+        selector: Selector CSS (str) o locator (By, valor)
+        fields: Diccionario {nombre: especificación} (ver extract)
+        chunk_size: Filas por bloque. Si es None se devuelve todo en un único bloque
+        limit: Número máximo total de filas
+        offset: Índice de la primera fila
+        max_value_length: Longitud máxima de cada valor de texto
+
+    Yields:
+        list: Bloque de filas (diccionarios)
+    """
+    by, value = normalize_selector(selector)
+    field_specs = parse_fields(fields)
+    remaining = limit
+    if limit == 0:
+        # En el script 0 significa "sin límite": no se pide nada
+        return
+
+    while True:
+        count = chunk_size if chunk_size else remaining
+        if chunk_size and remaining is not None:
+            count = min(chunk_size, remaining)
+
+        result = driver.execute_script(
+            _EXTRACT_SCRIPT, value, by == By.XPATH, field_specs, offset, count or 0, max_value_length or 0)
+        rows = result['rows']
+        if rows:
+            yield rows
+
+        offset += len(rows)
+        if remaining is not None:
+            remaining -= len(rows)
+
+        if not chunk_size or not rows or offset >= result['total'] or remaining == 0:
+            break
+
+
+def normalize_selector(selector):
+    """Convierte un selector CSS (str) o locator (By, valor) en (By, valor); solo admite CSS y XPath"""
+    if isinstance(selector, str):
+        return By.CSS_SELECTOR, selector
+    by, value = selector
+    if by not in (By.CSS_SELECTOR, By.XPATH):
+        raise ValueError(f"Tipo de selector no soportado para extracción: {by}")
+    return by, value
+
+
+# 'subselector@atributo' (evita confundir '@' dentro de selectores de atributo CSS)
+_ATTR_SUFFIX = re.compile(r"^(.+)@([\w:-]+)$")
+
+
+def parse_fields(fields):
+    """Convierte {nombre: especificación} (ver extract) en [[nombre, subselector, atributo]] para los scripts"""
+    specs = []
+    for name, spec in fields.items():
+        spec = (spec or 'text').strip()
+        if spec == 'text':
+            specs.append([name, None, None])
+        elif spec.startswith('@'):
+            specs.append([name, None, spec[1:]])
+        elif _ATTR_SUFFIX.match(spec):
+            sub, attr = _ATTR_SUFFIX.match(spec).groups()
+            specs.append([name, sub.strip(), attr])
+        else:
+            specs.append([name, spec, None])
+    return specs
@@ -0,0 +1,84 @@
+import inspect
+import logging
+from actions.page_helpers import call_helper, is_chromium, to_page_locator
+from actions.write_element import write_element
+from utils.config import FILL_FORM_INSERT_TEXT_MIN_LENGTH
+from utils.error import messageError
+
+
+def fill_form(driver, fields, verify=True, fallback=True):
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Fields: {len(fields)}")
+    """
+    Rellena varios campos de un formulario en una sola pasada
+
+    Los valores se escriben dentro de la página con el setter nativo (disparando input/change).
+    En Chrome los valores largos se insertan con CDP Input.insertText, que genera eventos de
+    entrada reales sin enviar una tecla por carácter. La verificación es una única lectura.
+
+    Args:
+        driver: WebDriver de Selenium
+        fields: Diccionario {locator: valor}. El locator es una tupla (By, valor) o un selector CSS.
+            Para checkbox/radio el valor es True/False
+        verify: Si comprobar los valores escritos (default: True)
+        fallback: Si reintentar con write_element los campos que no se verifiquen (default: True)
+
+    Returns:
+        driver: WebDriver actualizado
+
+    Raises:
+        messageError: Si algún campo no existe o no se pudo escribir
+    """
+    try:
+        locators = list(fields)
+        use_insert_text = is_chromium(driver)
+
+        specs = []
+        for locator in locators:
+            value = fields[locator]
+            kind, locator_value = to_page_locator(driver, locator)
+            in_page = not (use_insert_text and isinstance(value, str)
+                           and len(value) >= FILL_FORM_INSERT_TEXT_MIN_LENGTH)
+            specs.append([kind, locator_value, value, in_page])
+
+        results = call_helper(driver, 'fill', specs)
+
+        missing = [str(locators[i]) for i, result in enumerate(results) if not result['found']]
+        if missing:
+            raise messageError(f"Campos no encontrados: {', '.join(missing)}")
+
+        elements = [result['element'] for result in results]
+        for i, spec in enumerate(specs):
+            if not spec[3]:
+                call_helper(driver, 'focusSelect', elements[i])
+                driver.execute_cdp_cmd('Input.insertText', {'text': spec[2]})
+
+        if not verify:
+            return driver
+
+        values = call_helper(driver, 'readValues', elements)
+        failed = [i for i, value in enumerate(values) if not _matches(value, specs[i][2])]
+        if not failed:
+            logging.info(f"✅ {len(locators)} campos rellenados")
+            return driver
+
+        if not fallback:
+            raise messageError(
+                f"Campos no verificados: {', '.join(str(locators[i]) for i in failed)}")
+
+        logging.info(f"⚠️ {len(failed)} campos no verificados, reintentando con write_element")
+        for i in failed:
+            if isinstance(specs[i][2], bool):
+                raise messageError(f"No se pudo marcar el campo {locators[i]}")
+            driver = write_element(driver, elements[i], str(specs[i][2]),
+                                   locator=locators[i] if isinstance(locators[i], tuple) else None)
+        return driver
+
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def _matches(current, expected):
+    if isinstance(expected, bool):
+        return current is expected
+    return current is not None and str(expected) in str(current)
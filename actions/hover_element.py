@@ -1,11 +1,19 @@
 import inspect
 import logging
-from time import sleep
+from actions.page_helpers import call_helper, to_page_locator
+from actions.settle import wait_for_scroll_end
+from utils.adaptive_timeout import get_timeout
+from utils.config import SETTLE_BUDGET
 from utils.error import messageError
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
 
+_GESTURES = ('hover', 'click')
 
-def hover_element(driver, element, pause_time=0.5):
+
+def hover_element(driver, element, pause_time=0.5, settle_budget=SETTLE_BUDGET):
     logging.info(f"START || {inspect.currentframe().f_code.co_name} - Element: {element}")
     """
     Realiza un hover (movimiento del mouse) sobre un elemento
@@ -14,6 +22,7 @@ def hover_element(driver, element, pause_time=0.5):
         driver: WebDriver de Selenium
         element: Elemento web sobre el que hacer hover
         pause_time: Tiempo de pausa después del hover (en segundos)
+        settle_budget: Segundos máximos de espera a que termine el scroll (default: SETTLE_BUDGET)
 
     Returns:
         driver: WebDriver de Selenium actualizado
@@ -27,7 +36,7 @@ def hover_element(driver, element, pause_time=0.5):
 
         # Scroll al elemento para asegurar que esté visible
         driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        sleep(0.3)
+        wait_for_scroll_end(driver, element, settle_budget, replaces=0.3, action='hover')
 
         # Crear las acciones de hover
         actions = ActionChains(driver)
@@ -39,3 +48,115 @@ def hover_element(driver, element, pause_time=0.5):
     except Exception as e:
         raise messageError(
             f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def hover_sequence(driver, steps, pause_time=0.1, move_duration=100, verify=True, timeout=None):
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Steps: {len(steps)}")
+    """
+    Recorre una secuencia de hovers/clicks (p. ej. un menú desplegable de varios niveles)
+    en una única secuencia de acciones W3C con un solo perform()
+
+    Los pasos cuyos elementos ya están en el DOM (aunque ocultos hasta el hover anterior) se
+    encadenan juntos: el navegador calcula la posición de cada elemento al llegar a su paso.
+    Solo si un elemento aún no existe se ejecuta lo acumulado y se espera a que aparezca.
+
+    Args:
+        driver: WebDriver de Selenium
+        steps: Lista de pasos. Cada paso es un objetivo (WebElement, tupla (By, valor) o selector CSS)
+            para hacer hover, o una tupla ('hover' | 'click', objetivo)
+        pause_time: Pausa en segundos tras cada movimiento, para que abra el submenú (default: 0.1)
+        move_duration: Duración en ms de cada movimiento del puntero (default: 100)
+        verify: Comprobar que los elementos de los hovers quedaron visibles (default: True)
+        timeout: Segundos máximos de espera a un elemento que aún no existe (default: timeout aprendido)
+
+    Returns:
+        driver: WebDriver de Selenium actualizado
+
+    Raises:
+        messageError: Si un elemento no aparece o un submenú no se abrió
+    """
+    try:
+        steps = [_parse_step(step) for step in steps]
+        if not steps:
+            raise ValueError("La secuencia de pasos está vacía")
+
+        position = 0
+        performs = 0
+        while position < len(steps):
+            elements = _resolve(driver, steps[position:])
+            if elements[0] is None:
+                elements[0] = _wait_for_target(driver, steps[position][1], timeout)
+
+            # Se encadenan los pasos consecutivos cuyos elementos ya existen
+            segment = []
+            for (gesture, target), element in zip(steps[position:], elements):
+                if element is None:
+                    break
+                segment.append((gesture, target, element))
+
+            if position == 0:
+                call_helper(driver, 'scrollIntoView', segment[0][2])
+
+            actions = ActionChains(driver, duration=move_duration)
+            for gesture, _, element in segment:
+                actions.move_to_element(element)
+                if gesture == 'click':
+                    actions.click()
+                actions.pause(pause_time)
+            actions.perform()
+            performs += 1
+
+            if verify:
+                # Tras un click el menú puede cerrarse: solo se comprueban los hovers posteriores
+                clicks = [i for i, (gesture, _, _) in enumerate(segment) if gesture == 'click']
+                start = clicks[-1] + 1 if clicks else 0
+                hovered = [(target, element) for _, target, element in segment[start:]]
+                shown = call_helper(driver, 'visible', [element for _, element in hovered]) if hovered else []
+                hidden = [target for (target, _), ok in zip(hovered, shown) if not ok]
+                if hidden:
+                    raise messageError(f"El elemento {hidden[0]} no quedó visible tras el hover")
+
+            position += len(segment)
+
+        logging.info(f"Secuencia de {len(steps)} pasos realizada en {performs} perform()")
+        return driver
+
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def _parse_step(step):
+    if isinstance(step, tuple) and len(step) == 2 and step[0] in _GESTURES:
+        return step
+    return ('hover', step)
+
+
+def _resolve(driver, steps):
+    # Resuelve en una sola llamada todos los objetivos que no son ya un WebElement
+    elements = [target if isinstance(target, WebElement) else None for _, target in steps]
+    pending, specs = [], []
+    for i, element in enumerate(elements):
+        if element is not None:
+            continue
+        try:
+            specs.append(to_page_locator(driver, steps[i][1]))
+            pending.append(i)
+        except NoSuchElementException:
+            # Locator sin equivalente en la página que Selenium aún no encuentra
+            pass
+    if specs:
+        for i, element in zip(pending, call_helper(driver, 'resolve', specs)):
+            elements[i] = element
+    return elements
+
+
+def _wait_for_target(driver, target, timeout):
+    if timeout is None:
+        locator = target if isinstance(target, tuple) else ('css selector', target)
+        timeout = get_timeout(driver.current_url, locator)
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.05).until(
+            lambda d: _resolve(d, [('hover', target)])[0])
+    except TimeoutException:
+        raise messageError(f"El elemento {target} no apareció en {timeout}s")
@@ -0,0 +1,393 @@
+import logging
+import threading
+from selenium.webdriver.common.by import By
+
+# Versión de la librería. Cambiarla cuando cambie _HELPERS_LIBRARY para que se reinstale en las páginas
+HELPERS_VERSION = 4
+
+# Librería de utilidades que se instala una vez por documento como window.__sq.
+# Las acciones llaman a funciones cortas (__sq.unblock(el), __sq.setValue(el, v)...) en lugar de
+# reenviar el código completo en cada execute_script.
+_HELPERS_LIBRARY = """
+(function(version) {
+    if (window.__sq && window.__sq.version === version) return;
+
+    var RESTRICTIVE_CLASSES = [
+        'disabled', 'readonly', 'not-allowed', 'pointer-events-none',
+        'dp__input_readonly', 'dp__pointer', 'dp__disabled'
+    ];
+
+    // Quita atributos, clases y estilos que bloquean la interacción (también en 5 niveles de padres)
+    function unblock(element) {
+        try {
+            element.removeAttribute('disabled');
+            element.removeAttribute('readonly');
+            element.disabled = false;
+            element.readOnly = false;
+            RESTRICTIVE_CLASSES.forEach(function(className) {
+                element.classList.remove(className);
+            });
+
+            element.style.pointerEvents = 'auto';
+            element.style.cursor = 'auto';
+            element.style.opacity = '1';
+            element.style.visibility = 'visible';
+            element.style.display = 'block';
+
+            // Si es un input, asegurar que sea de tipo text
+            if (element.tagName.toLowerCase() === 'input') {
+                if (element.getAttribute('inputmode') === 'none') {
+                    element.setAttribute('inputmode', 'text');
+                }
+                if (!element.type || element.type === 'hidden') {
+                    element.setAttribute('type', 'text');
+                }
+            }
+
+            var parent = element.parentElement;
+            for (var levels = 0; parent && levels < 5; levels++) {
+                parent.removeAttribute('disabled');
+                parent.disabled = false;
+                parent.style.pointerEvents = 'auto';
+                RESTRICTIVE_CLASSES.forEach(function(className) {
+                    parent.classList.remove(className);
+                });
+                parent = parent.parentElement;
+            }
+            return true;
+        } catch (error) {
+            console.error('Error habilitando elemento:', error);
+            return false;
+        }
+    }
+
+    function scrollIntoView(element, behavior) {
+        element.scrollIntoView({behavior: behavior || 'instant', block: 'center', inline: 'center'});
+    }
+
+    // Setter nativo para que frameworks como React detecten el cambio
+    function setValue(element, value, events) {
+        var tag = element.tagName.toLowerCase();
+        var proto = tag === 'textarea' ? HTMLTextAreaElement.prototype :
+                    tag === 'select' ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+        var descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+        if (descriptor && descriptor.set) descriptor.set.call(element, value);
+        else element.value = value;
+        (events || ['input', 'change']).forEach(function(type) {
+            element.dispatchEvent(new Event(type, {bubbles: true, cancelable: true}));
+        });
+    }
+
+    // Deja el campo enfocado y con el contenido seleccionado
+    function focusSelect(element) {
+        element.focus();
+        if (typeof element.select === 'function') element.select();
+    }
+
+    // Escalera de click en una sola llamada: scroll, desbloqueo, hit-test y eventos sintéticos.
+    // Devuelve {ok, strategy, occluder, needsTrusted, handled}. handled indica si algo reaccionó
+    // de forma síncrona (DOM, URL, preventDefault o acción por defecto del elemento); si no, la
+    // página puede ignorar los eventos sintéticos (isTrusted) o reaccionar más tarde: los cambios
+    // posteriores del DOM (también de atributos) se anotan en window.__sqClickActivity
+    function fastClick(element) {
+        var result = {ok: false, strategy: null, occluder: null, needsTrusted: false, handled: false};
+
+        var tag = element.tagName.toLowerCase();
+        if (tag === 'select' || (tag === 'input' && element.type === 'file')) {
+            // El navegador solo abre selectores nativos con eventos de confianza
+            result.needsTrusted = true;
+            return result;
+        }
+
+        scrollIntoView(element);
+        var rect = element.getBoundingClientRect();
+
+        if (!rect.width || !rect.height || element.disabled) {
+            // Elemento oculto o deshabilitado: quitar restricciones y volver a medir
+            element.removeAttribute('disabled');
+            element.disabled = false;
+            element.style.pointerEvents = 'auto';
+            element.style.visibility = 'visible';
+            scrollIntoView(element);
+            rect = element.getBoundingClientRect();
+            if (!rect.width || !rect.height) {
+                // Sin tamaño no hay punto que pulsar: se deja a la escalera normal
+                return result;
+            }
+            result.strategy = 'unblocked';
+        }
+
+        var x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+        var target = document.elementFromPoint(x, y);
+        var hidden = [];
+        while (target && target !== element && !element.contains(target) && hidden.length < 5) {
+            // Algo tapa el elemento (overlay, banner de cookies...): se ignora temporalmente
+            if (!result.occluder) {
+                result.occluder = target.tagName.toLowerCase() +
+                    (target.id ? '#' + target.id : '') +
+                    (typeof target.className === 'string' && target.className ? '.' + target.className.split(/\\s+/).join('.') : '');
+            }
+            hidden.push([target, target.style.pointerEvents]);
+            target.style.pointerEvents = 'none';
+            target = document.elementFromPoint(x, y);
+        }
+        if (!target || (target !== element && !element.contains(target))) target = element;
+
+        var init = {bubbles: true, cancelable: true, composed: true, view: window,
+                    clientX: x, clientY: y, button: 0, buttons: 1, isPrimary: true, pointerType: 'mouse'};
+        var observer = new MutationObserver(function() {});
+        observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+        var href = location.href, notCanceled = true;
+        try {
+            ['pointerover', 'pointerenter', 'mouseover', 'pointerdown', 'mousedown'].forEach(function(type) {
+                var Ctor = type.indexOf('pointer') === 0 && window.PointerEvent ? PointerEvent : MouseEvent;
+                target.dispatchEvent(new Ctor(type, init));
+            });
+            if (typeof target.focus === 'function') target.focus();
+            init.buttons = 0;
+            ['pointerup', 'mouseup', 'click'].forEach(function(type) {
+                var Ctor = type.indexOf('pointer') === 0 && window.PointerEvent ? PointerEvent : MouseEvent;
+                notCanceled = target.dispatchEvent(new Ctor(type, init));
+            });
+            result.ok = true;
+            result.strategy = result.occluder ? 'events_unoccluded' : (result.strategy || 'events');
+            // Enlaces, campos, etiquetas y botones de envío ejecutan su acción también con eventos sintéticos
+            var activates = target.closest && target.closest(
+                'a[href], input, label, summary, button[type="submit"], form button:not([type])');
+            result.handled = observer.takeRecords().length > 0 || location.href !== href ||
+                !notCanceled || !!activates;
+        } finally {
+            observer.disconnect();
+            hidden.forEach(function(item) { item[0].style.pointerEvents = item[1]; });
+        }
+        if (result.ok && !result.handled) {
+            // Se vigila después de restaurar los elementos tapados (esos cambios son nuestros)
+            var activity = window.__sqClickActivity = {seen: false};
+            if (window.__sqClickObserver) window.__sqClickObserver.disconnect();
+            window.__sqClickObserver = new MutationObserver(function() { activity.seen = true; });
+            window.__sqClickObserver.observe(document.documentElement, {
+                childList: true, subtree: true, characterData: true, attributes: true
+            });
+        }
+        return result;
+    }
+
+    function locate(kind, value) {
+        if (kind === 'element') return value;
+        if (kind === 'xpath') {
+            return document.evaluate(value, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return document.querySelector(value);
+    }
+
+    // Localiza todos los campos y escribe los marcados para escribir en la página.
+    // specs: [[tipo, valor_locator, texto, escribir_en_pagina]] -> [{found, element}]
+    function fill(specs) {
+        return specs.map(function(spec) {
+            var element = locate(spec[0], spec[1]);
+            if (!element) return {found: false, element: null};
+            if (spec[3]) {
+                var value = spec[2];
+                if (element.type === 'checkbox' || element.type === 'radio') {
+                    var checked = value === true || value === 'true' || value === 'on' || value === '1';
+                    if (element.checked !== checked) element.click();
+                } else {
+                    setValue(element, value);
+                }
+            }
+            return {found: true, element: element};
+        });
+    }
+
+    // Resuelve varios locators en una sola llamada: [[tipo, valor]] -> [elemento | null]
+    function resolve(specs) {
+        return specs.map(function(spec) { return locate(spec[0], spec[1]); });
+    }
+
+    // Indica por elemento si está renderizado (con tamaño y visible)
+    function visible(elements) {
+        return elements.map(function(element) {
+            if (!element || !element.isConnected) return false;
+            var rect = element.getBoundingClientRect();
+            return rect.width > 0 && rect.height > 0 && getComputedStyle(element).visibility !== 'hidden';
+        });
+    }
+
+    // Lectura de verificación de varios campos en una sola llamada
+    function readValues(elements) {
+        return elements.map(function(element) {
+            if (!element) return null;
+            if (element.type === 'checkbox' || element.type === 'radio') return element.checked;
+            return element.value;
+        });
+    }
+
+    window.__sq = {
+        version: version,
+        unblock: unblock,
+        scrollIntoView: scrollIntoView,
+        setValue: setValue,
+        focusSelect: focusSelect,
+        fastClick: fastClick,
+        fill: fill,
+        resolve: resolve,
+        visible: visible,
+        readValues: readValues
+    };
+})(__SQ_VERSION__);
+""".replace('__SQ_VERSION__', str(HELPERS_VERSION))
+
+# Llamada corta a una función de la librería. Si no está instalada (o es de otra versión) lo indica
+_CALL_SCRIPT = """
+    var args = Array.prototype.slice.call(arguments), sq = window.__sq;
+    if (!sq || sq.version !== args[0]) return '__sq_missing__';
+    return sq[args[1]].apply(sq, args.slice(2));
+"""
+_MISSING = '__sq_missing__'
+
+# Sesiones con la librería registrada para todos los documentos nuevos (CDP)
+_registered = set()
+_stats = {
+    'calls': 0,
+    'installs': 0
+}
+_lock = threading.Lock()
+
+
+def is_chromium(driver):
+    """
+    Indica si el driver es de un navegador Chromium (con comandos CDP disponibles)
+
+    Args:
+        driver: WebDriver de Selenium
+
+    Returns:
+        bool: True en Chrome/Chromium/Edge
+    """
+    browser = (getattr(driver, 'capabilities', None) or {}).get('browserName', '')
+    return hasattr(driver, 'execute_cdp_cmd') and browser in ('chrome', 'chromium', 'MicrosoftEdge', 'msedge')
+
+
+def install_helpers(driver):
+    """
+    Instala la librería window.__sq en el documento actual.
+
+    En Chromium además se registra con Page.addScriptToEvaluateOnNewDocument, de modo que
+    los documentos siguientes ya la tienen al cargar. En otros navegadores se instala bajo
+    demanda en cada documento (ver call_helper).
+
+    Args:
+        driver: WebDriver de Selenium
+    """
+    key = getattr(driver, 'session_id', None) or id(driver)
+    with _lock:
+        register = key not in _registered
+        if register:
+            _registered.add(key)
+        _stats['installs'] += 1
+
+    if register and is_chromium(driver):
+        try:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _HELPERS_LIBRARY})
+        except Exception as e:
+            logging.debug(f"No se pudo registrar la librería para documentos nuevos: {e}")
+    driver.execute_script(_HELPERS_LIBRARY)
+
+
+def call_helper(driver, name, *args):
+    """
+    Ejecuta una función de la librería window.__sq, instalándola si el documento no la tiene
+
+    Args:
+        driver: WebDriver de Selenium
+        name: Nombre de la función (unblock, scrollIntoView, setValue, focusSelect, fastClick, fill,
+            resolve, visible, readValues)
+        *args: Argumentos de la función (los WebElement se pasan como elementos del DOM)
+
+    Returns:
+        Valor devuelto por la función
+    """
+    with _lock:
+        _stats['calls'] += 1
+    result = driver.execute_script(_CALL_SCRIPT, HELPERS_VERSION, name, *args)
+    if isinstance(result, str) and result == _MISSING:
+        install_helpers(driver)
+        result = driver.execute_script(_CALL_SCRIPT, HELPERS_VERSION, name, *args)
+    return result
+
+
+def discard_helpers(driver):
+    """Olvida el registro de la librería para un driver que se va a cerrar"""
+    key = getattr(driver, 'session_id', None) or id(driver)
+    with _lock:
+        _registered.discard(key)
+
+
+def get_helper_stats():
+    """
+    Devuelve cuántas llamadas a la librería se hicieron y cuántas veces hubo que instalarla
+
+    Returns:
+        dict: {'calls', 'installs'}
+    """
+    with _lock:
+        return dict(_stats)
+
+
+def to_page_locator(driver, locator):
+    """
+    Traduce un locator de Selenium a algo que la página pueda resolver por sí misma (__sq.resolve)
+
+    Args:
+        driver: WebDriver de Selenium
+        locator: Tupla (By, valor) o selector CSS
+
+    Returns:
+        tuple: ('css' | 'xpath' | 'element', valor). Los tipos de locator sin equivalente en la
+            página se resuelven con Selenium y se devuelve el elemento
+    """
+    if isinstance(locator, str):
+        return 'css', locator
+    by, value = locator
+    if by == By.CSS_SELECTOR:
+        return 'css', value
+    if by == By.XPATH:
+        return 'xpath', value
+    if by == By.ID:
+        return 'xpath', f"//*[@id={_xpath_literal(value)}]"
+    if by == By.NAME:
+        return 'xpath', f"//*[@name={_xpath_literal(value)}]"
+    # Otros tipos de locator: se resuelven con Selenium y se pasa el elemento
+    return 'element', driver.find_element(by, value)
+
+
+def _xpath_literal(value):
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+def make_element_interactable(driver, element):
+    """
+    Intenta hacer un elemento interactuable removiendo restricciones comunes
+
+    Args:
+        driver: WebDriver de Selenium
+        element: Elemento web a hacer interactuable
+
+    Returns:
+        bool: True si el elemento fue habilitado exitosamente
+    """
+    try:
+        if call_helper(driver, 'unblock', element):
+            return True
+        logging.warning("No se pudo habilitar el elemento")
+        return False
+
+    except Exception as e:
+        logging.error(f"Error en make_element_interactable: {e}")
+        return False
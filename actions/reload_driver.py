@@ -1,48 +1,99 @@
 import inspect
 import logging
-import time
-from utils.config import PAGE_MAX_TIMEOUT
+from actions.capture_screenshot import capture_step
+from actions.element_cache import invalidate_element_cache
+from actions.page_helpers import is_chromium
+from actions.settle import arm_effect, wait_for_document_ready, wait_for_effect
+from utils.adaptive_timeout import LOAD, get_timeout
+from utils.config import SETTLE_BUDGET
 from utils.error import messageError
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoAlertPresentException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+_RELOAD_MODES = ('soft', 'hard', 'spa')
 
-def reload_driver(driver):
-    logging.info(f"START || {inspect.currentframe().f_code.co_name}")
+
+def reload_driver(driver, mode='soft', spa_hook=None, ready=None, dialog_handler=None, settle_budget=SETTLE_BUDGET):
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Mode: {mode}")
+    """
+    Recarga la página y espera a que esté lista, sin pausas fijas
+
+    Args:
+        driver: WebDriver de Selenium
+        mode: 'soft' (recarga respetando la caché), 'hard' (ignorando la caché) o
+            'spa' (refresco del estado sin recargar el documento, con spa_hook) (default: 'soft')
+        spa_hook: Función spa_hook(driver) que refresca el estado de la aplicación (obligatoria en 'spa')
+        ready: Predicado ready(driver) -> bool adicional para dar la página por lista (opcional)
+        dialog_handler: Función dialog_handler(alert) para los diálogos abiertos antes de recargar.
+            Si no se indica, no se espera a ningún diálogo y uno ya abierto se acepta
+        settle_budget: Segundos máximos de espera tras aceptar un diálogo (default: SETTLE_BUDGET)
+
+    Returns:
+        driver: WebDriver actualizado
+
+    Raises:
+        messageError: Si el modo no es válido o la página no queda lista a tiempo
+    """
     try:
-        logging.info("Recargando la página...")
+        if mode not in _RELOAD_MODES:
+            raise ValueError(f"Modo de recarga no soportado: {mode}. Opciones: {', '.join(_RELOAD_MODES)}")
+        if mode == 'spa' and spa_hook is None:
+            raise ValueError("El modo 'spa' necesita spa_hook")
 
-        # Primero, deshabilitar cualquier evento beforeunload que dispara el diálogo
-        logging.info("Deshabilitando eventos beforeunload...")
-        driver.execute_script("window.onbeforeunload = null;")
-        time.sleep(0.2)
+        _handle_dialog(driver, dialog_handler, settle_budget)
 
-        # Manejar cualquier alerta ya abierta
-        try:
-            alert = WebDriverWait(driver, 1).until(EC.alert_is_present())
-            logging.info("Alert detected, accepting it...")
-            alert.accept()
-            time.sleep(0.5)
-        except Exception:
-            # No hay alerta nativa, continuar
-            pass
+        url = driver.current_url
+        timeout = get_timeout(url, LOAD)
 
-        # Usar JavaScript para recargar la página
-        logging.info("Ejecutando recarga vía JavaScript...")
-        driver.execute_script("window.location.reload();")
+        if mode == 'spa':
+            # Refresco en el sitio: listo cuando las peticiones y el DOM se asientan
+            effect = arm_effect(driver, 'any')
+            spa_hook(driver)
+        else:
+            # El documento nuevo se detecta porque ya no tiene la marca del armado
+            effect = arm_effect(driver, 'navigation')
+            # Deshabilitar cualquier evento beforeunload que dispara el diálogo
+            driver.execute_script("window.onbeforeunload = null;")
+            if is_chromium(driver):
+                driver.execute_cdp_cmd('Page.reload', {'ignoreCache': mode == 'hard'})
+            elif mode == 'hard':
+                driver.execute_script("window.location.reload(true);")
+            else:
+                driver.execute_script("window.location.reload();")
+            invalidate_element_cache(driver)
 
-        # Esperar a que la página esté completamente cargada
-        wait = WebDriverWait(driver, PAGE_MAX_TIMEOUT)
-        wait.until(lambda d: d.execute_script(
-            'return document.readyState') == 'complete')
+        outcome = wait_for_effect(driver, effect, timeout)
+        if mode != 'spa' and outcome != 'navigated':
+            raise messageError(f"La página no terminó de recargar en {timeout}s")
 
-        # Pequeño delay adicional para Docker/headless mode
-        time.sleep(0.5)
+        if ready is not None:
+            WebDriverWait(driver, timeout, poll_frequency=0.05).until(ready)
 
         logging.info("Página recargada exitosamente")
-    
+        capture_step(driver, 'reload')
         return driver
+
     except Exception as e:
         raise messageError(
             f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def _handle_dialog(driver, dialog_handler, settle_budget):
+    if dialog_handler is None:
+        # Sin manejador no se espera: solo se acepta un diálogo que ya esté abierto
+        try:
+            alert = driver.switch_to.alert
+        except NoAlertPresentException:
+            return
+        logging.info("Alert detected, accepting it...")
+        alert.accept()
+    else:
+        try:
+            alert = WebDriverWait(driver, 1).until(EC.alert_is_present())
+        except Exception:
+            # No hay alerta nativa, continuar
+            return
+        logging.info("Alert detected, handling it...")
+        dialog_handler(alert)
+    wait_for_document_ready(driver, settle_budget, replaces=0.5, action='reload')
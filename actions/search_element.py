@@ -1,27 +1,66 @@
 import inspect
 import logging
+import threading
+import time
+from actions.element_cache import cache_element, get_cached_element
+from actions.page_helpers import call_helper
 from actions.web_driver import get_wait
+from utils.adaptive_timeout import record_latency
+from utils.config import ADAPTIVE_TIMEOUTS, PAGE_MAX_TIMEOUT, PROBE_SETTLE_TIMEOUT
 from utils.error import messageError
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Estadísticas acumuladas del modo probe (por proceso)
+_probe_stats = {
+    'probes': 0,
+    'hits': 0,
+    'misses': 0,
+    'time_saved': 0.0
+}
+_probe_lock = threading.Lock()
 
 # This function searches for an element on the page, scrolls to it, and click to it.
 
 
-def search_element(driver, locator, wait_to_search=True, raise_exception=True):
+def search_element(driver, locator, wait_to_search=True, raise_exception=True, probe=False, settle_time=None, cache=False):
     logging.info(f"START || {inspect.currentframe().f_code.co_name} - Locator: {locator}")
     # locator  example: driver, (By.XPATH, "//span[contains(@class, 'x-menu-item-text') and contains(text(), '{}')]".format(xpath))
-    
-    wait = get_wait(driver)
+    # probe=True: para elementos opcionales. No espera PAGE_MAX_TIMEOUT, solo a que el documento
+    # esté cargado más una ventana corta (settle_time, por defecto PROBE_SETTLE_TIMEOUT)
+    # cache=True: reutiliza el elemento encontrado antes para el mismo locator en la misma navegación
+
     try:
-        if wait_to_search:
-            element = wait.until(lambda d:
-                        # expected_conditions.presence_of_element_located(locator)(d) or
-                        expected_conditions.element_to_be_clickable(locator)(d) or
-                        expected_conditions.visibility_of_element_located(
-                            locator)(d)
-                        )
+        if cache:
+            element = get_cached_element(driver, locator)
+            if element is not None:
+                return element
+
+        if probe:
+            element = _probe_element(driver, locator, settle_time)
+        elif wait_to_search:
+            url = driver.current_url if ADAPTIVE_TIMEOUTS else None
+            wait = get_wait(driver, locator, url)
+            start = time.monotonic()
+            try:
+                element = wait.until(lambda d:
+                            # expected_conditions.presence_of_element_located(locator)(d) or
+                            expected_conditions.element_to_be_clickable(locator)(d) or
+                            expected_conditions.visibility_of_element_located(
+                                locator)(d)
+                            )
+            except TimeoutException:
+                # Un elemento opcional que no está no dice nada de lo que tarda en aparecer
+                if raise_exception:
+                    record_latency(url, locator, time.monotonic() - start, success=False)
+                raise
+            record_latency(url, locator, time.monotonic() - start)
         else:
             element = driver.find_element(*locator)
+
+        if cache:
+            cache_element(driver, locator, element)
         return element
     except Exception as e:
         if raise_exception:
@@ -34,3 +73,79 @@ def search_element(driver, locator, wait_to_search=True, raise_exception=True):
             raise messageError(error_message)
         else:
             pass
+
+
+def _probe_element(driver, locator, settle_time=None):
+    """
+    Comprueba la presencia de un elemento visible sin consumir el timeout completo.
+
+    Primero busca una vez; si no está, espera a que document.readyState sea 'complete'
+    y vuelve a comprobar durante una ventana corta de asentamiento. Como en la espera normal
+    (clickable o visible), los elementos ocultos o sin tamaño no cuentan.
+
+    Args:
+        driver: WebDriver de Selenium
+        locator: Tupla (By, valor) del elemento
+        settle_time: Ventana de asentamiento en segundos (default: PROBE_SETTLE_TIMEOUT)
+
+    Returns:
+        WebElement: Primer elemento visible encontrado
+
+    Raises:
+        NoSuchElementException: Si no hay un elemento visible al final de la ventana
+    """
+    if settle_time is None:
+        settle_time = PROBE_SETTLE_TIMEOUT
+    start = time.monotonic()
+
+    elements = _visible(driver, driver.find_elements(*locator))
+    if not elements:
+        try:
+            WebDriverWait(driver, PAGE_MAX_TIMEOUT, poll_frequency=0.1).until(
+                lambda d: d.execute_script('return document.readyState') == 'complete')
+        except Exception as e:
+            logging.debug(f"Probe: documento no completo: {e}")
+
+        deadline = time.monotonic() + settle_time
+        elements = _visible(driver, driver.find_elements(*locator))
+        while not elements and time.monotonic() < deadline:
+            time.sleep(0.1)
+            elements = _visible(driver, driver.find_elements(*locator))
+
+    elapsed = time.monotonic() - start
+    with _probe_lock:
+        _probe_stats['probes'] += 1
+        if elements:
+            _probe_stats['hits'] += 1
+        else:
+            _probe_stats['misses'] += 1
+            _probe_stats['time_saved'] += max(PAGE_MAX_TIMEOUT - elapsed, 0)
+
+    if not elements:
+        logging.info(
+            f"Probe: {locator} no presente ({elapsed:.2f}s, ahorrados {max(PAGE_MAX_TIMEOUT - elapsed, 0):.2f}s)")
+        raise NoSuchElementException(f"Element {locator} not present")
+    return elements[0]
+
+
+def _visible(driver, elements):
+    # Filtra los elementos visibles en una sola llamada (__sq.visible)
+    if not elements:
+        return elements
+    try:
+        flags = call_helper(driver, 'visible', elements)
+    except Exception as e:
+        logging.debug(f"Probe: visibilidad no disponible, se usa is_displayed: {e}")
+        flags = [element.is_displayed() for element in elements]
+    return [element for element, visible in zip(elements, flags) if visible]
+
+
+def get_probe_stats():
+    """
+    Devuelve una copia de las estadísticas del modo probe.
+
+    Returns:
+        dict: probes, hits, misses y time_saved (segundos ahorrados frente a PAGE_MAX_TIMEOUT)
+    """
+    with _probe_lock:
+        return dict(_probe_stats)
@@ -0,0 +1,369 @@
+import logging
+import threading
+import time
+import uuid
+from actions.element_cache import invalidate_element_cache
+from utils.adaptive_timeout import LOAD, get_timeout, record_latency
+from utils.config import EFFECT_QUIET_WINDOW, SETTLE_BUDGET
+from utils.error import messageError
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Espera dentro de la página (una sola llamada) hasta que se cumple la condición o vence el presupuesto.
+# Se comprueba en cada frame de animación (o cada 16 ms si la pestaña no está visible).
+# arguments: tipo, elemento, valor esperado, presupuesto (s)
+_SETTLE_SCRIPT = """
+    var done = arguments[arguments.length - 1];
+    var kind = arguments[0], element = arguments[1], expected = arguments[2];
+    var budget = arguments[3] * 1000, start = performance.now();
+    var last = null, stableFrames = 0;
+
+    function snapshot() {
+        if (kind === 'ready') return document.readyState;
+        if (kind === 'value') return element.value;
+        var rect = element.getBoundingClientRect();
+        var box = [rect.left, rect.top, rect.width, rect.height].join(',');
+        return kind === 'scroll' ? box + '|' + window.scrollX + ',' + window.scrollY : box;
+    }
+
+    function settled(current) {
+        if (kind === 'ready') return current === 'complete';
+        if (kind === 'value') return expected === '' ? !current : String(current || '').indexOf(expected) !== -1;
+        // scroll/stable: sin cambios durante 2 frames consecutivos
+        stableFrames = (current === last) ? stableFrames + 1 : 0;
+        last = current;
+        return stableFrames >= 2;
+    }
+
+    function schedule() {
+        if (document.visibilityState === 'visible') requestAnimationFrame(check);
+        else setTimeout(check, 16);
+    }
+
+    function check() {
+        try {
+            if (settled(snapshot())) return done(true);
+        } catch (e) {
+            return done(false);
+        }
+        if (performance.now() - start >= budget) return done(false);
+        schedule();
+    }
+    check();
+"""
+
+# Prepara la detección del efecto de un click (antes de hacerlo). Instala una sola vez por documento
+# un contador de peticiones fetch/XHR en vuelo y un PerformanceObserver de recursos, y en cada armado
+# un MutationObserver sobre la región vigilada (o todo el documento).
+# arguments: token, región (elemento, selector CSS o null)
+_ARM_EFFECT_SCRIPT = """
+    var token = arguments[0], region = arguments[1];
+    if (typeof region === 'string') region = document.querySelector(region);
+
+    if (!window.__sqNet) {
+        var net = window.__sqNet = {inflight: 0, requests: 0, resources: 0, last: performance.now()};
+        var begin = function() { net.inflight++; net.requests++; net.last = performance.now(); };
+        var end = function() { net.inflight = Math.max(0, net.inflight - 1); net.last = performance.now(); };
+
+        if (window.fetch) {
+            var originalFetch = window.fetch;
+            window.fetch = function() {
+                begin();
+                try {
+                    return originalFetch.apply(this, arguments).finally(end);
+                } catch (e) { end(); throw e; }
+            };
+        }
+        var originalSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function() {
+            begin();
+            this.addEventListener('loadend', end);
+            try {
+                return originalSend.apply(this, arguments);
+            } catch (e) { end(); throw e; }
+        };
+        if (window.PerformanceObserver) {
+            try {
+                new PerformanceObserver(function(list) {
+                    net.resources += list.getEntries().length;
+                    net.last = performance.now();
+                }).observe({type: 'resource'});
+            } catch (e) {}
+        }
+    }
+
+    if (window.__sqEffectObserver) window.__sqEffectObserver.disconnect();
+    var state = window.__sqEffect = {
+        token: token, href: location.href, mutated: false, lastMutation: 0,
+        requests: window.__sqNet.requests, resources: window.__sqNet.resources
+    };
+    window.__sqEffectObserver = new MutationObserver(function() {
+        state.mutated = true;
+        state.lastMutation = performance.now();
+    });
+    // Los cambios de atributos solo se vigilan en una región concreta (en todo el documento
+    // los estilos de foco/hover del propio click bastarían para dar el efecto por cumplido)
+    window.__sqEffectObserver.observe(region || document.documentElement, {
+        childList: true, subtree: true, characterData: true, attributes: !!region
+    });
+"""
+
+# Espera (una sola llamada) a que se produzca y se asiente el efecto armado.
+# Devuelve 'unloaded' (documento nuevo), 'routed' (cambio de URL sin recarga), 'network',
+# 'mutation' o 'timeout'. arguments: token, tipo, ventana de silencio (s), presupuesto (s)
+_WAIT_EFFECT_SCRIPT = """
+    var done = arguments[arguments.length - 1];
+    var token = arguments[0], kind = arguments[1];
+    var quiet = arguments[2] * 1000, budget = arguments[3] * 1000, start = performance.now();
+
+    function check() {
+        var state = window.__sqEffect, net = window.__sqNet;
+        if (!state || state.token !== token) return done('unloaded');
+        if (location.href !== state.href && kind !== 'network' && kind !== 'mutation') return done('routed');
+
+        var now = performance.now();
+        var networkSeen = net.requests > state.requests || net.resources > state.resources;
+        var networkIdle = net.inflight === 0 && now - net.last >= quiet;
+        var domIdle = now - state.lastMutation >= quiet;
+
+        if ((kind === 'network' || kind === 'any') && networkSeen && networkIdle && domIdle) return done('network');
+        if ((kind === 'mutation' || kind === 'any') && state.mutated && domIdle && networkIdle) return done('mutation');
+        if (now - start >= budget) return done('timeout');
+        setTimeout(check, 50);
+    }
+    check();
+"""
+
+# Espera (una sola llamada) a la primera señal de que la página reaccionó al click, sin esperar a que
+# se asiente: documento nuevo, cambio de URL, una petición o un cambio del DOM (incluidos los que anota
+# __sq.fastClick en window.__sqClickActivity). Devuelve 'unloaded', 'routed', 'network', 'mutation' o
+# 'timeout'. arguments: token, presupuesto (s)
+_ACTIVITY_SCRIPT = """
+    var done = arguments[arguments.length - 1];
+    var token = arguments[0], budget = arguments[1] * 1000, start = performance.now();
+
+    function finish(outcome) {
+        if (window.__sqClickObserver) window.__sqClickObserver.disconnect();
+        done(outcome);
+    }
+
+    function check() {
+        var state = window.__sqEffect, net = window.__sqNet, activity = window.__sqClickActivity;
+        if (!state || state.token !== token) return done('unloaded');
+        if (location.href !== state.href) return finish('routed');
+        if (net.requests > state.requests || net.resources > state.resources) return finish('network');
+        if (state.mutated || (activity && activity.seen)) return finish('mutation');
+        if (performance.now() - start >= budget) return finish('timeout');
+        setTimeout(check, 50);
+    }
+    check();
+"""
+
+# Documento nuevo (sin el token del armado) y completamente cargado
+_NEW_DOCUMENT_SCRIPT = """
+    var state = window.__sqEffect;
+    return (!state || state.token !== arguments[0]) && document.readyState === 'complete';
+"""
+
+_EFFECT_KINDS = ('any', 'navigation', 'network', 'mutation')
+
+# {accion: {'waits', 'elapsed', 'saved'}} tiempo real esperado frente a las pausas fijas que sustituye
+_settle_stats = {}
+_lock = threading.Lock()
+
+
+def wait_for_scroll_end(driver, element, budget=SETTLE_BUDGET, replaces=0, action=None):
+    """
+    Espera a que termine el scroll (posición del elemento y de la ventana estable 2 frames).
+
+    Args:
+        driver: WebDriver de Selenium
+        element: Elemento hacia el que se hizo scroll
+        budget: Tiempo máximo de espera en segundos
+        replaces: Segundos de la pausa fija que sustituye (para calcular el ahorro)
+        action: Nombre de la acción para las estadísticas
+
+    Returns:
+        bool: True si se asentó dentro del presupuesto
+    """
+    return _settle(driver, 'scroll', element, None, budget, replaces, action)
+
+
+def wait_for_element_stable(driver, element, budget=SETTLE_BUDGET, replaces=0, action=None):
+    """
+    Espera a que la caja del elemento no cambie durante 2 frames de animación.
+
+    Args:
+        driver: WebDriver de Selenium
+        element: Elemento a vigilar
+        budget: Tiempo máximo de espera en segundos
+        replaces: Segundos de la pausa fija que sustituye
+        action: Nombre de la acción para las estadísticas
+
+    Returns:
+        bool: True si se asentó dentro del presupuesto
+    """
+    return _settle(driver, 'stable', element, None, budget, replaces, action)
+
+
+def wait_for_value(driver, element, text, budget=SETTLE_BUDGET, replaces=0, action=None):
+    """
+    Espera a que el valor del campo contenga el texto (valor confirmado).
+
+    Args:
+        driver: WebDriver de Selenium
+        element: Campo a vigilar
+        text: Texto esperado ('' para esperar a que el campo quede vacío)
+        budget: Tiempo máximo de espera en segundos
+        replaces: Segundos de la pausa fija que sustituye
+        action: Nombre de la acción para las estadísticas
+
+    Returns:
+        bool: True si el valor se confirmó dentro del presupuesto
+    """
+    return _settle(driver, 'value', element, text, budget, replaces, action)
+
+
+def wait_for_document_ready(driver, budget=SETTLE_BUDGET, replaces=0, action=None):
+    """
+    Espera a que document.readyState sea 'complete'.
+
+    Args:
+        driver: WebDriver de Selenium
+        budget: Tiempo máximo de espera en segundos
+        replaces: Segundos de la pausa fija que sustituye
+        action: Nombre de la acción para las estadísticas
+
+    Returns:
+        bool: True si el documento está listo dentro del presupuesto
+    """
+    return _settle(driver, 'ready', None, None, budget, replaces, action)
+
+
+def arm_effect(driver, kind='any', region=None):
+    """
+    Prepara la detección del efecto de un click. Debe llamarse antes del click.
+
+    Args:
+        driver: WebDriver de Selenium
+        kind: Efecto a esperar: 'navigation', 'network' (peticiones fetch/XHR/recursos que terminan),
+            'mutation' (cambios en el DOM de la región) o 'any' (el primero que ocurra)
+        region: Elemento o selector CSS donde vigilar mutaciones (default: todo el documento)
+
+    Returns:
+        dict: Efecto armado, para pasar a wait_for_effect
+    """
+    if kind not in _EFFECT_KINDS:
+        raise messageError(f"Efecto no soportado: {kind}. Opciones: {', '.join(_EFFECT_KINDS)}")
+
+    url = driver.current_url
+    token = uuid.uuid4().hex
+    driver.execute_script(_ARM_EFFECT_SCRIPT, token, region)
+    return {'token': token, 'kind': kind, 'url': url}
+
+
+def wait_for_effect(driver, effect, budget=None, quiet=EFFECT_QUIET_WINDOW):
+    """
+    Espera a que el efecto armado con arm_effect ocurra y se asiente: navegación terminada,
+    peticiones en vuelo de vuelta a cero o DOM de la región sin cambios durante `quiet` segundos.
+
+    Args:
+        driver: WebDriver de Selenium
+        effect: Valor devuelto por arm_effect
+        budget: Tiempo máximo de espera en segundos (default: timeout aprendido de las cargas del dominio)
+        quiet: Segundos sin actividad para dar el efecto por asentado (default: EFFECT_QUIET_WINDOW)
+
+    Returns:
+        str: 'navigated', 'routed', 'network', 'mutation' o 'timeout'
+    """
+    if budget is None:
+        budget = get_timeout(effect['url'], LOAD)
+    start = time.monotonic()
+    try:
+        outcome = driver.execute_async_script(
+            _WAIT_EFFECT_SCRIPT, effect['token'], effect['kind'], quiet, budget)
+    except WebDriverException as e:
+        # El documento se descargó mientras se esperaba: la navegación ya empezó
+        logging.debug(f"Documento descargado durante la espera del efecto: {e}")
+        outcome = 'unloaded'
+
+    if outcome == 'unloaded':
+        invalidate_element_cache(driver)
+        remaining = max(budget - (time.monotonic() - start), 0.1)
+        try:
+            WebDriverWait(driver, remaining, poll_frequency=0.05,
+                          ignored_exceptions=(WebDriverException,)).until(
+                lambda d: d.execute_script(_NEW_DOCUMENT_SCRIPT, effect['token']))
+            outcome = 'navigated'
+            record_latency(driver.current_url, LOAD, time.monotonic() - start)
+        except WebDriverException:
+            outcome = 'timeout'
+
+    elapsed = time.monotonic() - start
+    _record('effect', elapsed, 0)
+    if outcome == 'timeout':
+        logging.warning(f"⚠️ No se detectó el efecto '{effect['kind']}' en {elapsed:.2f}s")
+    else:
+        logging.debug(f"Efecto '{outcome}' asentado en {elapsed:.2f}s")
+    return outcome
+
+
+def wait_for_activity(driver, effect, budget=SETTLE_BUDGET):
+    """
+    Espera a la primera señal de que la página reaccionó al efecto armado con arm_effect
+    (navegación, cambio de URL, una petición o un cambio del DOM), sin esperar a que se asiente.
+
+    Args:
+        driver: WebDriver de Selenium
+        effect: Valor devuelto por arm_effect
+        budget: Tiempo máximo de espera en segundos
+
+    Returns:
+        str: 'unloaded', 'routed', 'network', 'mutation' o 'timeout' (ninguna actividad)
+    """
+    start = time.monotonic()
+    try:
+        outcome = driver.execute_async_script(_ACTIVITY_SCRIPT, effect['token'], budget)
+    except WebDriverException as e:
+        logging.debug(f"Documento descargado durante la espera de actividad: {e}")
+        outcome = 'unloaded'
+    if outcome == 'unloaded':
+        invalidate_element_cache(driver)
+    _record('effect', time.monotonic() - start, 0)
+    return outcome
+
+
+def get_settle_stats():
+    """
+    Devuelve, por acción, cuántas esperas se hicieron, el tiempo real esperado
+    y el tiempo ahorrado frente a las pausas fijas anteriores.
+
+    Returns:
+        dict: {accion: {'waits', 'elapsed', 'saved'}}
+    """
+    with _lock:
+        return {action: dict(values) for action, values in _settle_stats.items()}
+
+
+def _settle(driver, kind, element, expected, budget, replaces, action):
+    start = time.monotonic()
+    try:
+        settled = bool(driver.execute_async_script(
+            _SETTLE_SCRIPT, kind, element, expected, budget))
+    except Exception as e:
+        logging.debug(f"Espera '{kind}' no disponible: {e}")
+        settled = False
+    elapsed = time.monotonic() - start
+    _record(action, elapsed, replaces)
+
+    if not settled:
+        logging.debug(f"Espera '{kind}' agotó el presupuesto ({elapsed:.2f}s)")
+    return settled
+
+
+def _record(action, elapsed, replaces):
+    with _lock:
+        stats = _settle_stats.setdefault(action or 'other', {'waits': 0, 'elapsed': 0.0, 'saved': 0.0})
+        stats['waits'] += 1
+        stats['elapsed'] += elapsed
+        stats['saved'] += max(replaces - elapsed, 0)
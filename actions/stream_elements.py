@@ -0,0 +1,199 @@
+import inspect
+import json
+import logging
+import time
+from utils.config import PAGE_MAX_TIMEOUT
+from utils.error import messageError
+from actions.extract_elements import normalize_selector, parse_fields
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Instala (una vez por documento) un MutationObserver que cuenta los nodos añadidos que son
+# (o contienen) filas del selector y despierta a los scripts asíncronos que esperan contenido nuevo.
+# Otros cambios (spinners, avisos...) no cuentan. arguments: selector, es_xpath
+_OBSERVER_SCRIPT = """
+    if (!window.__sqStream) {
+        var state = {mutations: 0, waiters: [], selector: null, isXpath: false};
+        var isRow = function(node) {
+            if (node.nodeType !== 1) return false;
+            if (state.isXpath) {
+                // XPath no permite comprobar un nodo suelto: se mira si hay filas sin procesar
+                var result = document.evaluate(state.selector, document, null,
+                    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                for (var i = 0; i < result.snapshotLength; i++) {
+                    if (!result.snapshotItem(i).hasAttribute('data-sq-seen')) return true;
+                }
+                return false;
+            }
+            return node.matches(state.selector) || !!node.querySelector(state.selector);
+        };
+        new MutationObserver(function(records) {
+            for (var i = 0; i < records.length; i++) {
+                var added = records[i].addedNodes;
+                for (var j = 0; j < added.length; j++) {
+                    if (isRow(added[j])) {
+                        state.mutations++;
+                        var waiters = state.waiters;
+                        state.waiters = [];
+                        waiters.forEach(function(w) { w(); });
+                        return;
+                    }
+                }
+            }
+        }).observe(document.documentElement, {childList: true, subtree: true});
+        window.__sqStream = state;
+    }
+    window.__sqStream.selector = arguments[0];
+    window.__sqStream.isXpath = arguments[1];
+    return window.__sqStream.mutations;
+"""
+
+# Devuelve las filas de los elementos aún no procesados, los marca y opcionalmente los elimina del DOM
+# arguments: selector, es_xpath, campos, max_filas, podar
+_HARVEST_SCRIPT = """
+    var selector = arguments[0], isXpath = arguments[1], fields = arguments[2];
+    var max = arguments[3], prune = arguments[4];
+
+    var nodes = [];
+    if (isXpath) {
+        var snapshot = document.evaluate(selector, document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            nodes.push(snapshot.snapshotItem(i));
+        }
+    } else {
+        nodes = Array.prototype.slice.call(document.querySelectorAll(selector));
+    }
+
+    var rows = [], last = null;
+    for (var n = 0; n < nodes.length && (!max || rows.length < max); n++) {
+        var node = nodes[n];
+        if (node.hasAttribute('data-sq-seen')) continue;
+        var row = {};
+        for (var f = 0; f < fields.length; f++) {
+            var name = fields[f][0], sub = fields[f][1], attr = fields[f][2];
+            var target = sub ? node.querySelector(sub) : node;
+            if (!target) {
+                row[name] = null;
+            } else if (attr) {
+                row[name] = target.getAttribute(attr);
+            } else {
+                row[name] = target.textContent.replace(/\\s+/g, ' ').trim();
+            }
+        }
+        node.setAttribute('data-sq-seen', '1');
+        rows.push(row);
+        last = node;
+    }
+
+    // Lleva el último elemento al viewport para disparar la carga del siguiente bloque
+    if (last) last.scrollIntoView({block: 'end'});
+    else window.scrollTo(0, document.documentElement.scrollHeight);
+
+    if (prune) {
+        nodes.forEach(function(node) {
+            if (node.hasAttribute('data-sq-seen') && node !== last) node.remove();
+        });
+    }
+    return rows;
+"""
+
+# Espera (asíncrono) a que el observer registre filas nuevas o a que venza el timeout
+_WAIT_SCRIPT = """
+    var done = arguments[arguments.length - 1];
+    var before = arguments[0], timeout = arguments[1] * 1000;
+    var state = window.__sqStream;
+    if (!state) { done('navigated'); return; }
+    if (state.mutations > before) { done('mutated'); return; }
+    var timer = setTimeout(function() { done('timeout'); }, timeout);
+    state.waiters.push(function() { clearTimeout(timer); done('mutated'); });
+"""
+
+
+def stream_extract(driver, selector, fields, key=None, next_locator=None, max_items=None,
+                   max_pages=None, prune=False, wait_timeout=PAGE_MAX_TIMEOUT):
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Selector: {selector}")
+    """
+    Generador que extrae filas de listados paginados o con scroll infinito de forma incremental
+
+    Los elementos ya procesados se marcan en el DOM (data-sq-seen) para no volver a leerlos,
+    y el contenido nuevo se detecta con un MutationObserver en lugar de pausas fijas.
+
+    Args:
+        driver: WebDriver de Selenium
+        selector: Selector CSS (str) o locator (By.CSS_SELECTOR | By.XPATH, valor) de cada fila
+        fields: Diccionario {nombre: especificación} (ver actions.extract_elements.extract)
+        key: Campo que identifica cada fila para descartar duplicados (default: la fila completa)
+        next_locator: Locator del botón "siguiente". Si es None se usa scroll infinito
+        max_items: Número máximo de filas a devolver
+        max_pages: Número máximo de avances de página/scroll
+        prune: Si eliminar del DOM los elementos ya procesados (memoria plana en listas enormes)
+        wait_timeout: Segundos sin filas nuevas tras un avance (clic o scroll) antes de dar por
+            terminado el listado
+
+    Yields:
+        dict: Una fila por elemento nuevo
+
+    Raises:
+        messageError: Si la extracción falla
+    """
+    try:
+        by, value = normalize_selector(selector)
+        is_xpath = by == By.XPATH
+        field_specs = parse_fields(fields)
+        seen_keys = set()
+        produced = 0
+        pages = 0
+        deadline = None
+
+        while True:
+            mutations = driver.execute_script(_OBSERVER_SCRIPT, value, is_xpath)
+            remaining = max_items - produced if max_items else 0
+            rows = driver.execute_script(
+                _HARVEST_SCRIPT, value, is_xpath, field_specs, remaining, prune)
+
+            for row in rows:
+                row_key = row.get(key) if key else json.dumps(row, sort_keys=True)
+                if row_key in seen_keys:
+                    continue
+                seen_keys.add(row_key)
+                produced += 1
+                yield row
+                if max_items and produced >= max_items:
+                    return
+
+            if not rows and deadline is not None and time.monotonic() < deadline:
+                # El último avance aún no trae filas (p.ej. un spinner): seguir esperando
+                pass
+            elif not rows and deadline is not None:
+                logging.info(f"Sin filas nuevas en {wait_timeout}s: fin del listado")
+                return
+            else:
+                if max_pages is not None and pages >= max_pages:
+                    return
+                if next_locator:
+                    next_buttons = driver.find_elements(*next_locator)
+                    if not next_buttons:
+                        logging.info("No hay más páginas")
+                        return
+                    driver.execute_script("arguments[0].click();", next_buttons[0])
+                # En scroll infinito el avance es el scroll que hace _HARVEST_SCRIPT
+                deadline = time.monotonic() + wait_timeout
+                pages += 1
+
+            try:
+                outcome = driver.execute_async_script(
+                    _WAIT_SCRIPT, mutations, max(deadline - time.monotonic(), 0))
+            except WebDriverException:
+                # El documento se descargó mientras esperábamos: navegación completa
+                outcome = 'navigated'
+
+            if outcome == 'navigated':
+                # El documento nuevo no tiene el observer instalado
+                WebDriverWait(driver, wait_timeout).until(lambda d: d.execute_script(
+                    "return !window.__sqStream && document.readyState === 'complete'"))
+
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
@@ -8,7 +8,13 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from utils.config import PAGE_MAX_TIMEOUT, BASE_URL, DOWNLOAD_DIR, has_display
+from actions.capture_screenshot import capture_step
+from actions.element_cache import discard_element_cache
+from actions.page_helpers import discard_helpers
+from utils.adaptive_timeout import get_timeout
+from utils.config import ADAPTIVE_TIMEOUTS, PAGE_MAX_TIMEOUT, BASE_URL, DOWNLOAD_DIR, has_display
+from utils.logging_config import update_request_context
+from utils.retry import RetryPolicy, check_circuit
 from selenium_stealth import stealth
 
 import psutil
@@ -66,6 +72,10 @@ def get_page(browser='chrome', url=BASE_URL):
     logging.info(
         f"START || {inspect.currentframe().f_code.co_name} - Browser: {browser}, URL: {url}")
 
+    # Fail fast before starting a browser if the target site is failing. Does not take the
+    # half-open probe: RetryPolicy.call below takes it for driver.get
+    check_circuit(url, claim=False)
+
     if browser == 'firefox':
         driver = get_driver_firefox()
     else:
@@ -80,22 +90,35 @@ def get_page(browser='chrome', url=BASE_URL):
             renderer="Intel Iris OpenGL Engine",
             fix_hairline=True,
         )
+    # Los registros de la petición llevan a partir de aquí el navegador y la sesión del driver
+    update_request_context(browser=browser, driver_id=driver.session_id[:8] if driver.session_id else None)
     logging.info('Getting URL')
 
-    driver.get(url)
+    try:
+        # Retries timeouts/connection errors with backoff and feeds the domain circuit breaker
+        RetryPolicy().call(driver.get, url, url=url)
+    except Exception:
+        driver.quit()
+        raise
+    capture_step(driver, 'get_driver')
     return driver
 
 
-def get_wait(driver):
-    # Return wait function
+def get_wait(driver, locator=None, url=None):
+    # Return wait function. With ADAPTIVE_TIMEOUTS the timeout is learned per domain/locator
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
-    return WebDriverWait(driver, PAGE_MAX_TIMEOUT)
+    if not ADAPTIVE_TIMEOUTS:
+        return WebDriverWait(driver, PAGE_MAX_TIMEOUT)
+    return WebDriverWait(driver, get_timeout(url or driver.current_url, locator))
 
 
 def close_driver(driver):
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
     if driver:
+        discard_element_cache(driver)
+        discard_helpers(driver)
         driver.quit()
+        update_request_context(browser=None, driver_id=None)
 
 
 # This function, kill all chrome process
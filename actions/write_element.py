@@ -1,38 +1,154 @@
 
 import inspect
 import logging
-import random
-from time import sleep
+import time
+from actions.capture_screenshot import capture_step
+from actions.page_helpers import call_helper, make_element_interactable
+from actions.settle import wait_for_element_stable, wait_for_scroll_end, wait_for_value
+from utils.config import SETTLE_BUDGET, STRATEGY_MEMORY, TYPING_MAX_DURATION
 from utils.error import messageError
+from utils.retry import RetryPolicy
+from utils.strategy_memory import order_methods, record_outcome, strategy_key
+from utils.typing_model import build_keystroke_delays
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import (
-    ElementNotInteractableException,
-    StaleElementReferenceException,
-    InvalidElementStateException
-)
+from selenium.common.exceptions import StaleElementReferenceException
 
 
-def _human_typing_delay(min_delay=0.05, max_delay=2):
+def _type_like_human(driver, element, text, max_duration=TYPING_MAX_DURATION):
     """
-    Sleep for a random delay to simulate human typing.
+    Type text with human-like timing (see utils/typing_model.py).
+
+    All keystrokes and pauses are scheduled up front in a single ActionChains
+    sequence and sent with one perform(): the browser applies the pauses, so there
+    are no Python-side sleeps and the total time never exceeds max_duration.
     """
-    sleep(random.uniform(min_delay, max_delay))
+    driver.execute_script("arguments[0].focus();", element)
+    actions = ActionChains(driver)
+    for char, delay in zip(text, build_keystroke_delays(text, max_duration)):
+        if delay:
+            actions.pause(delay)
+        actions.send_keys(char)
+    actions.perform()
+
+
+def _type_text(driver, element, text, slow):
+    if slow:
+        _type_like_human(driver, element, text)
+    else:
+        element.send_keys(text)
+
+
+def _is_written(element, text):
+    # Verify that it was written correctly
+    current_value = element.get_attribute('value')
+    return bool(current_value and text in current_value)
+
+
+def _write_basic(driver, element, text, clear, slow, budget):
+    # Basic scroll + Actionchains con move_to_element (original method)
+    driver.execute_script("arguments[0].scrollIntoView(true);", element)
+    actions = ActionChains(driver)
+    actions.move_to_element(element).perform()
+
+    if clear:
+        element.clear()
+    _type_text(driver, element, text, slow)
+    return _is_written(element, text)
+
+
+def _write_actions(driver, element, text, clear, slow, budget):
+    # send_keys con ActionChains mejorado
+    actions = ActionChains(driver)
+    actions.move_to_element(element).perform()
+    wait_for_element_stable(driver, element, budget, replaces=0.1, action='write')
+
+    if clear:
+        element.clear()
+        wait_for_value(driver, element, '', budget, replaces=0.1, action='write')
+    _type_text(driver, element, text, slow)
+    return _is_written(element, text)
+
+
+def _write_direct(driver, element, text, clear, slow, budget):
+    # send_keys directo
+    if clear:
+        element.clear()
+        wait_for_value(driver, element, '', budget, replaces=0.1, action='write')
+    _type_text(driver, element, text, slow)
+    return _is_written(element, text)
+
+
+def _write_javascript(driver, element, text, clear, slow, budget):
+    # JavaScript para establecer valor
+    call_helper(driver, 'setValue', element, text, ['input', 'change', 'keyup', 'blur'])
+    return _is_written(element, text)
+
+
+def _write_actions_clear(driver, element, text, clear, slow, budget):
+    # ActionChains avanzado con limpieza
+    actions = ActionChains(driver)
+    actions.click(element).perform()
+    wait_for_element_stable(driver, element, budget, replaces=0.2, action='write')
+
+    if clear:
+        actions.key_down(Keys.CONTROL).send_keys(
+            'a').key_up(Keys.CONTROL).perform()
+
+    if slow:
+        _type_like_human(driver, element, text)
+    else:
+        actions.send_keys(text).perform()
+    return _is_written(element, text)
+
+
+def _write_focus_type(driver, element, text, clear, slow, budget):
+    # Focus y tipo carácter por carácter
+    driver.execute_script("arguments[0].focus();", element)
+
+    if clear:
+        driver.execute_script(
+            "arguments[0].value = '';", element)
+
+    if slow:
+        _type_like_human(driver, element, text)
+    else:
+        for char in text:
+            element.send_keys(char)
+    return _is_written(element, text)
+
+
+# Escalera de métodos en su orden por defecto. Los avanzados requieren preparar el elemento antes
+_WRITE_METHODS = {
+    'basic': _write_basic,
+    'actions': _write_actions,
+    'direct': _write_direct,
+    'javascript': _write_javascript,
+    'actions_clear': _write_actions_clear,
+    'focus_type': _write_focus_type
+}
 
 
 # This function searches for an element on the page, scrolls to it, and writes to it with multiple fallback strategies.
-def write_element(driver, element, text, clear=True, slow=False, max_attempts=3):
+def write_element(driver, element, text, clear=True, slow=False, max_attempts=3, locator=None, settle_budget=SETTLE_BUDGET,
+                  retry_policy=None):
     logging.info(f"START || {inspect.currentframe().f_code.co_name} - Element: {element}, Text: {text}")
     """
     Segrating text safely to an element with multiple Fallback strategies
 
+    The order of the methods adapts to the site: it starts with the one that has worked best
+    for the domain and locator (see utils/strategy_memory.py).
+
     Args:
         driver: WebDriver de Selenium
         element: Elemento donde escribir
         text: Texto a escribir
         clear: Si limpiar el campo primero (default: True)
-        slow: Si escribir carácter por carácter (default: False)
+        slow: Si escribir como una persona, con un tiempo total máximo de TYPING_MAX_DURATION (default: False)
         max_attempts: Número máximo de intentos (default: 3)
+        locator: Locator (By, valor) del elemento, para recordar el método por elemento (opcional)
+        settle_budget: Segundos máximos de cada espera a que el elemento se asiente (default: SETTLE_BUDGET)
+        retry_policy: RetryPolicy para los reintentos (default: backoff de utils/retry.py con max_attempts)
 
     Returns:
         driver: WebDriver actualizado
@@ -42,52 +158,16 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
     """
     try:
 
-        # PASO 1: Try first basic method (Send_keys simple)
-        try:
-
-            # Verify that the element is available
-            element.is_displayed()
+        memory_key = strategy_key('write', driver.current_url, locator) if STRATEGY_MEMORY else None
+        methods = order_methods(memory_key, list(_WRITE_METHODS))
 
-            # Basic scroll to the element
-            driver.execute_script(
-                "arguments[0].scrollIntoView(true);", element)
-
-            # Basic Actionchainns Con Move_to_Element (Original Method)
-            actions = ActionChains(driver)
-            actions.move_to_element(element).perform()
-
-            if clear:
-                element.clear()
-
-            if slow:
-                for char in text:
-                    element.send_keys(char)
-                    _human_typing_delay()
-            else:
-                element.send_keys(text)
-
-            # Verify that it was written correctly
-            current_value = element.get_attribute('value')
-            if current_value and text in current_value:
-
-                return driver
-            else:
-                logging.debug(
-                    "⚠️ Basic method did not verify correctly, moving to advanced methods")
-
-        except (ElementNotInteractableException, InvalidElementStateException, StaleElementReferenceException) as e:
-            logging.debug(
-                f"⚠️ Basic method failed: {e}, moving to advanced methods")
-        except Exception as e:
-            logging.debug(
-                f"⚠️ Unexpected error in basic method: {e}, moving to advanced methods")
-
-        # PASO 2: If the basic method fails, use advanced methods with make_element_interactable
-
-        for attempt in range(max_attempts):
+        policy = retry_policy or RetryPolicy(max_attempts=max_attempts)
+        for attempt in range(policy.max_attempts):
+            last_error = None
             try:
-                logging.info(
-                    f"🔄 Intento avanzado {attempt + 1}/{max_attempts}")
+                if attempt > 0:
+                    logging.info(
+                        f"🔄 Intento avanzado {attempt + 1}/{policy.max_attempts}")
 
                 # Verificar que el elemento sigue siendo válido
                 try:
@@ -97,156 +177,50 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
                         "Elemento obsoleto detectado, saltando intento")
                     continue
 
-                # Scroll al elemento con JavaScript más robusto
-                try:
-                    driver.execute_script("""
-                        arguments[0].scrollIntoView({
-                            behavior: 'smooth', 
-                            block: 'center',
-                            inline: 'center'
-                        });
-                    """, element)
-                    sleep(0.5)
-                except Exception as e:
-                    logging.warning(f"Error en scroll avanzado: {e}")
-
-                # Habilitar elemento usando make_element_interactable
-                make_element_interactable(driver, element)
-                sleep(0.2)
-
-                # Método 1: send_keys con ActionChains mejorado
-                try:
-                    actions = ActionChains(driver)
-                    actions.move_to_element(element).perform()
-                    sleep(0.1)
-
-                    if clear:
-                        element.clear()
-                        sleep(0.1)
-
-                    if slow:
-                        for char in text:
-                            element.send_keys(char)
-                            _human_typing_delay()
-                    else:
-                        element.send_keys(text)
-
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
-                        logging.info(
-                            "✅ Escritura avanzada con ActionChains exitosa")
-                        return driver
-
-                except (ElementNotInteractableException, InvalidElementStateException) as e:
-                    logging.debug(f"ActionChains avanzado falló: {e}")
-
-                # Método 2: send_keys directo
-                try:
-                    if clear:
-                        element.clear()
-                        sleep(0.1)
-
-                    if slow:
-                        for char in text:
-                            element.send_keys(char)
-                            _human_typing_delay()
-                    else:
-                        element.send_keys(text)
-
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
-                        return driver
-
-                except (ElementNotInteractableException, InvalidElementStateException) as e:
-                    logging.debug(f"Send_keys directo avanzado falló: {e}")
-
-                # Método 3: JavaScript para establecer valor
-                try:
-                    driver.execute_script("""
-                        var element = arguments[0];
-                        var text = arguments[1];
-                        
-                        element.value = text;
-                        
-                        // Disparar eventos
-                        var events = ['input', 'change', 'keyup', 'blur'];
-                        events.forEach(function(eventType) {
-                            var event = new Event(eventType, { bubbles: true, cancelable: true });
-                            element.dispatchEvent(event);
-                        });
-                    """, element, text)
-
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
-                        return driver
-
-                except Exception as e:
-                    logging.debug(f"JavaScript setValue falló: {e}")
-
-                # Método 4: ActionChains avanzado con limpieza
-                try:
-                    actions = ActionChains(driver)
-                    actions.click(element).perform()
-                    sleep(0.2)
-
-                    if clear:
-                        actions.key_down(Keys.CONTROL).send_keys(
-                            'a').key_up(Keys.CONTROL).perform()
-                        sleep(0.1)
-
-                    if slow:
-                        for char in text:
-                            actions.send_keys(char).perform()
-                            _human_typing_delay()
-                    else:
-                        actions.send_keys(text).perform()
-
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
-                        return driver
-
-                except Exception as e:
-                    logging.debug(f"ActionChains con limpieza falló: {e}")
-
-                # Método 5: Focus y tipo carácter por carácter
-                try:
-                    driver.execute_script("arguments[0].focus();", element)
-                    sleep(0.1)
-
-                    if clear:
-                        driver.execute_script(
-                            "arguments[0].value = '';", element)
-
-                    for char in text:
-                        element.send_keys(char)
-                        if slow:
-                            _human_typing_delay()
-                        else:
-                            sleep(0.01)
-
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
-                        return driver
-
-                except Exception as e:
-                    logging.debug(f"Focus y tipo carácter falló: {e}")
+                prepared = False
+                for name in methods:
+                    # The basic method is only tried on the first round
+                    if name == 'basic' and attempt > 0:
+                        continue
+                    if name != 'basic' and not prepared:
+                        _prepare_element(driver, element, settle_budget)
+                        prepared = True
+                    try:
+                        if _WRITE_METHODS[name](driver, element, text, clear, slow, settle_budget):
+                            if name != 'basic':
+                                logging.info(f"✅ Escritura con método '{name}'")
+                            record_outcome(memory_key, name, True)
+                            capture_step(driver, 'write')
+                            return driver
+                        logging.debug(f"Método de escritura '{name}' no verificó correctamente")
+                    except StaleElementReferenceException:
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        logging.debug(f"Método de escritura '{name}' falló: {e}")
+                    record_outcome(memory_key, name, False)
 
                 # Si llegamos aquí, todos los métodos fallaron en este intento
                 logging.warning(
                     f"⚠️ Todos los métodos avanzados fallaron en intento {attempt + 1}")
 
-                if attempt < max_attempts - 1:  # Si no es el último intento
-                    sleep(1)  # Esperar antes del siguiente intento
+                if not policy.should_retry(last_error, attempt):
+                    break
+                # Esperar a que el elemento se asiente y completar el backoff de la política
+                _backoff(driver, element, policy, attempt, last_error)
 
-            except StaleElementReferenceException:
+            except StaleElementReferenceException as e:
                 logging.warning(
                     "Elemento obsoleto durante escritura avanzada, continuando...")
+                if not policy.should_retry(e, attempt):
+                    break
                 continue
             except Exception as e:
                 logging.warning(
                     f"Error inesperado en intento avanzado {attempt + 1}: {e}")
-                if attempt < max_attempts - 1:
-                    sleep(1)
+                if not policy.should_retry(e, attempt):
+                    break
+                _backoff(driver, element, policy, attempt, e)
                 continue
 
         # Si llegamos aquí, todos los intentos fallaron
@@ -259,89 +233,25 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
             f"Error {inspect.currentframe().f_code.co_name}: {e}")
 
 
-def make_element_interactable(driver, element):
-    """
-    Try to make an interactable element by removing common restrictions
+def _backoff(driver, element, policy, attempt, error):
+    # La espera de estabilidad vuelve en cuanto el elemento está quieto: se duerme el resto del backoff
+    delay = policy.delay(attempt, error)
+    if delay:
+        start = time.monotonic()
+        wait_for_element_stable(driver, element, delay, replaces=1, action='write')
+        remaining = delay - (time.monotonic() - start)
+        if remaining > 0:
+            time.sleep(remaining)
 
-    ARGS:
-        Driver: Webdriver of Selenium
-        Element: Web element to be interactable
 
-    Returns:
-        BOOL: True if the element was successfully enabled
-    """
+def _prepare_element(driver, element, settle_budget=SETTLE_BUDGET):
+    # Scroll al elemento con JavaScript más robusto
     try:
-        logging.debug("Intentando hacer elemento interactuable para escritura")
-
-        # Script para habilitar elemento
-        result = driver.execute_script("""
-            var element = arguments[0];
-            
-            try {
-                // Quitar atributos restrictivos
-                element.removeAttribute('disabled');
-                element.removeAttribute('readonly');
-                element.disabled = false;
-                element.readOnly = false;
-                
-                // Quitar clases que pueden bloquear interacción
-                var restrictiveClasses = [
-                    'disabled', 'readonly', 'not-allowed', 'pointer-events-none',
-                    'dp__input_readonly', 'dp__pointer', 'dp__disabled'
-                ];
-                
-                restrictiveClasses.forEach(function(className) {
-                    element.classList.remove(className);
-                });
-                
-                // Habilitar estilos
-                element.style.pointerEvents = 'auto';
-                element.style.cursor = 'auto';
-                element.style.opacity = '1';
-                element.style.visibility = 'visible';
-                element.style.display = 'block';
-                
-                // Si es un input, asegurar que sea de tipo text
-                if (element.tagName.toLowerCase() === 'input') {
-                    if (element.getAttribute('inputmode') === 'none') {
-                        element.setAttribute('inputmode', 'text');
-                    }
-                    if (!element.type || element.type === 'hidden') {
-                        element.setAttribute('type', 'text');
-                    }
-                }
-                
-                // Habilitar contenedores padre que puedan estar bloqueando
-                var parent = element.parentElement;
-                var levels = 0;
-                while (parent && levels < 5) {
-                    parent.removeAttribute('disabled');
-                    parent.disabled = false;
-                    parent.style.pointerEvents = 'auto';
-                    
-                    restrictiveClasses.forEach(function(className) {
-                        parent.classList.remove(className);
-                    });
-                    
-                    parent = parent.parentElement;
-                    levels++;
-                }
-                
-                return true;
-                
-            } catch (error) {
-                console.error('Error habilitando elemento:', error);
-                return false;
-            }
-        """, element)
-
-        if result:
-            logging.debug("Elemento habilitado exitosamente para escritura")
-            return True
-        else:
-            logging.warning("No se pudo habilitar el elemento para escritura")
-            return False
-
+        call_helper(driver, 'scrollIntoView', element, 'smooth')
+        wait_for_scroll_end(driver, element, settle_budget, replaces=0.5, action='write')
     except Exception as e:
-        logging.error(f"Error en make_element_interactable: {e}")
-        return False
+        logging.warning(f"Error en scroll avanzado: {e}")
+
+    # Habilitar elemento usando make_element_interactable
+    make_element_interactable(driver, element)
+    wait_for_element_stable(driver, element, settle_budget, replaces=0.2, action='write')
@@ -207,8 +207,9 @@ def controller_test(data=None):
                         search_input = search_element(
                             driver,
                             (By.CSS_SELECTOR, 'input[name="q"]'),
-                            wait_to_search=True,
-                            raise_exception=False
+                            raise_exception=False,
+                            probe=True,
+                            cache=True
                         )
                         if search_input:
                             logging.info(
@@ -249,8 +250,9 @@ def controller_test(data=None):
                         search_input = search_element(
                             driver,
                             (By.CSS_SELECTOR, 'input[name="q"]'),
-                            wait_to_search=True,
-                            raise_exception=False
+                            raise_exception=False,
+                            probe=True,
+                            cache=True
                         )
                         if search_input:
                             test_text = "Selenium WebDriver Test"
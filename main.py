@@ -1,7 +1,7 @@
 from flask import Flask, jsonify
 from controller.controller_sample import controller_sample
 from controller.controller_test import controller_test
-from utils.handle_request import handle_request_endpoint
+from utils.handle_request import handle_logs_endpoint, handle_request_endpoint
 from utils.config import PORT, STAGE
 
 def create_app():
@@ -41,6 +41,23 @@ def create_app():
             app.logger.error("An error occurred: %s", str(e))
             return jsonify(error="An internal error has occurred."), 500
 
+    @app.route('/logs', methods=['GET'])
+    def logs_endpoint():
+        """
+        Consulta de logs (requiere token). Devuelve los registros en texto plano.
+
+        Parámetros (query string):
+        - start / end: Rango de fechas ISO (ej. 2025-01-01T10:00:00)
+        - request_id: Id de la petición (cabecera X-Request-ID de la respuesta)
+        - level: Nivel mínimo (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        - limit: Número máximo de registros
+        """
+        try:
+            return handle_logs_endpoint()
+        except Exception as e:
+            app.logger.error("An error occurred: %s", str(e))
+            return jsonify(error="An internal error has occurred."), 500
+
     # TODO: Add more endpoints here as needed
     return app
 
@@ -0,0 +1,37 @@
+"""
+Fixtures compartidas por las pruebas
+"""
+from types import SimpleNamespace
+import pytest
+import utils.adaptive_timeout as at
+import utils.retry as retry
+import utils.strategy_memory as sm
+
+
+@pytest.fixture
+def isolated_state(tmp_path, monkeypatch):
+    """
+    Estado por proceso vacío en cada test: timeouts adaptativos y memoria de estrategias en
+    ficheros temporales, circuitos sin historial y reintentos sin esperas reales
+
+    Yields:
+        SimpleNamespace: timeouts_file y strategies_file (rutas de los ficheros temporales)
+    """
+    timeouts_file = tmp_path / "timeouts.json"
+    monkeypatch.setattr(at, 'ADAPTIVE_TIMEOUT_FILE', str(timeouts_file))
+    monkeypatch.setattr(at, 'ADAPTIVE_TIMEOUTS', True)
+    monkeypatch.setattr(at, '_samples', None)
+    monkeypatch.setattr(at, '_pending', {})
+    monkeypatch.setattr(at, '_last_save', 0.0)
+
+    strategies_file = tmp_path / "strategies.json"
+    monkeypatch.setattr(sm, 'STRATEGY_MEMORY_FILE', str(strategies_file))
+    monkeypatch.setattr(sm, 'STRATEGY_MEMORY', True)
+    monkeypatch.setattr(sm, '_memory', None)
+    monkeypatch.setattr(sm, '_pending', {})
+    monkeypatch.setattr(sm, '_last_save', 0.0)
+
+    monkeypatch.setattr(retry, '_breakers', {})
+    monkeypatch.setattr(retry, 'CIRCUIT_BREAKER', True)
+    monkeypatch.setattr(retry.time, 'sleep', lambda seconds: None)
+    yield SimpleNamespace(timeouts_file=timeouts_file, strategies_file=strategies_file)
@@ -0,0 +1,146 @@
+"""
+Pruebas para el archivo adaptive_timeout.py
+"""
+from utils.config import (
+    ADAPTIVE_TIMEOUT_CEILING,
+    ADAPTIVE_TIMEOUT_FLOOR,
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    PAGE_MAX_TIMEOUT
+)
+import utils.adaptive_timeout as at
+import json
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+pytestmark = pytest.mark.usefixtures('isolated_state')
+
+
+def test_default_timeout_without_samples():
+    """Sin muestras se usa PAGE_MAX_TIMEOUT"""
+    assert at.get_timeout('https://example.com/page') == PAGE_MAX_TIMEOUT
+
+
+def test_timeout_learned_from_samples():
+    """Con suficientes muestras el timeout sigue la latencia observada"""
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        at.record_latency('https://slow.example.com/a', None, 10)
+
+    timeout = at.get_timeout('https://slow.example.com/b')
+    assert timeout > PAGE_MAX_TIMEOUT
+    assert timeout <= ADAPTIVE_TIMEOUT_CEILING
+
+
+def test_timeout_respects_floor_and_ceiling():
+    """El timeout nunca baja del suelo ni supera el techo"""
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        at.record_latency('https://fast.example.com', None, 0.01)
+        at.record_latency('https://portal.example.com', None, 1000)
+
+    assert at.get_timeout('https://fast.example.com') == ADAPTIVE_TIMEOUT_FLOOR
+    assert at.get_timeout('https://portal.example.com') == ADAPTIVE_TIMEOUT_CEILING
+
+
+def test_locator_falls_back_to_domain():
+    """Un locator sin muestras propias usa las del dominio"""
+    locator = ('css selector', '#result')
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        at.record_latency('https://example.com', locator, 4)
+
+    assert at.get_timeout('https://example.com', locator) == \
+        at.get_timeout('https://example.com', ('css selector', '#other'))
+
+
+def test_failures_increase_timeout():
+    """Los timeouts fallidos hacen crecer el timeout aprendido del locator"""
+    locator = ('css selector', '#lento')
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        at.record_latency('https://example.com', locator, 5, success=False)
+
+    assert at.get_timeout('https://example.com', locator) > PAGE_MAX_TIMEOUT
+
+
+def test_failures_do_not_raise_domain_timeout():
+    """Un elemento que suele faltar no sube el timeout del resto de elementos del dominio"""
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        at.record_latency('https://example.com', ('css selector', '#ok'), 1)
+        at.record_latency('https://example.com', ('css selector', '#opcional'), 10, success=False)
+        at.record_latency('https://example.com', None, 10, success=False)
+
+    assert at.get_timeout('https://example.com', ('css selector', '#otro')) == ADAPTIVE_TIMEOUT_FLOOR
+    assert 'example.com' in at._samples and len(at._samples['example.com']) == ADAPTIVE_TIMEOUT_MIN_SAMPLES
+
+
+def test_samples_persist_across_restarts(isolated_state):
+    """Las muestras se guardan en disco y se recargan"""
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        at.record_latency('https://example.com', None, 12)
+    at.save_timeouts()
+    learned = at.get_timeout('https://example.com')
+
+    with open(isolated_state.timeouts_file, 'r') as f:
+        assert 'example.com' in json.load(f)
+
+    at._samples = None
+    assert at.get_timeout('https://example.com') == learned
+
+
+def test_disabled_returns_constant(monkeypatch):
+    """Con ADAPTIVE_TIMEOUTS desactivado siempre se usa PAGE_MAX_TIMEOUT"""
+    monkeypatch.setattr(at, 'ADAPTIVE_TIMEOUTS', False)
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        at.record_latency('https://example.com', None, 20)
+
+    assert at.get_timeout('https://example.com') == PAGE_MAX_TIMEOUT
+
+
+def test_element_waits_do_not_set_load_timeout():
+    """Las esperas cortas de elementos no fijan el timeout de las cargas de página"""
+    locator = ('css selector', '#row')
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES * 2):
+        at.record_latency('https://example.com', locator, 0.08)
+
+    assert at.get_timeout('https://example.com') == ADAPTIVE_TIMEOUT_FLOOR
+    assert at.get_timeout('https://example.com', at.LOAD) == PAGE_MAX_TIMEOUT
+
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        at.record_latency('https://example.com', at.LOAD, 12)
+
+    assert at.get_timeout('https://example.com', at.LOAD) > at.get_timeout('https://example.com')
+
+
+def test_save_merges_samples_from_other_workers(isolated_state):
+    """Al guardar se conservan las muestras que otro worker escribió en el fichero"""
+    # Guardado reciente: la muestra queda pendiente hasta save_timeouts
+    at._last_save = at.time.time()
+    at.record_latency('https://example.com', None, 3)
+    with open(isolated_state.timeouts_file, 'w') as f:
+        json.dump({'other.example.com': [1, 2], 'example.com': [4]}, f)
+
+    at.save_timeouts()
+
+    with open(isolated_state.timeouts_file, 'r') as f:
+        saved = json.load(f)
+    assert saved == {'other.example.com': [1, 2], 'example.com': [4, 3]}
+    assert not os.path.exists(str(isolated_state.timeouts_file) + '.lock')
+
+
+def test_failed_save_keeps_pending_samples(isolated_state, monkeypatch):
+    """Si el fichero no se puede guardar las muestras siguen pendientes para el siguiente guardado"""
+    save_state = at.save_state
+    failing = [True]
+    monkeypatch.setattr(at, 'save_state', lambda path, data: not failing[0] and save_state(path, data))
+    at._last_save = at.time.time()
+    at.record_latency('https://example.com', None, 3)
+
+    at.save_timeouts()
+    assert at._pending == {'example.com': [3]}
+
+    failing[0] = False
+    at.save_timeouts()
+    assert at._pending == {}
+    with open(isolated_state.timeouts_file, 'r') as f:
+        assert json.load(f) == {'example.com': [3]}
@@ -0,0 +1,110 @@
+"""
+Pruebas para el archivo artifact_store.py
+"""
+from utils.artifact_store import (
+    get_request_artifacts,
+    prune_artifacts,
+    put_artifact,
+    put_file
+)
+import time
+import tempfile
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+def test_put_artifact_deduplicates_content():
+    """El mismo contenido se guarda una sola vez"""
+    with tempfile.TemporaryDirectory() as root:
+        first = put_artifact(b"captura", root, kind='screenshot', ext='png')
+        second = put_artifact(b"captura", root, kind='screenshot', ext='png')
+        other = put_artifact(b"otra captura", root, kind='screenshot', ext='png')
+
+        assert first['path'] == second['path']
+        assert not first['deduplicated'] and second['deduplicated']
+        assert other['path'] != first['path']
+        assert os.path.basename(first['path']) == f"{first['sha256']}.png"
+        with open(first['path'], 'rb') as f:
+            assert f.read() == b"captura"
+
+
+def test_artifacts_indexed_by_request():
+    """Los artefactos se pueden consultar por request id"""
+    with tempfile.TemporaryDirectory() as root:
+        put_artifact(b"uno", root, name='paso 1', ext='png', request_id='req-1')
+        put_artifact(b"dos", root, name='paso 2', ext='png', request_id='req-1')
+        put_artifact(b"tres", root, ext='png', request_id='req-2')
+        put_artifact(b"sin peticion", root, ext='png', request_id='-')
+
+        artifacts = get_request_artifacts(root, 'req-1')
+
+        assert [artifact['name'] for artifact in artifacts] == ['paso 1', 'paso 2']
+        assert len(get_request_artifacts(root, 'req-2')) == 1
+        assert get_request_artifacts(root, 'desconocida') == []
+
+
+def test_put_file_moves_download():
+    """Las descargas se guardan por contenido y se puede eliminar el original"""
+    with tempfile.TemporaryDirectory() as root:
+        download = os.path.join(root, 'factura.pdf')
+        with open(download, 'wb') as f:
+            f.write(b"%PDF contenido")
+
+        artifact = put_file(download, root, request_id='req-1', move=True)
+
+        assert artifact['path'].endswith('.pdf')
+        assert not os.path.exists(download)
+        assert get_request_artifacts(root, 'req-1')[0]['name'] == 'factura.pdf'
+
+
+def test_prune_artifacts_by_age_and_size():
+    """La retención elimina primero lo antiguo y después lo usado hace más tiempo"""
+    with tempfile.TemporaryDirectory() as root:
+        old = put_artifact(b"a" * 100, root, ext='bin')
+        older_recent = put_artifact(b"b" * 100, root, ext='bin')
+        newest = put_artifact(b"c" * 100, root, ext='bin')
+        now = time.time()
+        os.utime(old['path'], (now - 10 * 86400, now - 10 * 86400))
+        os.utime(older_recent['path'], (now - 60, now - 60))
+
+        result = prune_artifacts(root, max_bytes=150, max_age_days=7)
+
+        assert result['deleted'] == 2
+        assert not os.path.exists(old['path'])
+        assert not os.path.exists(older_recent['path'])
+        assert os.path.exists(newest['path'])
+        assert result['remaining'] == 100
+
+
+def test_deduplicated_artifact_survives_retention():
+    """Volver a guardar un contenido renueva su fecha para la retención"""
+    with tempfile.TemporaryDirectory() as root:
+        artifact = put_artifact(b"repetido", root, ext='bin')
+        past = time.time() - 10 * 86400
+        os.utime(artifact['path'], (past, past))
+
+        put_artifact(b"repetido", root, ext='bin')
+
+        assert prune_artifacts(root, max_age_days=7)['deleted'] == 0
+        assert os.path.exists(artifact['path'])
+
+
+def _register_from_process(root, index):
+    put_artifact(f"captura {index}".encode(), root, ext='png', request_id='compartida')
+
+
+def test_request_index_is_not_lost_between_processes():
+    """Varios procesos añaden artefactos a la misma petición sin sobrescribirse el índice"""
+    import multiprocessing
+
+    with tempfile.TemporaryDirectory() as root:
+        processes = [multiprocessing.Process(target=_register_from_process, args=(root, i)) for i in range(8)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert len(get_request_artifacts(root, 'compartida')) == 8
+        assert not any(file.endswith('.lock') for file in os.listdir(os.path.join(root, 'requests')))
@@ -0,0 +1,97 @@
+"""
+Pruebas para el archivo capture_screenshot.py
+"""
+from utils.error import messageError
+import actions.capture_screenshot as cs
+import base64
+import pytest
+import tempfile
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+_IMAGE = b"\xff\xd8\xff fake jpeg"
+
+
+class _FakeChromeDriver:
+    """Chrome simulado: Page.captureScreenshot devuelve la imagen en base64"""
+    capabilities = {'browserName': 'chrome'}
+
+    def __init__(self, scroll=(0, 0, 1)):
+        self.commands = []
+        self.scroll = scroll
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+        if command == 'Page.getLayoutMetrics':
+            return {'cssContentSize': {'width': 1200, 'height': 5000}}
+        return {'data': base64.b64encode(_IMAGE).decode()}
+
+    def execute_script(self, script, *args):
+        return list(self.scroll)
+
+
+def test_cdp_capture_is_stored_in_background():
+    """La captura CDP se guarda en el almacén con el formato, la calidad y el recorte pedidos"""
+    driver = _FakeChromeDriver()
+    clip = {'x': 10, 'y': 20, 'width': 100, 'height': 50}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        artifact = cs.capture_screenshot(driver, format='jpeg', quality=70, clip=clip,
+                                         directory=temp_dir, name='paso').result(timeout=5)
+
+        assert artifact['path'].startswith(os.path.join(temp_dir, 'artifacts'))
+        assert artifact['path'].endswith('.jpg')
+        with open(artifact['path'], 'rb') as f:
+            assert f.read() == _IMAGE
+
+    command, params = driver.commands[-1]
+    assert command == 'Page.captureScreenshot'
+    assert params['format'] == 'jpeg' and params['quality'] == 70
+    assert params['clip'] == dict(clip, scale=1)
+
+
+def test_full_page_uses_layout_size():
+    """Con full_page el recorte es el tamaño completo del documento"""
+    driver = _FakeChromeDriver()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cs.capture_screenshot(driver, full_page=True, directory=temp_dir).result(timeout=5)
+
+    params = driver.commands[-1][1]
+    assert params['captureBeyondViewport']
+    assert params['clip'] == {'x': 0, 'y': 0, 'width': 1200, 'height': 5000, 'scale': 1}
+
+
+def test_invalid_format_and_quality_are_rejected():
+    """Los formatos y calidades no válidos fallan antes de capturar"""
+    driver = _FakeChromeDriver()
+    with pytest.raises(messageError):
+        cs.capture_screenshot(driver, format='gif')
+    with pytest.raises(messageError):
+        cs.capture_screenshot(driver, format='jpeg', quality=101)
+    assert driver.commands == []
+
+
+def test_to_image_clip_converts_document_to_image_pixels():
+    """El recorte pasa de CSS px del documento a píxeles de la imagen (scroll y devicePixelRatio)"""
+    driver = _FakeChromeDriver(scroll=(0, 300, 2))
+    clip = {'x': 10, 'y': 400, 'width': 100, 'height': 50}
+
+    assert cs._to_image_clip(driver, clip, full_page=False) == {'x': 20, 'y': 200, 'width': 200, 'height': 100}
+    assert cs._to_image_clip(driver, clip, full_page=True) == {'x': 20, 'y': 800, 'width': 200, 'height': 100}
+    assert cs._to_image_clip(driver, None, full_page=False) is None
+
+
+def test_capture_step_only_in_debug_mode(monkeypatch):
+    """Las capturas por paso solo se toman con DEBUG_SCREENSHOTS"""
+    driver = _FakeChromeDriver()
+    monkeypatch.setattr(cs, 'DEBUG_SCREENSHOTS', False)
+    assert cs.capture_step(driver, 'click') is None
+    assert driver.commands == []
+
+    monkeypatch.setattr(cs, 'DEBUG_SCREENSHOTS', True)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        artifact = cs.capture_step(driver, 'click', directory=temp_dir).result(timeout=5)
+        assert artifact['path'].endswith('.jpg')
+    assert driver.commands[-1][1]['quality'] == cs.DEBUG_SCREENSHOT_QUALITY
@@ -0,0 +1,100 @@
+"""
+Pruebas para el modo rápido de click_element.py
+"""
+import actions.click_element as ce
+import actions.page_helpers as ph
+import actions.settle as settle
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class _FakeDriver:
+    """Devuelve el resultado de __sq.fastClick y de la espera de actividad que indique el test"""
+
+    def __init__(self, click_result, activity='timeout'):
+        self.session_id = 'sesion-test'
+        self.current_url = 'https://example.com/'
+        self.click_result = click_result
+        self.activity = activity
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        if script is ph._CALL_SCRIPT:
+            self.calls.append(args[1])
+            return self.click_result
+        self.calls.append('arm' if script is settle._ARM_EFFECT_SCRIPT else 'script')
+        return None
+
+    def execute_async_script(self, script, *args):
+        self.calls.append('activity' if script is settle._ACTIVITY_SCRIPT else 'async')
+        return self.activity
+
+
+class _FakeActionChains:
+    performed = []
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def move_to_element(self, element):
+        return self
+
+    def click(self):
+        return self
+
+    def perform(self):
+        _FakeActionChains.performed.append(self.driver)
+
+
+@pytest.fixture(autouse=True)
+def isolated_clicks(monkeypatch):
+    monkeypatch.setattr(ce, '_fast_click_stats', {})
+    monkeypatch.setattr(ce, 'ActionChains', _FakeActionChains)
+    monkeypatch.setattr(_FakeActionChains, 'performed', [])
+
+
+def test_handled_click_does_not_wait():
+    """Si algo reaccionó de forma síncrona no se espera ni se repite el click"""
+    driver = _FakeDriver({'ok': True, 'handled': True, 'strategy': 'events'})
+    assert ce._fast_click(driver, 'boton')
+    assert 'activity' not in driver.calls
+    assert _FakeActionChains.performed == []
+    assert ce.get_fast_click_stats() == {'events': 1}
+
+
+@pytest.mark.parametrize('activity', ['network', 'mutation', 'routed', 'unloaded'])
+def test_any_activity_counts_as_handled(activity):
+    """Una petición o un cambio, aunque no se asiente, evita el click nativo (sin envíos dobles)"""
+    driver = _FakeDriver({'ok': True, 'handled': False, 'strategy': 'events'}, activity)
+    assert ce._fast_click(driver, 'boton')
+    assert driver.calls == ['arm', 'fastClick', 'activity']
+    assert _FakeActionChains.performed == []
+
+
+def test_no_activity_falls_back_to_native_click():
+    """Sin ninguna actividad la página ignoró los eventos sintéticos: click nativo"""
+    driver = _FakeDriver({'ok': True, 'handled': False, 'strategy': 'events'})
+    assert ce._fast_click(driver, 'boton')
+    assert _FakeActionChains.performed == [driver]
+    assert ce.get_fast_click_stats() == {'native': 1}
+
+
+def test_needs_trusted_uses_native_click_without_waiting():
+    """Los elementos que necesitan eventos de confianza van directos al click nativo"""
+    driver = _FakeDriver({'ok': False, 'handled': False, 'needsTrusted': True, 'strategy': None})
+    assert ce._fast_click(driver, 'select')
+    assert 'activity' not in driver.calls
+    assert _FakeActionChains.performed == [driver]
+
+
+def test_helper_error_returns_to_normal_ladder():
+    """Si la librería falla se continúa con la escalera normal"""
+    class _BrokenDriver(_FakeDriver):
+        def execute_script(self, script, *args):
+            raise RuntimeError('sin página')
+
+    assert not ce._fast_click(_BrokenDriver({}), 'boton')
+    assert _FakeActionChains.performed == []
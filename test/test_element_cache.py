@@ -0,0 +1,90 @@
+"""
+Pruebas para el archivo element_cache.py
+"""
+from selenium.common.exceptions import StaleElementReferenceException
+import actions.element_cache as ec
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+LOCATOR = ('css selector', '#buscar')
+
+
+class _FakeDriver:
+    """Documento simulado: URL, token de navegación (window.__sqNav) y elementos conectados"""
+
+    def __init__(self):
+        self.session_id = 'sesion-test'
+        self.url = 'https://example.com/'
+        self.nav_token = None
+        self.connected = True
+        self.stale = False
+
+    def navigate(self, url=None):
+        # Documento nuevo: se pierde la marca
+        self.url = url or self.url
+        self.nav_token = None
+
+    def execute_script(self, script, *args):
+        if script is ec._MARK_SCRIPT:
+            self.nav_token = self.nav_token or args[0]
+            return [self.url, self.nav_token]
+        if self.stale:
+            raise StaleElementReferenceException()
+        return [self.url, self.nav_token, self.connected]
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    monkeypatch.setattr(ec, '_caches', {})
+    monkeypatch.setattr(ec, '_stats', {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0})
+    return _FakeDriver()
+
+
+def test_hit_and_miss(driver):
+    """Un elemento cacheado se devuelve mientras siga en el mismo documento"""
+    assert ec.get_cached_element(driver, LOCATOR) is None
+    ec.cache_element(driver, LOCATOR, 'elemento')
+
+    assert ec.get_cached_element(driver, LOCATOR) == 'elemento'
+    stats = ec.get_element_cache_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+
+def test_navigation_invalidates(driver):
+    """Una recarga (mismo URL, documento nuevo) o un cambio de URL vacían la caché"""
+    ec.cache_element(driver, LOCATOR, 'elemento')
+    driver.navigate()
+    assert ec.get_cached_element(driver, LOCATOR) is None
+
+    ec.cache_element(driver, LOCATOR, 'elemento')
+    driver.navigate('https://example.com/otra')
+    assert ec.get_cached_element(driver, LOCATOR) is None
+    assert ec.get_element_cache_stats()['invalidations'] == 2
+
+
+def test_detached_or_stale_element_is_evicted(driver):
+    """Un elemento que ya no está en el DOM se descarta sin invalidar el resto"""
+    ec.cache_element(driver, LOCATOR, 'elemento')
+    ec.cache_element(driver, ('id', 'otro'), 'otro')
+    driver.connected = False
+    assert ec.get_cached_element(driver, LOCATOR) is None
+    assert ec.get_element_cache_stats()['evictions'] == 1
+
+    driver.connected = True
+    assert ec.get_cached_element(driver, ('id', 'otro')) == 'otro'
+    driver.stale = True
+    assert ec.get_cached_element(driver, ('id', 'otro')) is None
+
+
+def test_explicit_invalidation_and_discard(driver):
+    """invalidate_element_cache vacía la caché y discard_element_cache la elimina"""
+    ec.cache_element(driver, LOCATOR, 'elemento')
+    ec.invalidate_element_cache(driver)
+    assert ec.get_cached_element(driver, LOCATOR) is None
+
+    ec.cache_element(driver, LOCATOR, 'elemento')
+    ec.discard_element_cache(driver)
+    assert driver.session_id not in ec._caches
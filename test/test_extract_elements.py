@@ -0,0 +1,87 @@
+"""
+Pruebas para el archivo extract_elements.py
+"""
+from selenium.webdriver.common.by import By
+from actions.extract_elements import extract, iter_extract, normalize_selector, parse_fields
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+def test_parse_fields_specs():
+    """Cada especificación se convierte en [nombre, subselector, atributo]"""
+    specs = parse_fields({
+        'title': 'text',
+        'link': '@href',
+        'image': 'img@data-src',
+        'price': '.price',
+        'label': 'span@aria-label'
+    })
+
+    assert specs == [
+        ['title', None, None],
+        ['link', None, 'href'],
+        ['image', 'img', 'data-src'],
+        ['price', '.price', None],
+        ['label', 'span', 'aria-label']
+    ]
+
+
+def test_normalize_selector():
+    """Un str es CSS; solo se admiten locators CSS y XPath"""
+    assert normalize_selector('.row') == (By.CSS_SELECTOR, '.row')
+    assert normalize_selector((By.XPATH, '//li')) == (By.XPATH, '//li')
+    with pytest.raises(Exception):
+        normalize_selector((By.ID, 'row'))
+
+
+class _FakeDriver:
+    """Página simulada con `total` filas: _EXTRACT_SCRIPT devuelve el bloque pedido"""
+
+    def __init__(self, total):
+        self.total = total
+        self.calls = []
+
+    def execute_script(self, script, selector, is_xpath, fields, offset, count, max_value_length):
+        self.calls.append((offset, count))
+        end = self.total if not count else min(offset + count, self.total)
+        return {'total': self.total, 'rows': [{'id': i} for i in range(offset, end)]}
+
+
+def test_iter_extract_chunks():
+    """Las filas se piden en bloques de chunk_size hasta agotar el total"""
+    driver = _FakeDriver(25)
+
+    chunks = list(iter_extract(driver, '.row', {'id': 'text'}, chunk_size=10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert driver.calls == [(0, 10), (10, 10), (20, 10)]
+    assert [row['id'] for chunk in chunks for row in chunk] == list(range(25))
+
+
+def test_iter_extract_limit_and_offset():
+    """limit y offset acotan el rango y el último bloque se recorta al límite"""
+    driver = _FakeDriver(100)
+
+    chunks = list(iter_extract(driver, '.row', {'id': 'text'}, chunk_size=10, limit=15, offset=40))
+
+    assert driver.calls == [(40, 10), (50, 5)]
+    assert [row['id'] for chunk in chunks for row in chunk] == list(range(40, 55))
+
+
+def test_iter_extract_without_chunk_size():
+    """Sin chunk_size se devuelve todo en un único bloque; una página vacía no devuelve bloques"""
+    assert [len(chunk) for chunk in iter_extract(_FakeDriver(7), '.row', {'id': 'text'})] == [7]
+    assert list(iter_extract(_FakeDriver(0), '.row', {'id': 'text'}, chunk_size=5)) == []
+
+
+def test_limit_zero_returns_no_rows():
+    """limit=0 no devuelve filas (en el script 0 significa sin límite) ni llama a la página"""
+    driver = _FakeDriver(10)
+
+    assert list(iter_extract(driver, '.row', {'id': 'text'}, limit=0)) == []
+    assert list(iter_extract(driver, '.row', {'id': 'text'}, chunk_size=3, limit=0)) == []
+    assert extract(driver, '.row', {'id': 'text'}, limit=0) == []
+    assert driver.calls == []
@@ -210,3 +210,44 @@ def test_clean_filename_only_special_chars():
     """Verifica limpieza cuando solo hay caracteres especiales"""
     result = clean_filename("@#$%^&*()")
     assert result == ""
+
+
+class _FakeDriver:
+    def get_screenshot_as_png(self):
+        return b"\x89PNG fake screenshot"
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(self.get_screenshot_as_png()).decode()
+
+
+def test_take_screenshot_uses_artifact_store():
+    """Las capturas se guardan por contenido y dos capturas iguales no se sobrescriben ni duplican"""
+    from utils.file_manager import take_screenshot
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = take_screenshot(_FakeDriver(), temp_dir)
+        second = take_screenshot(_FakeDriver(), temp_dir)
+
+        assert first == second
+        assert first.startswith(os.path.join(temp_dir, 'artifacts', 'objects'))
+        assert first.endswith('.png')
+        with open(first, 'rb') as f:
+            assert f.read() == b"\x89PNG fake screenshot"
+
+
+def test_store_download_moves_file_to_artifact_store():
+    """Las descargas del navegador se mueven al almacén de artefactos"""
+    from utils.file_manager import store_download
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        download_dir = os.path.join(temp_dir, 'downloads')
+        os.makedirs(download_dir)
+        with open(os.path.join(download_dir, 'informe.pdf'), 'wb') as f:
+            f.write(b"%PDF fake")
+
+        path = store_download('informe.pdf', temp_dir, download_dir)
+
+        assert path.startswith(os.path.join(temp_dir, 'artifacts')) and path.endswith('.pdf')
+        assert os.listdir(download_dir) == []
+        with open(path, 'rb') as f:
+            assert f.read() == b"%PDF fake"
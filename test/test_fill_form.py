@@ -0,0 +1,113 @@
+"""
+Pruebas para el archivo fill_form.py
+"""
+from selenium.webdriver.common.by import By
+import actions.fill_form as ff
+import actions.page_helpers as ph
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+LONG_TEXT = 'x' * ff.FILL_FORM_INSERT_TEXT_MIN_LENGTH
+
+
+class _FakeDriver:
+    """Formulario simulado: los campos son claves de `fields` y __sq.fill escribe en ellos"""
+
+    def __init__(self, fields, chromium=False, ignored=()):
+        self.session_id = 'sesion-test'
+        self.capabilities = {'browserName': 'chrome' if chromium else 'firefox'}
+        self.fields = fields
+        self.ignored = set(ignored)
+        self.helper_calls = []
+        self.cdp_calls = []
+        self.focused = None
+
+    def execute_script(self, script, *args):
+        assert script is ph._CALL_SCRIPT
+        name, params = args[1], args[2:]
+        self.helper_calls.append(name)
+        if name == 'fill':
+            results = []
+            for kind, value, text, in_page in params[0]:
+                if value not in self.fields:
+                    results.append({'found': False, 'element': None})
+                    continue
+                if in_page and value not in self.ignored:
+                    self.fields[value] = text
+                results.append({'found': True, 'element': value})
+            return results
+        if name == 'focusSelect':
+            self.focused = params[0]
+        elif name == 'readValues':
+            return [self.fields[element] for element in params[0]]
+        return None
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_calls.append(command)
+        self.fields[self.focused] = params['text']
+        return {}
+
+
+@pytest.fixture
+def written(monkeypatch):
+    calls = []
+
+    def fake_write_element(driver, element, text, locator=None):
+        calls.append((element, text, locator))
+        driver.fields[element] = text
+        return driver
+
+    monkeypatch.setattr(ff, 'write_element', fake_write_element)
+    return calls
+
+
+def test_single_call_fill(written):
+    """Todos los campos se escriben en una llamada y se verifican en otra"""
+    driver = _FakeDriver({'#user': '', "//*[@id='pass']": '', '#terms': False})
+
+    ff.fill_form(driver, {'#user': 'ana', (By.ID, 'pass'): 'secreto', '#terms': True})
+
+    assert driver.helper_calls == ['fill', 'readValues']
+    assert driver.fields == {'#user': 'ana', "//*[@id='pass']": 'secreto', '#terms': True}
+    assert written == []
+
+
+def test_long_values_use_insert_text(written):
+    """En Chrome los valores largos se insertan con CDP Input.insertText"""
+    driver = _FakeDriver({'#bio': '', '#user': ''}, chromium=True)
+
+    ff.fill_form(driver, {'#bio': LONG_TEXT, '#user': 'ana'})
+
+    assert driver.cdp_calls == ['Input.insertText']
+    assert driver.helper_calls == ['fill', 'focusSelect', 'readValues']
+    assert driver.fields == {'#bio': LONG_TEXT, '#user': 'ana'}
+
+
+def test_missing_fields_raise():
+    """Un campo que no existe es un error que nombra el locator"""
+    driver = _FakeDriver({'#user': ''})
+
+    with pytest.raises(Exception, match='#missing'):
+        ff.fill_form(driver, {'#user': 'ana', '#missing': 'x'})
+
+
+def test_mismatch_falls_back_to_write_element(written):
+    """Los campos cuya lectura no coincide se reescriben con write_element"""
+    driver = _FakeDriver({'#user': '', '#masked': ''}, ignored={'#masked'})
+
+    ff.fill_form(driver, {'#user': 'ana', (By.CSS_SELECTOR, '#masked'): '123'})
+
+    assert written == [('#masked', '123', (By.CSS_SELECTOR, '#masked'))]
+    assert driver.helper_calls == ['fill', 'readValues']
+
+
+def test_mismatch_without_fallback_raises(written):
+    """Sin fallback la lectura que no coincide es un error"""
+    driver = _FakeDriver({'#user': '', '#masked': ''}, ignored={'#masked'})
+
+    with pytest.raises(Exception, match='no verificados'):
+        ff.fill_form(driver, {'#user': 'ana', '#masked': '123'}, fallback=False)
+    assert written == []
@@ -140,3 +140,53 @@ def test_handle_request_extra_spaces_in_token(client):
     headers = {"Authorization": "Bearer  sample"}  # doble espacio
     response = client.get('/sample', headers=headers, json={"test": "data"})
     assert response.status_code == 401
+
+
+def test_handle_request_returns_request_id(client):
+    """La respuesta devuelve el X-Request-ID recibido o uno generado"""
+    headers = {"Authorization": "Bearer sample", "X-Request-ID": "abc-123"}
+    response = client.get('/sample', headers=headers, json={})
+    assert response.headers['X-Request-ID'] == 'abc-123'
+
+    response = client.get('/sample', headers={"X-Request-ID": "no valido"}, json={})
+    assert response.headers['X-Request-ID'] not in ('', 'no valido')
+
+
+def test_handle_request_raw_response_returns_request_id():
+    """Con decode_response=False la respuesta del controlador también lleva el X-Request-ID"""
+    from utils.handle_request import handle_request_endpoint
+
+    def raw_controller(data):
+        return "contenido"
+
+    headers = {"Authorization": "Bearer sample", "X-Request-ID": "raw-123"}
+    with app.test_request_context('/raw', method='POST', headers=headers, json={}):
+        response = handle_request_endpoint(raw_controller, decode_response=False)
+
+    assert response.get_data(as_text=True) == "contenido"
+    assert response.headers['X-Request-ID'] == 'raw-123'
+
+
+def test_logs_endpoint_requires_token(client):
+    """La consulta de logs necesita autenticación"""
+    response = client.get('/logs')
+    assert response.status_code == 401
+
+
+def test_logs_endpoint_invalid_query(client):
+    """Un filtro no válido devuelve 400"""
+    headers = {"Authorization": "Bearer sample"}
+    assert client.get('/logs?level=VERBOSE', headers=headers).status_code == 400
+    assert client.get('/logs?start=ayer', headers=headers).status_code == 400
+
+
+def test_logs_endpoint_by_request_id(client):
+    """Los registros de una petición se recuperan por su X-Request-ID"""
+    headers = {"Authorization": "Bearer sample", "X-Request-ID": "consulta-logs-1"}
+    client.get('/sample', headers=headers, json={})
+
+    response = client.get('/logs?request_id=consulta-logs-1', headers={"Authorization": "Bearer sample"})
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'consulta-logs-1' in body
+    assert all('[consulta-logs-1 ' in line for line in body.splitlines() if ' - ' in line)
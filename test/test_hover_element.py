@@ -0,0 +1,117 @@
+"""
+Pruebas para hover_sequence de hover_element.py
+"""
+import actions.hover_element as he
+import actions.page_helpers as ph
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class _FakeDriver:
+    """Menú simulado: `dom` indica qué selectores existen y `hidden` cuáles no quedan visibles"""
+
+    def __init__(self, dom, appear_after_perform=(), hidden=()):
+        self.session_id = 'sesion-test'
+        self.current_url = 'https://example.com/'
+        self.dom = set(dom)
+        self.appear_after_perform = set(appear_after_perform)
+        self.hidden = set(hidden)
+        self.performs = []
+
+    def execute_script(self, script, *args):
+        assert script is ph._CALL_SCRIPT
+        name, params = args[1], args[2:]
+        if name == 'resolve':
+            return [value if value in self.dom else None for _, value in params[0]]
+        if name == 'visible':
+            return [element not in self.hidden for element in params[0]]
+        return None
+
+
+class _FakeActionChains:
+    def __init__(self, driver, duration=250):
+        self.driver = driver
+        self.actions = [('duration', duration)]
+
+    def move_to_element(self, element):
+        self.actions.append(('move', element))
+        return self
+
+    def click(self):
+        self.actions.append(('click',))
+        return self
+
+    def pause(self, seconds):
+        self.actions.append(('pause', seconds))
+        return self
+
+    def perform(self):
+        self.driver.performs.append(self.actions)
+        # El hover abre el submenú: aparecen sus elementos
+        self.driver.dom |= self.driver.appear_after_perform
+
+
+@pytest.fixture(autouse=True)
+def fake_actions(monkeypatch):
+    monkeypatch.setattr(he, 'ActionChains', _FakeActionChains)
+
+
+def _duration(actions):
+    # Segundos que tarda la secuencia: cada movimiento dura `duration` ms más la pausa posterior
+    move = actions[0][1] / 1000
+    return sum(move for action in actions if action[0] == 'move') + \
+        sum(action[1] for action in actions if action[0] == 'pause')
+
+
+def test_existing_targets_use_a_single_perform():
+    """Los pasos cuyos elementos ya existen se encadenan en un solo perform()"""
+    driver = _FakeDriver({'#menu', '#sub', '#item'})
+
+    he.hover_sequence(driver, ['#menu', '#sub', ('click', '#item')], pause_time=0.2, move_duration=150)
+
+    assert driver.performs == [[
+        ('duration', 150),
+        ('move', '#menu'), ('pause', 0.2),
+        ('move', '#sub'), ('pause', 0.2),
+        ('move', '#item'), ('click',), ('pause', 0.2),
+    ]]
+    assert _duration(driver.performs[0]) == pytest.approx(3 * (0.15 + 0.2))
+
+
+def test_sequence_splits_when_target_does_not_exist_yet():
+    """Si un elemento aún no existe se ejecuta lo acumulado y se espera a que aparezca"""
+    driver = _FakeDriver({'#menu'}, appear_after_perform={'#sub', '#item'})
+
+    he.hover_sequence(driver, ['#menu', '#sub', ('click', '#item')], timeout=1)
+
+    assert [[action for action in actions if action[0] == 'move'] for actions in driver.performs] == [
+        [('move', '#menu')], [('move', '#sub'), ('move', '#item')]]
+
+
+def test_missing_target_times_out():
+    """Un elemento que nunca aparece es un error"""
+    driver = _FakeDriver({'#menu'})
+
+    with pytest.raises(Exception, match='no apareció'):
+        he.hover_sequence(driver, ['#menu', '#nunca'], timeout=0.1)
+    assert len(driver.performs) == 1
+
+
+def test_verify_detects_submenu_not_opened():
+    """Con verify, un hover cuyo elemento no quedó visible es un error"""
+    driver = _FakeDriver({'#menu', '#sub'}, hidden={'#sub'})
+
+    with pytest.raises(Exception, match='#sub'):
+        he.hover_sequence(driver, ['#menu', '#sub'])
+    he.hover_sequence(_FakeDriver({'#menu', '#sub'}, hidden={'#sub'}), ['#menu', '#sub'], verify=False)
+
+
+def test_verify_skips_steps_before_a_click():
+    """Tras un click el menú puede cerrarse: solo se verifican los hovers posteriores"""
+    driver = _FakeDriver({'#menu', '#item', '#after'}, hidden={'#menu', '#item'})
+
+    he.hover_sequence(driver, ['#menu', ('click', '#item'), '#after'])
+    assert len(driver.performs) == 1
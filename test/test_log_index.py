@@ -0,0 +1,144 @@
+"""
+Pruebas para el archivo log_index.py
+"""
+from utils.log_index import index_path, query_logs, remove_orphan_indexes, update_index
+from utils.log_segments import compress_segment
+from datetime import datetime, timedelta
+import os
+import tempfile
+import sys
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+START = datetime(2025, 1, 1, 10, 0, 0)
+
+
+def _line(minutes, level, request_id, message):
+    date = START + timedelta(minutes=minutes)
+    return f"{date.strftime('%Y-%m-%d %H:%M:%S')},000 - {level} - [{request_id}] {message}\n"
+
+
+def _write_segment(directory, lines, start=START):
+    path = os.path.join(directory, start.strftime("%Y-%m-%d_%H-%M-%S") + ".log")
+    with open(path, 'a') as f:
+        f.writelines(lines)
+    return path
+
+
+def _messages(records):
+    return [record.split('] ', 1)[1].strip() for record in records]
+
+
+def test_query_by_request_id():
+    """Solo se devuelven los registros de la petición, con sus líneas de continuación"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _write_segment(temp_dir, [
+            _line(0, 'INFO', 'aaa', 'inicio a'),
+            _line(0, 'INFO', 'bbb', 'inicio b'),
+            _line(1, 'ERROR', 'aaa', 'fallo a\nTraceback: detalle'),
+            _line(2, 'INFO', 'bbb', 'fin b'),
+        ])
+
+        records = list(query_logs(temp_dir, request_id='aaa'))
+
+        assert _messages(records) == ['inicio a', 'fallo a\nTraceback: detalle']
+
+
+def test_query_by_time_range_and_level():
+    """El rango de tiempo y el nivel mínimo se combinan"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _write_segment(temp_dir, [_line(i, 'ERROR' if i % 2 else 'INFO', 'r', f"m{i}") for i in range(10)])
+
+        in_range = list(query_logs(temp_dir, start=START + timedelta(minutes=3), end=START + timedelta(minutes=5)))
+        errors = list(query_logs(temp_dir, level='error'))
+
+        assert _messages(in_range) == ['m3', 'm4', 'm5']
+        assert _messages(errors) == ['m1', 'm3', 'm5', 'm7', 'm9']
+
+
+def test_query_limit_and_invalid_level():
+    """El límite corta la consulta y un nivel desconocido es un error"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _write_segment(temp_dir, [_line(i, 'INFO', 'r', f"m{i}") for i in range(10)])
+
+        assert len(list(query_logs(temp_dir, limit=3))) == 3
+        try:
+            list(query_logs(temp_dir, level='VERBOSE'))
+            assert False, "Se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+def test_index_is_incremental():
+    """El índice del segmento activo solo añade lo escrito desde la última actualización"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = _write_segment(temp_dir, [_line(0, 'INFO', 'aaa', 'uno')])
+        first = update_index(path)
+        assert os.path.exists(index_path(path))
+
+        _write_segment(temp_dir, [_line(1, 'INFO', 'bbb', 'dos')])
+        with open(path, 'a') as f:
+            # Línea a medio escribir: no se indexa todavía
+            f.write("2025-01-01 10:02:00,000 - INFO - [ccc] tr")
+        second = update_index(path)
+
+        assert second['size'] > first['size']
+        assert set(second['requests']) == {'aaa', 'bbb'}
+        assert second['size'] < os.path.getsize(path)
+
+
+def test_index_rebuilt_when_file_replaced():
+    """Si el segmento se reemplaza (limpieza de registros) el índice se reconstruye"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = _write_segment(temp_dir, [_line(0, 'INFO', 'aaa', 'uno'), _line(1, 'INFO', 'bbb', 'dos')])
+        update_index(path)
+
+        replacement = path + '.new'
+        with open(replacement, 'w') as f:
+            f.write(_line(1, 'INFO', 'bbb', 'dos'))
+        os.replace(replacement, path)
+
+        assert _messages(query_logs(temp_dir, request_id='bbb')) == ['dos']
+        assert list(query_logs(temp_dir, request_id='aaa')) == []
+
+
+def test_query_compressed_segments_and_orphans():
+    """Se consultan segmentos comprimidos y los índices huérfanos se eliminan"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        old = _write_segment(temp_dir, [_line(0, 'INFO', 'aaa', 'antiguo')])
+        update_index(old)
+        compress_segment(old, 'gzip')
+        _write_segment(temp_dir, [_line(70, 'INFO', 'aaa', 'nuevo')], start=START + timedelta(hours=1))
+
+        assert _messages(query_logs(temp_dir, request_id='aaa')) == ['antiguo', 'nuevo']
+        assert remove_orphan_indexes(temp_dir) == 1
+        assert not os.path.exists(index_path(old))
+
+
+def test_query_lines_with_request_context():
+    """Las líneas con controlador y navegador en el contexto se indexan por su request id"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _write_segment(temp_dir, [
+            _line(0, 'INFO', 'aaa controller_sample chrome:1a2b3c4d', 'con contexto'),
+            _line(0, 'INFO', 'bbb', 'sin contexto'),
+        ])
+
+        assert _messages(query_logs(temp_dir, request_id='aaa')) == ['con contexto']
+        assert _messages(query_logs(temp_dir, request_id='bbb')) == ['sin contexto']
+
+
+def test_query_finds_late_flushed_records():
+    """Los registros escritos al terminar una petición, con su hora original, se encuentran por su hora"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _write_segment(temp_dir, [_line(0, 'INFO', 'aaa', 'inicio'), _line(1, 'INFO', 'bbb', 'otra')])
+        # La petición ccc (minuto 2) falló y sus registros se escribieron en el segmento siguiente
+        _write_segment(temp_dir, [
+            _line(4, 'WARNING', 'bbb', 'aviso'),
+            _line(2, 'INFO', 'ccc', 'paso antiguo'),
+            _line(5, 'ERROR', 'ccc', 'fallo'),
+        ], start=START + timedelta(minutes=3))
+
+        in_range = list(query_logs(temp_dir, start=START + timedelta(minutes=2), end=START + timedelta(minutes=2)))
+
+        assert _messages(in_range) == ['paso antiguo']
+        assert _messages(query_logs(temp_dir, request_id='ccc')) == ['paso antiguo', 'fallo']
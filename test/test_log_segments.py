@@ -0,0 +1,93 @@
+"""
+Pruebas para el archivo log_segments.py
+"""
+from utils.log_segments import (
+    compress_segment,
+    iter_log_lines,
+    list_segments,
+    open_segment,
+    segment_datetime
+)
+from datetime import datetime, timedelta
+import gzip
+import tempfile
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+def _write_segment(directory, start, messages):
+    path = os.path.join(directory, start.strftime("%Y-%m-%d_%H-%M-%S") + ".log")
+    with open(path, 'w') as f:
+        for i, message in enumerate(messages):
+            date = start + timedelta(minutes=i)
+            f.write(f"{date.strftime('%Y-%m-%d %H:%M:%S')},000 - INFO - {message}\n")
+    return path
+
+
+def test_segment_names():
+    """Se reconocen segmentos comprimidos y sin comprimir"""
+    assert segment_datetime("2025-02-26_11-13-20.log") == datetime(2025, 2, 26, 11, 13, 20)
+    assert segment_datetime("2025-02-26_11-13-20.log.gz") == datetime(2025, 2, 26, 11, 13, 20)
+    assert segment_datetime("2025-02-26_11-13-20.log.gz.tmp") is None
+    assert segment_datetime(".index.json") is None
+
+
+def test_compress_segment_gzip():
+    """La compresión conserva el contenido y elimina el original"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = _write_segment(temp_dir, datetime(2025, 1, 1), ["uno", "dos"])
+        with open(path, 'rb') as f:
+            original = f.read()
+
+        compressed = compress_segment(path, 'gzip')
+
+        assert compressed == path + ".gz"
+        assert not os.path.exists(path)
+        with gzip.open(compressed, 'rb') as f:
+            assert f.read() == original
+        assert os.listdir(temp_dir) == [os.path.basename(compressed)]
+
+
+def test_compress_segment_none():
+    """Sin compresión el segmento no cambia"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = _write_segment(temp_dir, datetime(2025, 1, 1), ["uno"])
+        assert compress_segment(path, 'none') == path
+        assert os.path.exists(path)
+
+
+def test_iter_log_lines_across_segments():
+    """El lector recorre segmentos comprimidos y sin comprimir en orden cronológico"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = _write_segment(temp_dir, datetime(2025, 1, 1, 10), ["a1", "a2"])
+        _write_segment(temp_dir, datetime(2025, 1, 1, 11), ["b1", "b2"])
+        compress_segment(first, 'gzip')
+
+        lines = list(iter_log_lines(temp_dir))
+
+        assert [line.split(" - ")[-1].strip() for line in lines] == ["a1", "a2", "b1", "b2"]
+        assert len(list_segments(temp_dir)) == 2
+
+
+def test_iter_log_lines_time_range():
+    """Con start/end solo se devuelven los registros del rango"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _write_segment(temp_dir, datetime(2025, 1, 1, 10), ["a1", "a2"])
+        _write_segment(temp_dir, datetime(2025, 1, 1, 11), ["b1", "b2"])
+
+        lines = list(iter_log_lines(temp_dir, start=datetime(2025, 1, 1, 10, 1),
+                                    end=datetime(2025, 1, 1, 11)))
+
+        assert [line.split(" - ")[-1].strip() for line in lines] == ["a2", "b1"]
+
+
+def test_open_segment_reads_plain_and_gzip():
+    """open_segment deduce el formato por la extensión"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "x.log.gz")
+        with open_segment(path, 'wb') as f:
+            f.write(b"linea\n")
+        with open_segment(path, 'rb') as f:
+            assert f.read() == b"linea\n"
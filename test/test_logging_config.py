@@ -3,10 +3,14 @@ Pruebas para el archivo logging_config.py
 """
 from utils.config import LOG_FILE_DELETION_DAYS
 from utils.logging_config import (
+    _BoundedQueueHandler,
     _clean_old_records_from_file,
     _rotate_log_if_needed
 )
+from utils.log_segments import iter_log_lines
 from datetime import datetime, timedelta
+import logging
+import queue
 import tempfile
 import sys
 import os
@@ -288,3 +292,439 @@ def test_file_with_mixed_timestamps():
         finally:
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
+
+
+def _record(level):
+    return logging.makeLogRecord({'levelno': level, 'levelname': logging.getLevelName(level), 'msg': 'm'})
+
+
+def test_queue_handler_drops_debug_first():
+    """Con la cola a medias se descartan los DEBUG pero no los INFO ni los WARNING"""
+    log_queue = queue.Queue(maxsize=10)
+    handler = _BoundedQueueHandler(log_queue, 'drop_debug')
+
+    for _ in range(6):
+        handler.emit(_record(logging.WARNING))
+    handler.emit(_record(logging.DEBUG))
+    handler.emit(_record(logging.INFO))
+
+    assert log_queue.qsize() == 7
+    assert handler.dropped == {'DEBUG': 1}
+
+
+def test_queue_handler_never_blocks_when_full():
+    """Con la cola llena los registros se descartan sin bloquear"""
+    log_queue = queue.Queue(maxsize=2)
+    handler = _BoundedQueueHandler(log_queue, 'drop_new')
+
+    for _ in range(5):
+        handler.emit(_record(logging.ERROR))
+
+    assert log_queue.qsize() == 2
+    assert handler.dropped == {'ERROR': 3}
+
+
+def test_pipeline_writes_in_background():
+    """Los registros se escriben en el fichero desde el hilo escritor"""
+    import utils.logging_config as lc
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "pipeline.log")
+        try:
+            lc._set_log_file(log_path)
+            logging.info("Registro desde la cola")
+            assert lc.flush_logs()
+
+            with open(log_path, 'r') as f:
+                assert "Registro desde la cola" in f.read()
+            assert lc.get_logging_stats()['queued'] == 0
+        finally:
+            lc.shutdown_logging()
+            lc._current_log_file = None
+
+
+def _write_log(directory, file_date, record_dates):
+    path = os.path.join(directory, file_date.strftime("%Y-%m-%d_%H-%M-%S") + ".log")
+    with open(path, 'w') as f:
+        for i, date in enumerate(record_dates):
+            f.write(f"{date.strftime('%Y-%m-%d %H:%M:%S')},000 - INFO - Registro {i}\n")
+    return path
+
+
+def test_retention_only_opens_straddling_files(monkeypatch):
+    """La limpieza borra archivos caducados y solo limpia los segmentos comprimidos que cruzan el límite"""
+    import utils.logging_config as lc
+
+    current_date = datetime.now()
+    old = current_date - timedelta(days=LOG_FILE_DELETION_DAYS + 5)
+    recent = current_date - timedelta(days=2)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        expired = _write_log(temp_dir, old, [old, old])
+        straddling = lc.compress_segment(_write_log(temp_dir, old + timedelta(seconds=1), [old, recent]), 'gzip')
+        fresh = _write_log(temp_dir, recent, [recent, current_date])
+
+        cleaned = []
+        original_clean = lc._clean_old_records_from_file
+        monkeypatch.setattr(lc, '_clean_old_records_from_file',
+                            lambda path, now: (cleaned.append(path), original_clean(path, now)))
+
+        assert lc.run_log_retention(temp_dir, force=True)
+
+        assert not os.path.exists(expired)
+        assert os.path.exists(fresh)
+        assert cleaned == [straddling]
+        with lc.open_segment(straddling, 'rb') as f:
+            assert b"Registro 0" not in f.read()
+
+        index = lc.load_state(os.path.join(temp_dir, lc.LOG_INDEX_FILENAME))
+        assert set(index['files']) == {os.path.basename(straddling), os.path.basename(fresh)}
+
+
+def test_retention_never_replaces_active_segment():
+    """Un segmento sin comprimir abierto por un worker (con el lock de su handler) conserva su inode"""
+    import utils.logging_config as lc
+
+    current_date = datetime.now()
+    old = current_date - timedelta(days=LOG_FILE_DELETION_DAYS + 5)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        active = _write_log(temp_dir, old, [old, current_date])
+        inode = os.stat(active).st_ino
+
+        with open(active, 'a') as writer:
+            lc._lock_segment(writer)
+            assert lc.run_log_retention(temp_dir, force=True)
+            writer.write("escrito por otro worker\n")
+
+        assert os.stat(active).st_ino == inode
+        with open(active) as f:
+            assert "escrito por otro worker" in f.read()
+
+
+def test_retention_prunes_closed_uncompressed_segment(monkeypatch):
+    """Un segmento sin comprimir cerrado se limpia con la búsqueda binaria del punto de corte"""
+    import utils.logging_config as lc
+
+    current_date = datetime.now()
+    old = current_date - timedelta(days=LOG_FILE_DELETION_DAYS + 5)
+    recent = current_date - timedelta(days=2)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        closed = _write_log(temp_dir, old, [old, old, recent, current_date])
+        searched = []
+        original_search = lc._find_cutoff_offset
+        monkeypatch.setattr(lc, '_find_cutoff_offset',
+                            lambda *args: searched.append(args) or original_search(*args))
+
+        assert lc.run_log_retention(temp_dir, force=True)
+
+        assert len(searched) == 1
+        with open(closed) as f:
+            assert f.read().splitlines() == [
+                f"{recent.strftime('%Y-%m-%d %H:%M:%S')},000 - INFO - Registro 2",
+                f"{current_date.strftime('%Y-%m-%d %H:%M:%S')},000 - INFO - Registro 3"]
+
+
+def test_segment_handler_marks_its_file_active():
+    """El segmento abierto por el handler no se considera cerrado hasta que rota"""
+    import utils.logging_config as lc
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = os.path.join(temp_dir, "2025-01-01_00-00-00.log")
+        second = os.path.join(temp_dir, "2025-01-01_01-00-00.log")
+        handler = lc._SegmentFileHandler(first, max_bytes=0, hourly=False)
+        try:
+            assert not lc._is_segment_closed(first)
+            handler.switch_to(second)
+            assert lc._is_segment_closed(first)
+            assert not lc._is_segment_closed(second)
+        finally:
+            handler.close()
+
+
+def test_retention_runs_once_per_interval():
+    """Una segunda ejecución dentro del intervalo no hace nada"""
+    import utils.logging_config as lc
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        assert lc.run_log_retention(temp_dir)
+        assert not lc.run_log_retention(temp_dir)
+
+
+def test_retention_respects_lock_file():
+    """Si otro worker tiene el lock, la limpieza no se ejecuta"""
+    import utils.logging_config as lc
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        open(os.path.join(temp_dir, lc.LOG_RETENTION_LOCK_FILENAME), 'w').close()
+        assert not lc.run_log_retention(temp_dir, force=True)
+
+
+def test_clean_large_sorted_file_keeps_tail_intact():
+    """En un archivo ordenado se elimina el prefijo antiguo y el resto se conserva byte a byte"""
+    import utils.logging_config as lc
+
+    current_date = datetime.now()
+    start = current_date - timedelta(days=LOG_FILE_DELETION_DAYS + 10)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = os.path.join(temp_dir, "sorted.log")
+        lines = []
+        for i in range(2000):
+            date = start + timedelta(hours=i * 0.25)
+            lines.append(f"{date.strftime('%Y-%m-%d %H:%M:%S')},000 - INFO - Registro {i}\n")
+            if i % 100 == 0:
+                lines.append("Traceback (most recent call last):\n")
+        with open(temp_path, 'w') as f:
+            f.writelines(lines)
+
+        with open(temp_path, 'rb') as f:
+            original = f.read()
+            offset = lc._find_cutoff_offset(f, len(original), current_date)
+
+        _clean_old_records_from_file(temp_path, current_date)
+
+        with open(temp_path, 'rb') as f:
+            content = f.read()
+        assert content == original[offset:]
+        first_kept = lc.line_timestamp(content.split(b"\n", 1)[0])
+        assert first_kept is not None and not lc._is_expired(first_kept, current_date)
+        assert original[offset - 1:offset] == b"\n"
+
+
+def test_clean_does_nothing_when_all_recent():
+    """Si el primer registro es reciente el archivo no se reescribe"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = os.path.join(temp_dir, "recent.log")
+        current_date = datetime.now()
+        with open(temp_path, 'w') as f:
+            f.write(f"{current_date.strftime('%Y-%m-%d %H:%M:%S')},000 - INFO - Actual\n")
+        mtime = os.path.getmtime(temp_path)
+
+        _clean_old_records_from_file(temp_path, current_date)
+
+        assert os.path.getmtime(temp_path) == mtime
+        assert os.listdir(temp_dir) == ["recent.log"]
+
+
+def test_segment_handler_rotates_by_size_and_compresses():
+    """Al superar el tamaño máximo se abre un segmento nuevo y el anterior se comprime"""
+    import utils.logging_config as lc
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = os.path.join(temp_dir, "2025-01-01_00-00-00.log")
+        handler = lc._SegmentFileHandler(first, max_bytes=200, hourly=False)
+        handler.setFormatter(lc._log_formatter())
+        try:
+            for i in range(20):
+                handler.handle(logging.makeLogRecord({
+                    'levelno': logging.INFO, 'levelname': 'INFO', 'msg': f"Registro {i}"}))
+            lc._compressor.shutdown(wait=True)
+        finally:
+            handler.close()
+            lc._compressor = None
+            lc._current_log_file = None
+
+        files = sorted(os.listdir(temp_dir))
+        assert first not in [os.path.join(temp_dir, f) for f in files]
+        assert any(f.endswith('.log.gz') for f in files)
+        assert sum(1 for f in files if f.endswith('.log')) == 1
+        assert len(list(iter_log_lines(temp_dir))) == 20
+
+
+def _capture_handler(monkeypatch):
+    import utils.logging_config as lc
+
+    monkeypatch.setattr(lc, 'LOG_TAIL_SAMPLING', True)
+    handler = _BoundedQueueHandler(queue.Queue(maxsize=100), policy='drop_new')
+    monkeypatch.setattr(lc, '_queue_handler', handler)
+    return lc, handler
+
+
+def _message_record(level, msg):
+    return logging.makeLogRecord({'levelno': level, 'levelname': logging.getLevelName(level), 'msg': msg})
+
+
+def test_tail_sampling_summarizes_successful_requests(monkeypatch):
+    """Una petición correcta no escribe sus INFO; los WARNING se escriben en el momento"""
+    lc, handler = _capture_handler(monkeypatch)
+
+    token = lc.start_request_capture()
+    handler.handle(_message_record(logging.INFO, "paso 1"))
+    handler.handle(_message_record(logging.WARNING, "aviso"))
+    assert handler.queue.qsize() == 1
+
+    assert lc.end_request_capture(token, sample_rate=0) is None
+    assert [handler.queue.get_nowait().msg for _ in range(handler.queue.qsize())] == ["aviso"]
+
+
+def test_tail_sampling_flushes_failed_and_slow_requests(monkeypatch):
+    """Las peticiones con error o lentas escriben todos sus registros"""
+    lc, handler = _capture_handler(monkeypatch)
+
+    token = lc.start_request_capture()
+    handler.handle(_message_record(logging.INFO, "paso 1"))
+    handler.handle(_message_record(logging.ERROR, "fallo"))
+    assert lc.end_request_capture(token, sample_rate=0) == 'error'
+
+    token = lc.start_request_capture()
+    handler.handle(_message_record(logging.INFO, "paso lento"))
+    assert lc.end_request_capture(token, slow_threshold=0, sample_rate=0) == 'slow'
+
+    token = lc.start_request_capture()
+    handler.handle(_message_record(logging.DEBUG, "paso muestreado"))
+    assert lc.end_request_capture(token, sample_rate=1) == 'sampled'
+
+    messages = [handler.queue.get_nowait().msg for _ in range(handler.queue.qsize())]
+    assert messages == ["fallo", "paso 1", "paso lento", "paso muestreado"]
+
+
+def test_tail_sampling_ring_buffer(monkeypatch):
+    """El buffer de la petición guarda solo los últimos registros"""
+    lc, handler = _capture_handler(monkeypatch)
+
+    token = lc.start_request_capture(max_records=3)
+    for i in range(10):
+        handler.handle(_message_record(logging.INFO, f"paso {i}"))
+    assert lc.end_request_capture(token, failed=True) == 'error'
+
+    messages = [handler.queue.get_nowait().msg for _ in range(handler.queue.qsize())]
+    assert messages[:3] == ["paso 7", "paso 8", "paso 9"]
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_request_context_is_isolated_between_threads():
+    """Cada hilo registra con el contexto de su propia petición"""
+    import threading
+    import utils.logging_config as lc
+
+    handler = _ListHandler()
+    handler.addFilter(lc._RequestContextFilter())
+    barrier = threading.Barrier(4)
+
+    def request(number):
+        _, token = lc.bind_request_context(f"req-{number}", controller=f"controller_{number}")
+        try:
+            barrier.wait()
+            for step in range(5):
+                handler.handle(logging.makeLogRecord({'msg': f"{number}:{step}"}))
+        finally:
+            lc.reset_request_context(token)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(handler.records) == 20
+    for record in handler.records:
+        number = record.msg.split(':')[0]
+        assert record.request_id == f"req-{number}"
+        assert record.controller == f"controller_{number}"
+
+
+def test_request_context_in_log_line():
+    """El navegador y el driver se añaden al contexto y aparecen en la línea de log"""
+    import utils.logging_config as lc
+
+    lc.update_request_context(browser='chrome')
+    assert lc.get_request_context() == {}
+
+    handler = _ListHandler()
+    handler.addFilter(lc._RequestContextFilter())
+    request_id, token = lc.bind_request_context("abc", controller="controller_sample")
+    try:
+        lc.update_request_context(browser='chrome', driver_id='1a2b3c4d')
+        handler.handle(logging.makeLogRecord({'msg': "mensaje"}))
+    finally:
+        lc.reset_request_context(token)
+    handler.handle(logging.makeLogRecord({'msg': "fuera"}))
+
+    line = lc._log_formatter().format(handler.records[0])
+    assert "[abc controller_sample chrome:1a2b3c4d] mensaje" in line
+    assert "[-] fuera" in lc._log_formatter().format(handler.records[1])
+    assert lc.get_request_id() == '-'
+
+
+def test_controller_handlers():
+    """Los handlers de un controlador solo reciben los registros de ese controlador"""
+    import utils.logging_config as lc
+
+    handler = _ListHandler()
+    router = lc._ControllerRouter()
+    lc.add_controller_handler('controller_sample', handler)
+    try:
+        router.handle(logging.makeLogRecord({'levelno': logging.INFO, 'msg': "uno", 'controller': 'controller_sample'}))
+        router.handle(logging.makeLogRecord({'levelno': logging.INFO, 'msg': "dos", 'controller': 'controller_test'}))
+        router.handle(logging.makeLogRecord({'levelno': logging.INFO, 'msg': "tres"}))
+    finally:
+        lc.remove_controller_handler('controller_sample', handler)
+    router.handle(logging.makeLogRecord({'levelno': logging.INFO, 'msg': "cuatro", 'controller': 'controller_sample'}))
+
+    assert [record.msg for record in handler.records] == ["uno"]
+
+
+def test_flushed_records_keep_original_time(monkeypatch):
+    """Los registros de una petición que se escribe completa conservan su hora original"""
+    import threading
+    lc, handler = _capture_handler(monkeypatch)
+    logged = threading.Event()
+    finished = threading.Event()
+    created = []
+
+    def sampled_out_request():
+        token = lc.start_request_capture()
+        logged.wait()
+        handler.handle(_message_record(logging.INFO, "paso no muestreado"))
+        handler.handle(_message_record(logging.WARNING, "aviso concurrente"))
+        lc.end_request_capture(token, sample_rate=0)
+        finished.set()
+
+    def failed_request():
+        token = lc.start_request_capture()
+        record = _message_record(logging.INFO, "paso antiguo")
+        record.created -= 30
+        created.append(record.created)
+        handler.handle(record)
+        logged.set()
+        finished.wait()
+        lc.end_request_capture(token, failed=True)
+
+    threads = [threading.Thread(target=sampled_out_request), threading.Thread(target=failed_request)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    records = [handler.queue.get_nowait() for _ in range(handler.queue.qsize())]
+    assert [record.msg for record in records] == ["aviso concurrente", "paso antiguo"]
+    assert records[1].created == created[0] < records[0].created
+    assert " at=" not in getattr(records[1], "log_context", "")
+    # La línea sigue siendo indexable (el contexto extra va dentro de los corchetes)
+    from utils.log_index import RECORD_PATTERN
+    match = RECORD_PATTERN.match(lc._log_formatter().format(records[1]).encode())
+    assert match is not None and match.group(2) == b"INFO"
+
+
+def test_rollover_never_reuses_segment_name():
+    """Dos workers que rotan en el mismo segundo crean segmentos distintos"""
+    import utils.logging_config as lc
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        moment = datetime(2025, 1, 1, 12, 0, 0)
+        open(os.path.join(temp_dir, lc.segment_name(moment + timedelta(seconds=1)) + '.gz'), 'w').close()
+
+        first = lc._create_segment(temp_dir, moment)
+        second = lc._create_segment(temp_dir, moment)
+
+        assert os.path.basename(first) == lc.segment_name(moment)
+        assert os.path.basename(second) == lc.segment_name(moment + timedelta(seconds=2))
@@ -0,0 +1,51 @@
+"""
+Pruebas para el archivo page_helpers.py
+"""
+from selenium.webdriver.common.by import By
+from actions.page_helpers import _xpath_literal, to_page_locator
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class _FakeDriver:
+    """Solo registra las búsquedas hechas con Selenium"""
+
+    def __init__(self):
+        self.searches = []
+
+    def find_element(self, by, value):
+        self.searches.append((by, value))
+        return f"elemento:{value}"
+
+
+def test_xpath_literal_quotes():
+    """Los valores con comillas siguen siendo literales XPath válidos"""
+    assert _xpath_literal('buscar') == "'buscar'"
+    assert _xpath_literal("it's") == '"it\'s"'
+    assert _xpath_literal('a\'b"c') == "concat('a', \"'\", 'b\"c')"
+
+
+def test_css_and_xpath_locators_pass_through():
+    """Los selectores CSS y XPath se resuelven en la página sin llamar a Selenium"""
+    driver = _FakeDriver()
+    assert to_page_locator(driver, '#buscar') == ('css', '#buscar')
+    assert to_page_locator(driver, (By.CSS_SELECTOR, '.item')) == ('css', '.item')
+    assert to_page_locator(driver, (By.XPATH, '//a')) == ('xpath', '//a')
+    assert driver.searches == []
+
+
+def test_id_and_name_become_xpath():
+    """By.ID y By.NAME se traducen a XPath escapando el valor"""
+    driver = _FakeDriver()
+    assert to_page_locator(driver, (By.ID, 'x')) == ('xpath', "//*[@id='x']")
+    assert to_page_locator(driver, (By.NAME, "it's")) == ('xpath', '//*[@name="it\'s"]')
+    assert driver.searches == []
+
+
+def test_other_locators_resolved_with_selenium():
+    """Los locators sin equivalente en la página devuelven el elemento encontrado por Selenium"""
+    driver = _FakeDriver()
+    assert to_page_locator(driver, (By.LINK_TEXT, 'Inicio')) == ('element', 'elemento:Inicio')
+    assert driver.searches == [(By.LINK_TEXT, 'Inicio')]
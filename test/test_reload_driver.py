@@ -0,0 +1,126 @@
+"""
+Pruebas para el archivo reload_driver.py
+"""
+from selenium.common.exceptions import NoAlertPresentException
+import actions.reload_driver as rd
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class _FakeAlert:
+    def __init__(self):
+        self.accepted = False
+
+    def accept(self):
+        self.accepted = True
+
+
+class _FakeSwitchTo:
+    def __init__(self, alert):
+        self._alert = alert
+
+    @property
+    def alert(self):
+        if self._alert is None:
+            raise NoAlertPresentException()
+        return self._alert
+
+
+class _FakeDriver:
+    def __init__(self, chromium=True, alert=None):
+        self.session_id = 'sesion-test'
+        self.current_url = 'https://example.com/'
+        self.capabilities = {'browserName': 'chrome' if chromium else 'firefox'}
+        self.switch_to = _FakeSwitchTo(alert)
+        self.scripts = []
+        self.cdp_calls = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_calls.append((command, params))
+        return {}
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    """Sustituye las esperas de settle.py y registra las llamadas"""
+    calls = {'armed': [], 'outcome': 'navigated', 'ready': 0, 'invalidated': 0}
+
+    def fake_wait_for_document_ready(*args, **kwargs):
+        calls['ready'] += 1
+
+    def fake_invalidate(driver):
+        calls['invalidated'] += 1
+
+    monkeypatch.setattr(rd, 'arm_effect', lambda driver, kind: calls['armed'].append(kind) or {'kind': kind})
+    monkeypatch.setattr(rd, 'wait_for_effect', lambda driver, effect, timeout: calls['outcome'])
+    monkeypatch.setattr(rd, 'wait_for_document_ready', fake_wait_for_document_ready)
+    monkeypatch.setattr(rd, 'invalidate_element_cache', fake_invalidate)
+    return calls
+
+
+def test_invalid_mode_and_spa_without_hook(waits):
+    """El modo se valida antes de tocar la página"""
+    driver = _FakeDriver()
+    with pytest.raises(Exception, match='no soportado'):
+        rd.reload_driver(driver, mode='forzada')
+    with pytest.raises(Exception, match='spa_hook'):
+        rd.reload_driver(driver, mode='spa')
+    assert driver.scripts == [] and waits['armed'] == []
+
+
+def test_hard_reload_uses_cdp_ignore_cache(waits):
+    """En Chromium la recarga es Page.reload (ignoreCache en 'hard') y se invalida la caché de elementos"""
+    driver = _FakeDriver()
+    rd.reload_driver(driver, mode='hard')
+    rd.reload_driver(driver)
+
+    assert driver.cdp_calls == [('Page.reload', {'ignoreCache': True}), ('Page.reload', {'ignoreCache': False})]
+    assert waits['armed'] == ['navigation', 'navigation']
+    assert waits['invalidated'] == 2
+
+
+def test_hard_reload_without_cdp(waits):
+    """Sin CDP la recarga forzada usa location.reload(true)"""
+    driver = _FakeDriver(chromium=False)
+    rd.reload_driver(driver, mode='hard')
+    assert "window.location.reload(true);" in driver.scripts
+
+
+def test_spa_mode_calls_hook_without_reloading(waits):
+    """En 'spa' solo se llama al hook y se espera cualquier efecto"""
+    refreshed = []
+    driver = _FakeDriver()
+    waits['outcome'] = 'timeout'
+
+    rd.reload_driver(driver, mode='spa', spa_hook=refreshed.append)
+
+    assert refreshed == [driver]
+    assert waits['armed'] == ['any']
+    assert driver.cdp_calls == [] and waits['invalidated'] == 0
+
+
+def test_reload_that_does_not_navigate_fails(waits):
+    """Si no llega el documento nuevo la recarga es un error"""
+    waits['outcome'] = 'timeout'
+    with pytest.raises(Exception, match='no terminó de recargar'):
+        rd.reload_driver(_FakeDriver())
+
+
+def test_no_dialog_handler_skips_dialog_wait(waits, monkeypatch):
+    """Sin manejador de diálogos no se espera a ninguno: solo se acepta uno ya abierto"""
+    def fail_wait(*args, **kwargs):
+        raise AssertionError("no debería esperar al diálogo")
+
+    monkeypatch.setattr(rd, 'WebDriverWait', fail_wait)
+    rd.reload_driver(_FakeDriver())
+    assert waits['ready'] == 0
+
+    alert = _FakeAlert()
+    rd.reload_driver(_FakeDriver(alert=alert))
+    assert alert.accepted and waits['ready'] == 1
@@ -0,0 +1,88 @@
+"""
+Pruebas para el archivo request_logging.py
+"""
+from utils.request_logging import (
+    REDACTED,
+    end_request_log,
+    format_payload,
+    log_payload,
+    start_request_log,
+    summarize_payload
+)
+import base64
+import logging
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+def test_redacts_sensitive_keys_at_any_depth():
+    """Las claves sensibles se ocultan en diccionarios y listas anidados"""
+    data = {
+        "username": "user",
+        "Password": "secreto",
+        "accounts": [{"name": "a", "token": "t1"}, {"name": "b", "credentials": {"api_key": "k"}}]
+    }
+
+    summary = summarize_payload(data)
+
+    assert summary["username"] == "user"
+    assert summary["Password"] == REDACTED
+    assert summary["accounts"][0] == {"name": "a", "token": REDACTED}
+    assert summary["accounts"][1]["credentials"]["api_key"] == REDACTED
+    # El payload original no se modifica
+    assert data["Password"] == "secreto"
+
+
+def test_custom_sensitive_keys():
+    """Se pueden indicar otras claves sensibles"""
+    summary = summarize_payload({"dni": "123", "password": "x"}, sensitive_keys=["dni"])
+    assert summary == {"dni": REDACTED, "password": "x"}
+
+
+def test_truncates_large_values_with_size_and_hash():
+    """Un base64 grande se sustituye por un resumen con tamaño y hash"""
+    file_content = base64.b64encode(b"x" * 1024 * 1024).decode()
+
+    summary = summarize_payload({"file": file_content, "raw": b"\x00" * 2048})
+
+    assert len(summary["file"]) < 100
+    assert f"{len(file_content)} chars sha256:" in summary["file"]
+    assert summary["raw"].startswith("<2048 bytes sha256:")
+    # Mismo contenido, mismo hash
+    assert summary["file"] == summarize_payload({"file": file_content})["file"]
+
+
+def test_limits_items():
+    """Las listas largas se recortan indicando cuántos elementos se omiten"""
+    summary = summarize_payload({"ids": list(range(100))}, max_items=10)
+    assert summary["ids"][:10] == list(range(10))
+    assert summary["ids"][10] == "... 90 more items"
+
+
+def test_format_payload_caps_bytes():
+    """El texto del payload nunca supera max_bytes"""
+    data = {f"campo_{i}": "valor" * 20 for i in range(200)}
+    text = format_payload(data, max_bytes=500)
+    assert len(text.encode('utf-8')) <= 500
+    assert "truncated" in text
+    assert format_payload("ok") == "ok"
+
+
+def test_log_payload_request_budget(caplog):
+    """Al agotar el presupuesto de la petición los payloads se omiten"""
+    token = start_request_log(max_bytes=300)
+    try:
+        with caplog.at_level(logging.INFO):
+            log_payload("Request:", {"data": "a" * 200})
+            log_payload("Request:", {"data": "b" * 200})
+            log_payload("Request:", {"data": "c"})
+    finally:
+        end_request_log(token)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 3
+    assert "a" * 200 in messages[0]
+    assert "truncated" in messages[1]
+    assert "omitted" in messages[2]
@@ -0,0 +1,194 @@
+"""
+Pruebas para el archivo retry.py
+"""
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    InvalidSelectorException,
+    InvalidSessionIdException,
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    UnexpectedAlertPresentException,
+    WebDriverException
+)
+from urllib3.exceptions import ReadTimeoutError
+from utils.config import CIRCUIT_BREAKER_COOLDOWN, CIRCUIT_BREAKER_MIN_CALLS
+from utils.error import CircuitOpenError
+import utils.retry as retry
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+pytestmark = pytest.mark.usefixtures('isolated_state')
+
+
+def test_classify_error():
+    """Los errores se clasifican según afecten al elemento o al sitio"""
+    assert retry.classify_error(StaleElementReferenceException()) == 'stale'
+    assert retry.classify_error(ElementClickInterceptedException()) == 'intercepted'
+    assert retry.classify_error(TimeoutException()) == 'timeout'
+    assert retry.classify_error(WebDriverException('net::ERR_CONNECTION_REFUSED')) == 'network'
+    assert retry.classify_error(InvalidSelectorException()) == 'fatal'
+    assert retry.classify_error(None) == 'unverified'
+
+
+def test_only_transient_errors_are_network():
+    """Los errores de conexión son transitorios; el resto de WebDriverException son deterministas"""
+    assert retry.classify_error(ReadTimeoutError(None, '/session', 'read timed out')) == 'network'
+    assert retry.classify_error(ConnectionRefusedError()) == 'network'
+    for error in (NoSuchElementException(), JavascriptException(), InvalidSessionIdException(),
+                  UnexpectedAlertPresentException(), WebDriverException('unknown error')):
+        assert retry.classify_error(error) == 'fatal'
+
+    for _ in range(CIRCUIT_BREAKER_MIN_CALLS * 2):
+        retry.record_result('https://example.com', False, retry.classify_error(JavascriptException()))
+    retry.check_circuit('https://example.com')
+
+
+def test_backoff_grows_and_is_capped():
+    """La espera crece exponencialmente hasta max_delay"""
+    policy = retry.RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+    assert [policy.delay(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_jitter_stays_within_bounds():
+    """El jitter solo reduce la espera, nunca la aumenta"""
+    policy = retry.RetryPolicy(base_delay=1, max_delay=10, jitter=0.5)
+    for _ in range(50):
+        assert 0.5 <= policy.delay(0) <= 1
+
+
+def test_stale_retries_without_delay():
+    """Los elementos obsoletos se reintentan sin esperar"""
+    policy = retry.RetryPolicy()
+    assert policy.delay(2, StaleElementReferenceException()) == 0
+
+
+def test_call_retries_until_success():
+    """call reintenta los errores reintentables y devuelve el resultado"""
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TimeoutException()
+        return 'ok'
+
+    assert retry.RetryPolicy(max_attempts=3).call(flaky) == 'ok'
+    assert len(calls) == 3
+
+
+def test_fatal_errors_are_not_retried():
+    """Los errores fatales se propagan en el primer intento"""
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise InvalidSelectorException()
+
+    with pytest.raises(InvalidSelectorException):
+        retry.RetryPolicy(max_attempts=5).call(broken)
+    assert len(calls) == 1
+
+
+def test_circuit_opens_after_site_errors():
+    """Con demasiados errores de carga el circuito se abre y falla rápido"""
+    for _ in range(CIRCUIT_BREAKER_MIN_CALLS):
+        retry.record_result('https://down.example.com/a', False, 'timeout')
+
+    with pytest.raises(CircuitOpenError):
+        retry.check_circuit('https://down.example.com/b')
+    retry.check_circuit('https://healthy.example.com')
+    assert retry.get_circuit_stats()['down.example.com']['state'] == 'open'
+
+
+def test_element_errors_do_not_open_circuit():
+    """Los errores de elemento no cuentan para la salud del sitio"""
+    for _ in range(CIRCUIT_BREAKER_MIN_CALLS * 2):
+        retry.record_result('https://example.com', False, 'intercepted')
+    retry.check_circuit('https://example.com')
+
+
+def test_circuit_half_opens_after_cooldown(monkeypatch):
+    """Tras el enfriamiento se permite una prueba y un éxito cierra el circuito"""
+    for _ in range(CIRCUIT_BREAKER_MIN_CALLS):
+        retry.record_result('https://example.com', False, 'network')
+
+    now = retry.time.time()
+    monkeypatch.setattr(retry.time, 'time', lambda: now + CIRCUIT_BREAKER_COOLDOWN + 1)
+    retry.check_circuit('https://example.com')
+    assert retry.get_circuit_stats()['example.com']['state'] == 'half_open'
+
+    retry.record_result('https://example.com', True)
+    assert retry.get_circuit_stats()['example.com']['state'] == 'closed'
+
+
+def test_half_open_admits_a_single_probe(monkeypatch):
+    """Con el circuito semiabierto solo pasa una prueba hasta que registra su resultado"""
+    for _ in range(CIRCUIT_BREAKER_MIN_CALLS):
+        retry.record_result('https://example.com', False, 'network')
+
+    now = retry.time.time()
+    monkeypatch.setattr(retry.time, 'time', lambda: now + CIRCUIT_BREAKER_COOLDOWN + 1)
+    retry.check_circuit('https://example.com')
+    with pytest.raises(CircuitOpenError):
+        retry.check_circuit('https://example.com')
+
+    # Un error que no dice nada del sitio libera la prueba sin cerrar el circuito
+    retry.record_result('https://example.com', False, 'fatal')
+    retry.check_circuit('https://example.com')
+    with pytest.raises(CircuitOpenError):
+        retry.check_circuit('https://example.com')
+
+    retry.record_result('https://example.com', True)
+    retry.check_circuit('https://example.com')
+    retry.check_circuit('https://example.com')
+
+
+def test_get_page_probe_closes_half_open_circuit(monkeypatch):
+    """get_page comprueba el circuito sin ocupar la prueba: driver.get la usa y la cierra"""
+    import actions.web_driver as web_driver
+
+    class _FakeDriver:
+        session_id = 'sesion-test'
+
+        def __init__(self):
+            self.visited = []
+
+        def get(self, url):
+            self.visited.append(url)
+
+        def quit(self):
+            pass
+
+    driver = _FakeDriver()
+    monkeypatch.setattr(web_driver, 'get_driver_chrome', lambda: driver)
+    monkeypatch.setattr(web_driver, 'stealth', lambda *args, **kwargs: None)
+    monkeypatch.setattr(web_driver, 'capture_step', lambda *args: None)
+    for _ in range(CIRCUIT_BREAKER_MIN_CALLS):
+        retry.record_result('https://example.com', False, 'network')
+
+    with pytest.raises(CircuitOpenError):
+        web_driver.get_page(url='https://example.com/a')
+
+    now = retry.time.time()
+    monkeypatch.setattr(retry.time, 'time', lambda: now + CIRCUIT_BREAKER_COOLDOWN + 1)
+    assert web_driver.get_page(url='https://example.com/a') is driver
+    assert driver.visited == ['https://example.com/a']
+    assert retry.get_circuit_stats()['example.com']['state'] == 'closed'
+
+
+def test_check_without_claim_leaves_probe_free(monkeypatch):
+    """Consultar el circuito con claim=False no bloquea la prueba de RetryPolicy.call"""
+    for _ in range(CIRCUIT_BREAKER_MIN_CALLS):
+        retry.record_result('https://example.com', False, 'network')
+    now = retry.time.time()
+    monkeypatch.setattr(retry.time, 'time', lambda: now + CIRCUIT_BREAKER_COOLDOWN + 1)
+
+    retry.check_circuit('https://example.com', claim=False)
+    assert retry.RetryPolicy().call(lambda: 'ok', url='https://example.com') == 'ok'
+    assert retry.get_circuit_stats()['example.com']['state'] == 'closed'
@@ -0,0 +1,93 @@
+"""
+Pruebas para el archivo search_element.py
+"""
+from selenium.common.exceptions import TimeoutException
+import actions.page_helpers as ph
+import actions.search_element as se
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+LOCATOR = ('css selector', 'input[name="q"]')
+
+
+class _FakeElement:
+    def __init__(self, name, visible=True):
+        self.name = name
+        self.visible = visible
+
+
+class _FakeDriver:
+    """Devuelve en cada find_elements la siguiente lista de `rounds` (la última se repite)"""
+
+    def __init__(self, *rounds):
+        self.session_id = 'sesion-test'
+        self.current_url = 'https://example.com/'
+        self.rounds = list(rounds)
+        self.searches = 0
+
+    def find_elements(self, by, value):
+        self.searches += 1
+        return self.rounds.pop(0) if len(self.rounds) > 1 else self.rounds[0]
+
+    def execute_script(self, script, *args):
+        if script is ph._CALL_SCRIPT and args[1] == 'visible':
+            return [element.visible for element in args[2]]
+        return 'complete'
+
+
+@pytest.fixture(autouse=True)
+def isolated_probes(monkeypatch):
+    monkeypatch.setattr(se, '_probe_stats', {'probes': 0, 'hits': 0, 'misses': 0, 'time_saved': 0.0})
+    monkeypatch.setattr(se.time, 'sleep', lambda seconds: None)
+
+
+def test_probe_hit_returns_first_visible():
+    """Con el elemento ya visible se devuelve sin esperar"""
+    element = _FakeElement('campo')
+    driver = _FakeDriver([_FakeElement('oculto', visible=False), element])
+
+    assert se.search_element(driver, LOCATOR, probe=True) is element
+    assert driver.searches == 1
+    assert se.get_probe_stats()['hits'] == 1
+
+
+def test_probe_ignores_hidden_elements():
+    """Un elemento presente pero oculto es un fallo, como en la espera normal"""
+    driver = _FakeDriver([_FakeElement('oculto', visible=False)])
+
+    assert se.search_element(driver, LOCATOR, probe=True, raise_exception=False, settle_time=0.05) is None
+    stats = se.get_probe_stats()
+    assert stats['misses'] == 1 and stats['hits'] == 0
+    assert stats['time_saved'] > 0
+
+
+def test_probe_waits_settle_window():
+    """Un elemento que aparece durante la ventana de asentamiento se encuentra"""
+    element = _FakeElement('tardío')
+    driver = _FakeDriver([], [], [element])
+
+    assert se.search_element(driver, LOCATOR, probe=True, settle_time=5) is element
+    assert driver.searches == 3
+    assert se.get_probe_stats() == {'probes': 1, 'hits': 1, 'misses': 0, 'time_saved': 0.0}
+
+
+def test_optional_timeout_is_not_recorded(monkeypatch):
+    """Un elemento opcional que no aparece no alimenta los timeouts adaptativos"""
+    class _FailingWait:
+        def until(self, condition):
+            raise TimeoutException()
+
+    recorded = []
+    monkeypatch.setattr(se, 'ADAPTIVE_TIMEOUTS', True)
+    monkeypatch.setattr(se, 'get_wait', lambda driver, locator, url: _FailingWait())
+    monkeypatch.setattr(se, 'record_latency', lambda *args, **kwargs: recorded.append(kwargs))
+    driver = _FakeDriver([])
+
+    assert se.search_element(driver, LOCATOR, raise_exception=False) is None
+    assert recorded == []
+    with pytest.raises(Exception):
+        se.search_element(driver, LOCATOR)
+    assert recorded == [{'success': False}]
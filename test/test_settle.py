@@ -0,0 +1,115 @@
+"""
+Pruebas para el archivo settle.py
+"""
+from selenium.common.exceptions import WebDriverException
+import actions.settle as settle
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class _FakeDriver:
+    """Registra los scripts y devuelve los resultados de la espera indicados por el test"""
+
+    def __init__(self, outcome=True, new_document=(True,)):
+        self.session_id = 'sesion-test'
+        self.current_url = 'https://example.com/'
+        self.outcome = outcome
+        self.new_document = list(new_document)
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        if script is settle._NEW_DOCUMENT_SCRIPT:
+            return self.new_document.pop(0) if len(self.new_document) > 1 else self.new_document[0]
+        return None
+
+    def execute_async_script(self, script, *args):
+        self.scripts.append((script, args))
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture(autouse=True)
+def isolated_stats(monkeypatch):
+    monkeypatch.setattr(settle, '_settle_stats', {})
+    invalidated = []
+    monkeypatch.setattr(settle, 'invalidate_element_cache', invalidated.append)
+    return invalidated
+
+
+def test_element_stable_returns_early_and_records_savings():
+    """La espera termina en cuanto la página confirma y cuenta el ahorro frente a la pausa fija"""
+    driver = _FakeDriver(outcome=True)
+
+    assert settle.wait_for_element_stable(driver, 'elemento', budget=1, replaces=0.5, action='click')
+
+    script, args = driver.scripts[0]
+    assert script is settle._SETTLE_SCRIPT and args == ('stable', 'elemento', None, 1)
+    stats = settle.get_settle_stats()['click']
+    assert stats['waits'] == 1 and 0 < stats['saved'] <= 0.5
+
+
+def test_settle_timeout_or_error_returns_false():
+    """Sin asentarse en el presupuesto (o sin poder esperar) se devuelve False"""
+    assert not settle.wait_for_scroll_end(_FakeDriver(outcome=False), 'elemento', budget=0.1)
+    assert not settle.wait_for_value(_FakeDriver(outcome=WebDriverException()), 'campo', 'x', budget=0.1)
+
+
+def test_arm_effect_validates_kind_and_returns_token():
+    """El efecto armado lleva un token nuevo y la URL de partida"""
+    driver = _FakeDriver()
+    effect = settle.arm_effect(driver, 'network', '#resultados')
+
+    script, args = driver.scripts[0]
+    assert script is settle._ARM_EFFECT_SCRIPT and args == (effect['token'], '#resultados')
+    assert effect['kind'] == 'network' and effect['url'] == 'https://example.com/'
+    assert settle.arm_effect(driver)['token'] != effect['token']
+    with pytest.raises(Exception):
+        settle.arm_effect(driver, 'hover')
+
+
+def test_wait_for_effect_returns_page_outcome():
+    """El resultado de la espera dentro de la página se devuelve tal cual"""
+    driver = _FakeDriver(outcome='mutation')
+    effect = settle.arm_effect(driver, 'mutation')
+
+    assert settle.wait_for_effect(driver, effect, budget=1, quiet=0.2) == 'mutation'
+    script, args = driver.scripts[-1]
+    assert script is settle._WAIT_EFFECT_SCRIPT and args == (effect['token'], 'mutation', 0.2, 1)
+
+
+def test_unloaded_document_becomes_navigated(isolated_stats, monkeypatch):
+    """Si el documento se descarga se espera al nuevo documento y se invalida la caché de elementos"""
+    recorded = []
+    monkeypatch.setattr(settle, 'record_latency', lambda *args: recorded.append(args))
+    driver = _FakeDriver(outcome=WebDriverException('document unloaded'), new_document=(False, True))
+    effect = settle.arm_effect(driver, 'navigation')
+
+    assert settle.wait_for_effect(driver, effect, budget=2) == 'navigated'
+
+    assert isolated_stats == [driver]
+    assert recorded and recorded[0][1] == settle.LOAD
+
+
+def test_unloaded_without_new_document_times_out():
+    """Si el documento nuevo no termina de cargar en el presupuesto el resultado es 'timeout'"""
+    driver = _FakeDriver(outcome='unloaded', new_document=(False,))
+    effect = settle.arm_effect(driver, 'navigation')
+
+    assert settle.wait_for_effect(driver, effect, budget=0.1) == 'timeout'
+
+
+def test_wait_for_activity_does_not_wait_for_idle():
+    """La primera señal de actividad basta; un documento descargado invalida la caché"""
+    driver = _FakeDriver(outcome='network')
+    effect = settle.arm_effect(driver)
+    assert settle.wait_for_activity(driver, effect, budget=1) == 'network'
+    script, args = driver.scripts[-1]
+    assert script is settle._ACTIVITY_SCRIPT and args == (effect['token'], 1)
+
+    driver.outcome = WebDriverException('unloaded')
+    assert settle.wait_for_activity(driver, effect, budget=1) == 'unloaded'
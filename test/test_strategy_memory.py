@@ -0,0 +1,122 @@
+"""
+Pruebas para el archivo strategy_memory.py
+"""
+import utils.strategy_memory as sm
+import json
+import time
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+METHODS = ['basic', 'actions', 'direct', 'javascript']
+
+
+pytestmark = pytest.mark.usefixtures('isolated_state')
+
+
+def test_strategy_key_uses_domain_and_locator():
+    """La clave combina acción, dominio y locator"""
+    key = sm.strategy_key('click', 'https://example.com/path?q=1', ('css selector', '#ok'))
+    assert key == 'click|example.com|css selector=#ok'
+    assert sm.strategy_key('write', 'https://example.com/') == 'write|example.com|*'
+
+
+def test_default_order_without_history():
+    """Sin historial se respeta el orden por defecto"""
+    key = sm.strategy_key('click', 'https://example.com')
+    assert sm.order_methods(key, METHODS) == METHODS
+
+
+def test_successful_method_goes_first():
+    """El método que funcionó pasa a ser el primero"""
+    key = sm.strategy_key('click', 'https://example.com')
+    for name in ['basic', 'actions', 'direct']:
+        sm.record_outcome(key, name, False)
+    sm.record_outcome(key, 'javascript', True)
+
+    assert sm.order_methods(key, METHODS)[0] == 'javascript'
+
+
+def test_memory_is_per_domain():
+    """Lo aprendido en un dominio no afecta a otro"""
+    key = sm.strategy_key('click', 'https://a.example.com')
+    sm.record_outcome(key, 'javascript', True)
+
+    other = sm.strategy_key('click', 'https://b.example.com')
+    assert sm.order_methods(other, METHODS) == METHODS
+
+
+def test_old_outcomes_decay():
+    """Los resultados antiguos pesan menos que los recientes"""
+    key = sm.strategy_key('click', 'https://example.com')
+    old = time.time() - sm.STRATEGY_MEMORY_HALF_LIFE_DAYS * 86400 * 10
+    sm._load()[key] = {'javascript': [5, 0, old]}
+
+    stats = sm.get_strategy_stats()[key]['javascript']
+    assert stats['successes'] < 0.1
+
+
+def test_stats_and_persistence(isolated_state):
+    """Las estadísticas se exponen y se guardan en disco"""
+    key = sm.strategy_key('write', 'https://example.com')
+    sm.record_outcome(key, 'javascript', True)
+    sm.record_outcome(key, 'basic', False)
+    sm.save_strategies()
+
+    stats = sm.get_strategy_stats()[key]
+    assert stats['javascript']['success_rate'] > stats['basic']['success_rate']
+
+    with open(isolated_state.strategies_file, 'r') as f:
+        assert key in json.load(f)
+
+    sm._memory = None
+    assert sm.order_methods(key, METHODS)[0] == 'javascript'
+
+
+def test_disabled_memory_keeps_default_order(monkeypatch):
+    """Con STRATEGY_MEMORY desactivado no se reordena ni se registra nada"""
+    monkeypatch.setattr(sm, 'STRATEGY_MEMORY', False)
+    key = sm.strategy_key('click', 'https://example.com')
+    sm.record_outcome(key, 'javascript', True)
+
+    assert sm.order_methods(key, METHODS) == METHODS
+    assert sm.get_strategy_stats() == {}
+
+
+def test_save_merges_outcomes_from_other_workers(isolated_state):
+    """Al guardar se suman los resultados de este proceso a los que otro worker escribió"""
+    key = sm.strategy_key('click', 'https://example.com')
+    now = sm.time.time()
+    # Guardado reciente: el resultado queda pendiente hasta save_strategies
+    sm._last_save = now
+    sm.record_outcome(key, 'javascript', True)
+    with open(isolated_state.strategies_file, 'w') as f:
+        json.dump({key: {'javascript': [2, 1, now]}, 'click|other.example.com|*': {'basic': [1, 0, now]}}, f)
+
+    sm.save_strategies()
+
+    with open(isolated_state.strategies_file, 'r') as f:
+        saved = json.load(f)
+    assert saved[key]['javascript'][:2] == [3, 1]
+    assert 'click|other.example.com|*' in saved
+
+
+def test_failed_save_keeps_pending_outcomes(isolated_state, monkeypatch):
+    """Si el fichero no se puede guardar los resultados siguen pendientes para el siguiente guardado"""
+    key = sm.strategy_key('click', 'https://example.com')
+    save_state = sm.save_state
+    failing = [True]
+    monkeypatch.setattr(sm, 'save_state', lambda path, data: not failing[0] and save_state(path, data))
+    sm._last_save = sm.time.time()
+    sm.record_outcome(key, 'basic', True)
+
+    sm.save_strategies()
+    assert key in sm._pending
+
+    failing[0] = False
+    sm.save_strategies()
+    assert sm._pending == {}
+    with open(isolated_state.strategies_file, 'r') as f:
+        assert json.load(f)[key]['basic'][:2] == [1, 0]
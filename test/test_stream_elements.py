@@ -0,0 +1,108 @@
+"""
+Pruebas para el archivo stream_elements.py
+"""
+from selenium.webdriver.common.by import By
+import actions.stream_elements as se
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+class _FakeDriver:
+    """
+    Simula el listado: cada avance (scroll o clic) programa las cosechas siguientes.
+    batches: lista de cosechas (listas de filas) que devuelve _HARVEST_SCRIPT en orden;
+    waits: resultados de _WAIT_SCRIPT ('mutated' o 'timeout', que avanza el reloj)
+    """
+
+    def __init__(self, clock, batches, waits=None, next_buttons=0):
+        self.clock = clock
+        self.batches = list(batches)
+        self.waits = list(waits or [])
+        self.next_buttons = next_buttons
+        self.clicks = 0
+        self.harvests = 0
+
+    def execute_script(self, script, *args):
+        if script is se._OBSERVER_SCRIPT:
+            return self.harvests
+        if script is se._HARVEST_SCRIPT:
+            self.harvests += 1
+            return self.batches.pop(0) if self.batches else []
+        self.clicks += 1
+        self.next_buttons -= 1
+
+    def execute_async_script(self, script, before, timeout):
+        outcome = self.waits.pop(0) if self.waits else 'timeout'
+        if outcome == 'timeout':
+            self.clock.now += timeout
+        return outcome
+
+    def find_elements(self, by, value):
+        return ['next'] if self.next_buttons > 0 else []
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(se, 'time', clock)
+    return clock
+
+
+def test_scroll_keeps_waiting_after_empty_harvest(clock):
+    """Un cambio sin filas (spinner) no termina el scroll infinito antes de wait_timeout"""
+    driver = _FakeDriver(clock, [[{'id': 1}], [], [{'id': 2}]], waits=['mutated', 'mutated'])
+
+    rows = list(se.stream_extract(driver, '.row', {'id': 'text'}, wait_timeout=5))
+
+    assert rows == [{'id': 1}, {'id': 2}]
+    assert clock.now >= 5
+
+
+def test_scroll_stops_after_wait_timeout_without_rows(clock):
+    """Sin filas nuevas durante wait_timeout el listado termina"""
+    driver = _FakeDriver(clock, [[{'id': 1}]], waits=['mutated', 'mutated', 'mutated'])
+
+    rows = list(se.stream_extract(driver, '.row', {'id': 'text'}, wait_timeout=5))
+
+    assert rows == [{'id': 1}]
+    assert clock.now == 5
+
+
+def test_deduplicates_and_limits_items(clock):
+    """Las filas repetidas se descartan por key y max_items corta el generador"""
+    driver = _FakeDriver(clock, [[{'id': 1}, {'id': 1}], [{'id': 2}, {'id': 3}]], waits=['mutated'])
+
+    rows = list(se.stream_extract(driver, (By.XPATH, '//li'), {'id': 'text'}, key='id', max_items=2))
+
+    assert rows == [{'id': 1}, {'id': 2}]
+
+
+def test_pagination_stops_without_next_button(clock):
+    """Con next_locator se hace clic mientras haya botón siguiente"""
+    driver = _FakeDriver(clock, [[{'id': 1}], [{'id': 2}], [{'id': 3}]],
+                         waits=['mutated', 'mutated'], next_buttons=2)
+
+    rows = list(se.stream_extract(driver, '.row', {'id': 'text'}, next_locator=(By.CSS_SELECTOR, '.next')))
+
+    assert rows == [{'id': 1}, {'id': 2}, {'id': 3}]
+    assert driver.clicks == 2
+
+
+def test_max_pages_limits_advances(clock):
+    """max_pages limita el número de avances"""
+    driver = _FakeDriver(clock, [[{'id': 1}], [{'id': 2}], [{'id': 3}]], waits=['mutated', 'mutated'])
+
+    rows = list(se.stream_extract(driver, '.row', {'id': 'text'}, max_pages=1))
+
+    assert rows == [{'id': 1}, {'id': 2}]
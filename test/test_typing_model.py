@@ -0,0 +1,52 @@
+"""
+Pruebas para el archivo typing_model.py
+"""
+from utils.typing_model import MIN_DELAY, build_keystroke_delays
+import random
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+def test_one_delay_per_character():
+    """Se genera una pausa por carácter y la primera tecla no espera"""
+    delays = build_keystroke_delays("hola mundo", rng=random.Random(1))
+    assert len(delays) == len("hola mundo")
+    assert delays[0] == 0
+
+
+def test_empty_text():
+    """Un texto vacío no genera pausas"""
+    assert build_keystroke_delays("") == []
+
+
+def test_total_duration_is_capped():
+    """La suma de las pausas nunca supera la duración máxima"""
+    text = "texto bastante largo para superar el límite " * 10
+    delays = build_keystroke_delays(text, max_duration=3, rng=random.Random(2))
+    assert sum(delays) <= 3 + 1e-9
+
+
+def test_short_text_is_not_stretched():
+    """Si el modelo no supera el límite, las pausas no se escalan"""
+    delays = build_keystroke_delays("abc", max_duration=100, rng=random.Random(3))
+    assert all(delay >= MIN_DELAY for delay in delays[1:])
+    assert sum(delays) < 100
+
+
+def test_reproducible_with_seed():
+    """Con el mismo generador se obtienen las mismas pausas"""
+    text = "usuario@example.com"
+    assert build_keystroke_delays(text, rng=random.Random(4)) == \
+        build_keystroke_delays(text, rng=random.Random(4))
+
+
+def test_word_boundaries_are_slower():
+    """Las pausas tras un espacio son, de media, mayores que dentro de una palabra"""
+    text = "palabra " * 200
+    delays = build_keystroke_delays(text, max_duration=None, rng=random.Random(5))
+    after_space = [d for prev, d in zip(text, delays[1:]) if prev == ' ']
+    in_word = [d for prev, char, d in zip(text, text[1:], delays[1:])
+               if prev != ' ' and char != ' ']
+    assert sum(after_space) / len(after_space) > 2 * sum(in_word) / len(in_word)
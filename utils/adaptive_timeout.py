@@ -0,0 +1,155 @@
+import atexit
+import threading
+import time
+from urllib.parse import urlparse
+from utils.config import (
+    ADAPTIVE_TIMEOUTS,
+    ADAPTIVE_TIMEOUT_CEILING,
+    ADAPTIVE_TIMEOUT_FILE,
+    ADAPTIVE_TIMEOUT_FLOOR,
+    ADAPTIVE_TIMEOUT_MARGIN,
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    ADAPTIVE_TIMEOUT_PERCENTILE,
+    PAGE_MAX_TIMEOUT
+)
+from utils.state_store import load_state, save_state, state_lock
+
+# Número máximo de muestras que se conservan por clave (ventana deslizante)
+MAX_SAMPLES = 100
+# Segundos mínimos entre escrituras del fichero de estado
+SAVE_INTERVAL = 30
+# "Locator" de las cargas de página y efectos (navegaciones, recargas): tienen su propia clave
+# (dominio|load) para que las esperas de elementos, mucho más cortas, no fijen su timeout
+LOAD = 'load'
+
+_samples = None
+# Muestras registradas en este proceso desde el último guardado: se añaden a las del fichero,
+# que otros workers también actualizan
+_pending = {}
+_last_save = 0.0
+_lock = threading.Lock()
+
+
+def get_timeout(url, locator=None):
+    """
+    Devuelve el timeout (segundos) a usar para un dominio y, opcionalmente, un locator.
+
+    Usa el percentil ADAPTIVE_TIMEOUT_PERCENTILE de las latencias observadas multiplicado por
+    ADAPTIVE_TIMEOUT_MARGIN y acotado entre ADAPTIVE_TIMEOUT_FLOOR y ADAPTIVE_TIMEOUT_CEILING.
+    Si no hay suficientes muestras del locator se usa el dominio, y si tampoco, PAGE_MAX_TIMEOUT.
+    Las cargas de página (locator=LOAD) solo usan sus propias muestras.
+
+    Args:
+        url (str): URL actual del driver
+        locator (tuple | str, optional): Locator (By, valor) que se va a esperar, o LOAD
+
+    Returns:
+        float: Timeout en segundos
+    """
+    if not ADAPTIVE_TIMEOUTS:
+        return PAGE_MAX_TIMEOUT
+
+    with _lock:
+        samples = _load()
+        keys = (_key(url, LOAD),) if locator == LOAD else (_key(url, locator), _key(url))
+        for key in keys:
+            values = samples.get(key)
+            if values and len(values) >= ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+                timeout = _percentile(values, ADAPTIVE_TIMEOUT_PERCENTILE) * \
+                    ADAPTIVE_TIMEOUT_MARGIN
+                return min(max(timeout, ADAPTIVE_TIMEOUT_FLOOR), ADAPTIVE_TIMEOUT_CEILING)
+    return PAGE_MAX_TIMEOUT
+
+
+def record_latency(url, locator, seconds, success=True):
+    """
+    Registra el tiempo que tardó una página o un elemento en estar listo.
+
+    Las esperas de elementos alimentan el locator y el dominio; las cargas de página (LOAD)
+    solo su propia clave.
+
+    Cuando la espera falla por timeout la latencia real es desconocida (mayor que seconds),
+    así que se registra el doble, pero solo en la clave del locator (o de LOAD): un elemento
+    que suele faltar no debe subir el timeout del resto de elementos del dominio.
+
+    Args:
+        url (str): URL del driver
+        locator (tuple | str | None): Locator esperado, LOAD para cargas de página
+            o None para esperas sin locator
+        seconds (float): Tiempo observado
+        success (bool): False si la espera terminó por timeout
+    """
+    if not ADAPTIVE_TIMEOUTS or not url:
+        return
+    if locator == LOAD:
+        keys = [_key(url, LOAD)]
+    elif success:
+        keys = [_key(url)] if locator is None else [_key(url), _key(url, locator)]
+    else:
+        keys = [] if locator is None else [_key(url, locator)]
+    if not keys:
+        return
+    if not success:
+        seconds = min(seconds * 2, ADAPTIVE_TIMEOUT_CEILING)
+
+    with _lock:
+        samples = _load()
+        for key in keys:
+            values = samples.setdefault(key, [])
+            values.append(round(seconds, 3))
+            del values[:-MAX_SAMPLES]
+            _pending.setdefault(key, []).append(round(seconds, 3))
+
+        if time.time() - _last_save >= SAVE_INTERVAL:
+            _save()
+
+
+def save_timeouts():
+    """Persiste las muestras en ADAPTIVE_TIMEOUT_FILE (se llama también al salir del proceso)."""
+    with _lock:
+        if _samples is not None:
+            _save()
+
+
+def _key(url, locator=None):
+    domain = urlparse(url).netloc or url
+    if locator is None:
+        return domain
+    if locator == LOAD:
+        return f"{domain}|{LOAD}"
+    return f"{domain}|{locator[0]}={locator[1]}"
+
+
+def _percentile(values, percentile):
+    ordered = sorted(values)
+    index = min(int(round(percentile / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _load():
+    # Debe llamarse con _lock adquirido
+    global _samples
+    if _samples is None:
+        _samples = load_state(ADAPTIVE_TIMEOUT_FILE)
+    return _samples
+
+
+def _save():
+    # Debe llamarse con _lock adquirido. Se relee el fichero bajo un lock de fichero y se le añaden las
+    # muestras nuevas de este proceso, para no pisar las de otros workers. Si no se puede guardar,
+    # las muestras siguen pendientes para el siguiente guardado
+    global _samples, _pending, _last_save
+    _last_save = time.time()
+    with state_lock(ADAPTIVE_TIMEOUT_FILE):
+        samples = load_state(ADAPTIVE_TIMEOUT_FILE)
+        for key, values in _pending.items():
+            merged = samples.setdefault(key, [])
+            merged.extend(values)
+            del merged[:-MAX_SAMPLES]
+        if not save_state(ADAPTIVE_TIMEOUT_FILE, samples):
+            return
+    _samples = samples
+    _pending = {}
+
+
+atexit.register(save_timeouts)
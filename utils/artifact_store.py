@@ -0,0 +1,274 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from utils.config import (
+    ARTIFACT_IMAGE_FORMAT,
+    ARTIFACT_MAX_AGE_DAYS,
+    ARTIFACT_MAX_BYTES,
+    ARTIFACT_WEBP_QUALITY
+)
+from utils.state_store import load_state, save_state, state_lock
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Estructura del almacén:
+#   <root>/objects/ab/abcdef...<sha256>.<ext>   contenido (una vez por hash del contenido original)
+#   <root>/requests/<request_id>.json           artefactos de cada petición
+OBJECTS_DIRECTORY = 'objects'
+REQUESTS_DIRECTORY = 'requests'
+
+_IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'webp')
+_lock = threading.Lock()
+_stats = {'stored': 0, 'deduplicated': 0, 'bytes_saved': 0}
+_warned_no_pillow = False
+
+
+def put_artifact(data, root, kind='artifact', name=None, ext='bin', request_id=None, image_format=ARTIFACT_IMAGE_FORMAT):
+    """
+    Guarda un artefacto en el almacén direccionado por contenido.
+
+    El contenido se identifica por el sha256 de los bytes originales: si ya existe, no se vuelve
+    a escribir (solo se actualiza su fecha para la retención). Las imágenes se pueden guardar
+    recomprimidas o en WebP (image_format), si Pillow está instalado.
+
+    Args:
+        data (bytes): Contenido
+        root (str): Directorio del almacén
+        kind (str): Tipo de artefacto ('screenshot', 'download'...)
+        name (str, optional): Nombre descriptivo para el índice de la petición
+        ext (str): Extensión del contenido original
+        request_id (str, optional): Petición a la que se asocia ('-' o None = ninguna)
+        image_format (str): 'original', 'png' o 'webp'
+
+    Returns:
+        dict: {'sha256', 'path', 'size', 'stored_size', 'kind', 'deduplicated'}
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    existing = _find_object(root, digest)
+    if existing is None:
+        content, ext = _encode(data, ext, image_format)
+        path = os.path.join(root, OBJECTS_DIRECTORY, digest[:2], f"{digest}.{ext}")
+        _write_atomic(path, content)
+        deduplicated = False
+    else:
+        path = existing
+        os.utime(path)
+        deduplicated = True
+    return _register(root, digest, path, len(data), kind, name, request_id, deduplicated)
+
+
+def put_file(file_path, root, kind='download', name=None, request_id=None, move=False):
+    """
+    Guarda un fichero (p. ej. una descarga) en el almacén sin cargarlo entero en memoria.
+
+    Args:
+        file_path (str): Ruta del fichero
+        root (str): Directorio del almacén
+        kind (str): Tipo de artefacto
+        name (str, optional): Nombre descriptivo (por defecto el nombre del fichero)
+        request_id (str, optional): Petición a la que se asocia
+        move (bool): Si eliminar el fichero original tras guardarlo
+
+    Returns:
+        dict: Igual que put_artifact
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    size = os.path.getsize(file_path)
+    ext = os.path.splitext(file_path)[1].lstrip('.').lower() or 'bin'
+
+    existing = _find_object(root, digest)
+    if existing is None:
+        path = os.path.join(root, OBJECTS_DIRECTORY, digest[:2], f"{digest}.{ext}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(file_path, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        deduplicated = False
+    else:
+        path = existing
+        os.utime(path)
+        deduplicated = True
+
+    if move:
+        os.remove(file_path)
+    return _register(root, digest, path, size, kind, name or os.path.basename(file_path), request_id, deduplicated)
+
+
+def get_request_artifacts(root, request_id):
+    """
+    Artefactos guardados por una petición
+
+    Returns:
+        list: [{'sha256', 'path', 'kind', 'name', 'time'}] (solo los que siguen existiendo)
+    """
+    entries = load_state(_request_index_path(root, request_id)).get('artifacts', [])
+    return [entry for entry in entries if os.path.exists(entry['path'])]
+
+
+def prune_artifacts(root, max_bytes=ARTIFACT_MAX_BYTES, max_age_days=ARTIFACT_MAX_AGE_DAYS):
+    """
+    Aplica la retención del almacén: elimina los artefactos no usados en max_age_days días y,
+    si el total sigue superando max_bytes, los usados hace más tiempo. También elimina los
+    índices de peticiones antiguos.
+
+    Returns:
+        dict: {'deleted', 'freed', 'remaining'} (número de artefactos y bytes)
+    """
+    objects_directory = os.path.join(root, OBJECTS_DIRECTORY)
+    if not os.path.isdir(objects_directory):
+        return {'deleted': 0, 'freed': 0, 'remaining': 0}
+
+    now = time.time()
+    max_age = max_age_days * 86400
+    objects = []
+    for shard in os.listdir(objects_directory):
+        shard_path = os.path.join(objects_directory, shard)
+        if not os.path.isdir(shard_path):
+            continue
+        for file in os.listdir(shard_path):
+            if file.endswith('.tmp'):
+                continue
+            path = os.path.join(shard_path, file)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            objects.append((stat.st_mtime, stat.st_size, path))
+
+    objects.sort()
+    total = sum(size for _, size, _ in objects)
+    deleted = freed = 0
+    for mtime, size, path in objects:
+        if now - mtime <= max_age and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        deleted += 1
+        freed += size
+
+    requests_directory = os.path.join(root, REQUESTS_DIRECTORY)
+    if os.path.isdir(requests_directory):
+        for file in os.listdir(requests_directory):
+            path = os.path.join(requests_directory, file)
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    if deleted:
+        logging.info(f"Artifact retention: deleted {deleted} artifacts ({freed} bytes)")
+    return {'deleted': deleted, 'freed': freed, 'remaining': total}
+
+
+def get_artifact_stats():
+    """
+    Devuelve los contadores del almacén en este proceso
+
+    Returns:
+        dict: {'stored', 'deduplicated', 'bytes_saved'}
+    """
+    with _lock:
+        return dict(_stats)
+
+
+def _find_object(root, digest):
+    # El mismo contenido puede estar guardado con otra extensión (p. ej. convertido a WebP)
+    shard = os.path.join(root, OBJECTS_DIRECTORY, digest[:2])
+    try:
+        for file in os.listdir(shard):
+            if file.startswith(digest + '.') and not file.endswith('.tmp'):
+                return os.path.join(shard, file)
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def _encode(data, ext, image_format):
+    global _warned_no_pillow
+
+    ext = ext.lower()
+    if image_format == 'original' or ext not in _IMAGE_EXTENSIONS:
+        return data, ext
+    if Image is None:
+        if not _warned_no_pillow:
+            logging.warning("Pillow no está instalado: las imágenes se guardan en su formato original")
+            _warned_no_pillow = True
+        return data, ext
+    try:
+        output = io.BytesIO()
+        with Image.open(io.BytesIO(data)) as image:
+            if image_format == 'webp':
+                image.save(output, format='WEBP', quality=ARTIFACT_WEBP_QUALITY, method=4)
+                return output.getvalue(), 'webp'
+            image.save(output, format='PNG', optimize=True)
+        encoded = output.getvalue()
+        # Si recomprimir no reduce el tamaño se guarda el original
+        return (encoded, 'png') if len(encoded) < len(data) else (data, ext)
+    except Exception as e:
+        logging.warning(f"Could not convert image artifact, storing original: {e}")
+        return data, ext
+
+
+def _write_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _register(root, digest, path, size, kind, name, request_id, deduplicated):
+    artifact = {
+        'sha256': digest,
+        'path': path,
+        'size': size,
+        'stored_size': os.path.getsize(path),
+        'kind': kind,
+        'deduplicated': deduplicated
+    }
+    with _lock:
+        if deduplicated:
+            _stats['deduplicated'] += 1
+            _stats['bytes_saved'] += size
+        else:
+            _stats['stored'] += 1
+    if request_id and request_id != '-':
+        # Otros workers pueden añadir artefactos a la misma petición: lock de fichero
+        index_path = _request_index_path(root, request_id)
+        with state_lock(index_path):
+            index = load_state(index_path)
+            index.setdefault('artifacts', []).append(
+                {'sha256': digest, 'path': path, 'kind': kind, 'name': name, 'time': time.time()})
+            save_state(index_path, index)
+    return artifact
+
+
+def _request_index_path(root, request_id):
+    safe_id = re.sub(r'[^A-Za-z0-9._-]', '_', request_id)
+    return os.path.join(root, REQUESTS_DIRECTORY, f"{safe_id}.json")
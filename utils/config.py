@@ -14,9 +14,90 @@ BROWSER_LANGUAGE = os.getenv("BROWSER_LANGUAGE") or 'en'
 DOWNLOAD_DIR = os.path.abspath("temp_downloads")
 PORT = int(os.getenv("PORT", 3000))
 PAGE_MAX_TIMEOUT = 7
+# Ventana máxima (segundos) que espera search_element en modo probe tras document.readyState
+PROBE_SETTLE_TIMEOUT = 0.5
+# Presupuesto máximo (segundos) de cada espera por condición en las acciones (sustituye a los sleep fijos)
+SETTLE_BUDGET = 1.0
+# fill_form: en Chrome, los valores con al menos esta longitud se escriben con CDP Input.insertText
+FILL_FORM_INSERT_TEXT_MIN_LENGTH = 64
+# Duración máxima (segundos) de la escritura "humana" (slow=True) de un campo
+TYPING_MAX_DURATION = 8
+# Segundos sin peticiones ni mutaciones para dar por asentado el efecto de un click
+EFFECT_QUIET_WINDOW = 0.3
 DOWNLOAD_MAX_TIMEOUT = 4
 BASE_URL = 'https://www.google.com/'
 LOG_FILE_DELETION_DAYS = 30
+# Cola de logs: los hilos de las peticiones encolan y un hilo escribe en disco
+LOG_QUEUE_SIZE = 10000
+LOG_OVERFLOW_POLICY = os.getenv("LOG_OVERFLOW_POLICY", "drop_debug")
+# Limpieza de logs en segundo plano: como mucho una ejecución por intervalo entre todos los workers
+LOG_RETENTION_INTERVAL = 3600
+LOG_RETENTION_LOCK_TIMEOUT = 600
+# Rotación de logs por tamaño (bytes, 0 = sin límite) y/o cada hora; los segmentos cerrados se comprimen
+LOG_ROTATION_MAX_BYTES = 50 * 1024 * 1024
+LOG_ROTATION_HOURLY = os.getenv("LOG_ROTATION_HOURLY", "False") == "True"
+LOG_COMPRESSION = os.getenv("LOG_COMPRESSION", "gzip")
+# Índice de cada segmento de log: franjas de tiempo (segundos) -> offsets, y registros máximos por consulta a /logs
+LOG_INDEX_BUCKET_SECONDS = 60
+LOG_QUERY_MAX_RECORDS = 1000
+# Registro de las peticiones: claves ocultadas a cualquier profundidad, longitud máxima de cada valor
+# y bytes máximos registrados por petición (payload y respuesta)
+LOG_SENSITIVE_KEYS = [key.strip().lower() for key in os.getenv(
+    "LOG_SENSITIVE_KEYS", "password,token,secret,authorization,api_key,cookie").split(",") if key.strip()]
+LOG_MAX_VALUE_LENGTH = 256
+LOG_MAX_ITEMS = 50
+LOG_MAX_REQUEST_BYTES = 8192
+# Tail sampling: los registros DEBUG/INFO de cada petición se guardan en memoria y solo se escriben completos
+# si la petición falla, tarda más de LOG_SLOW_REQUEST_SECONDS o sale en el muestreo (LOG_SAMPLE_RATE)
+LOG_TAIL_SAMPLING = os.getenv("LOG_TAIL_SAMPLING", "True") == "True"
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.02))
+LOG_SLOW_REQUEST_SECONDS = 60
+LOG_CAPTURE_MAX_RECORDS = 2000
+# Antigüedad máxima de un registro capturado cuando se escribe (duración máxima de una petición: --timeout de gunicorn).
+# Esos registros conservan su hora original, así que pueden aparecer en segmentos posteriores a ella
+LOG_CAPTURE_MAX_AGE = 600
+# Almacén de artefactos (capturas, descargas) en logs/artifacts: cada contenido se guarda una vez (sha256),
+# con límite de tamaño total (bytes) y antigüedad (días). ARTIFACT_IMAGE_FORMAT: original, png (recomprimido) o webp
+ARTIFACT_DIRECTORY = 'artifacts'
+ARTIFACT_MAX_BYTES = 500 * 1024 * 1024
+ARTIFACT_MAX_AGE_DAYS = 7
+ARTIFACT_IMAGE_FORMAT = os.getenv("ARTIFACT_IMAGE_FORMAT", "original")
+ARTIFACT_WEBP_QUALITY = 80
+# Hilos que decodifican, convierten y guardan las capturas de capture_screenshot en segundo plano
+SCREENSHOT_WORKERS = 2
+# Modo depuración: captura en segundo plano (JPEG) después de cada click, escritura y carga de página
+DEBUG_SCREENSHOTS = os.getenv("DEBUG_SCREENSHOTS", "False") == "True"
+DEBUG_SCREENSHOT_QUALITY = 60
+
+# Timeouts adaptativos (opcional): se aprenden por dominio y locator a partir de las latencias observadas
+ADAPTIVE_TIMEOUTS = os.getenv("ADAPTIVE_TIMEOUTS", "False") == "True"
+ADAPTIVE_TIMEOUT_PERCENTILE = 95
+ADAPTIVE_TIMEOUT_MARGIN = 1.5
+ADAPTIVE_TIMEOUT_FLOOR = 2
+ADAPTIVE_TIMEOUT_CEILING = 30
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 5
+STATE_DIR = os.path.abspath("state")
+# Segundos tras los que el lock de un fichero de estado se considera abandonado (worker caído)
+STATE_LOCK_TIMEOUT = 10
+ADAPTIVE_TIMEOUT_FILE = os.path.join(STATE_DIR, "timeouts.json")
+
+# Memoria de estrategias: click_element/write_element empiezan por el método que mejor funciona en cada sitio
+STRATEGY_MEMORY = os.getenv("STRATEGY_MEMORY", "True") == "True"
+STRATEGY_MEMORY_HALF_LIFE_DAYS = 7
+STRATEGY_MEMORY_FILE = os.path.join(STATE_DIR, "strategies.json")
+
+# Reintentos con backoff exponencial y jitter (ver utils/retry.py)
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.25
+RETRY_MAX_DELAY = 4
+RETRY_JITTER = 0.5
+
+# Circuit breaker por dominio: falla rápido cuando un sitio acumula errores de carga
+CIRCUIT_BREAKER = os.getenv("CIRCUIT_BREAKER", "True") == "True"
+CIRCUIT_BREAKER_WINDOW = 120
+CIRCUIT_BREAKER_MIN_CALLS = 5
+CIRCUIT_BREAKER_ERROR_RATE = 0.5
+CIRCUIT_BREAKER_COOLDOWN = 60
 
 def has_display():
     if HEADLESS_MODE == 'True' or os.getenv("DOCKERIZED"):
@@ -7,3 +7,8 @@ class messageError(Exception):
         if STAGE != 'production':
             print(message)
         super().__init__(message)
+
+
+class CircuitOpenError(messageError):
+    """El circuit breaker del dominio está abierto: no se intenta la operación"""
+    pass
@@ -4,7 +4,10 @@ import re
 import io
 import requests
 import base64
+from utils.artifact_store import put_artifact, put_file
+from utils.config import ARTIFACT_DIRECTORY, DOWNLOAD_DIR
 from utils.error import messageError
+from utils.logging_config import get_request_id
 import uuid
 import tempfile
 import shutil
@@ -113,31 +116,56 @@ def createTempFile(data, file_name):
     # Retorna la ruta del archivo renombrado
     return final_path
 
+
+def store_download(file_name, directory="logs", download_dir=DOWNLOAD_DIR):
+    """
+    Mueve un archivo descargado por el navegador (download_dir) al almacén de artefactos
+    (directory/artifacts), asociado a la petición en curso. Las descargas idénticas se guardan una sola vez.
+
+    Args:
+        file_name (str): Nombre del archivo dentro de download_dir
+        directory (str): Directorio base del almacén (por defecto "logs")
+        download_dir (str): Directorio de descargas del navegador (por defecto DOWNLOAD_DIR)
+
+    Returns:
+        str: Ruta del archivo en el almacén
+    """
+    try:
+        artifact = put_file(os.path.join(download_dir, file_name), os.path.join(directory, ARTIFACT_DIRECTORY),
+                            kind='download', request_id=get_request_id(), move=True)
+
+        logging.info(f"Download stored: {artifact['path']}")
+        return artifact['path']
+
+    except Exception as e:
+        logging.error(f"Error storing download: {e}")
+        raise messageError(f"Error al guardar la descarga: {e}")
+
+
 def take_screenshot(driver, directory="logs"):
     """
-    Toma una captura de pantalla del navegador y la guarda con la fecha y hora actual.
+    Toma una captura de pantalla del navegador (PNG) y la guarda en el almacén de artefactos
+    (directory/artifacts), asociada a la petición en curso.
+
+    Bloquea hasta que la captura está guardada. La ruta devuelta es la del contenido en el almacén,
+    directory/artifacts/objects/<ab>/<sha256>.png (no directory/screenshot_<fecha>.png): las capturas
+    idénticas comparten fichero y el almacén aplica su propia retención (ver utils/artifact_store.py).
+    Para capturas sin bloquear, en JPEG/WebP o de un elemento, usar actions/capture_screenshot.py.
 
     Args:
         driver: Instancia del WebDriver de Selenium
-        directory (str): Directorio donde guardar la captura (por defecto "logs")
+        directory (str): Directorio base del almacén (por defecto "logs")
 
     Returns:
         str: Ruta completa del archivo de captura guardado
     """
     try:
-        # Crear directorio si no existe
-        os.makedirs(directory, exist_ok=True)
-
-        # Generar nombre del archivo con fecha y hora
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"screenshot_{timestamp}.png"
-        filepath = os.path.join(directory, filename)
-
-        # Tomar captura de pantalla
-        driver.save_screenshot(filepath)
+        artifact = put_artifact(driver.get_screenshot_as_png(), os.path.join(directory, ARTIFACT_DIRECTORY),
+                                kind='screenshot', name=f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                                ext='png', request_id=get_request_id())
 
-        logging.info(f"Screenshot saved: {filepath}")
-        return filepath
+        logging.info(f"Screenshot saved: {artifact['path']}")
+        return artifact['path']
 
     except Exception as e:
         logging.error(f"Error taking screenshot: {e}")
@@ -1,9 +1,20 @@
 import logging
 import time
-from flask import jsonify, request
-from utils.config import DOWNLOAD_DIR, STAGE
+from datetime import datetime
+from flask import Response, jsonify, make_response, request, stream_with_context
+from utils.config import DOWNLOAD_DIR, LOG_QUERY_MAX_RECORDS, STAGE
 from utils.file_manager import create_download_directory
-from utils.logging_config import configure_logger
+from utils.log_index import query_logs
+from utils.logging_config import (
+    bind_request_context,
+    configure_logger,
+    end_request_capture,
+    flush_logs,
+    get_logs_directory,
+    reset_request_context,
+    start_request_capture
+)
+from utils.request_logging import end_request_log, log_payload, start_request_log
 from utils.security import authenticate_token
 
 
@@ -11,22 +22,77 @@ def handle_request_endpoint(controller_function, decode_response=True):
     configure_logger()
     create_download_directory(DOWNLOAD_DIR)
     start_time = time.time()
-    logging.info("|| Controller:" + controller_function.__name__)
+    # Contexto de log de la petición (id de correlación y controlador): se añade a cada registro.
+    # El id se devuelve en la cabecera X-Request-ID
+    request_id, token = bind_request_context(request.headers.get('X-Request-ID'), controller_function.__name__)
+    # Payload y respuesta se registran resumidos, con un máximo de bytes por petición
+    log_token = start_request_log()
+    # Los registros DEBUG/INFO solo se escriben completos si la petición falla, es lenta o sale en el muestreo
+    capture_token = start_request_capture()
+    headers = {'X-Request-ID': request_id}
+    status = 500
+    try:
+        logging.info("|| Controller:" + controller_function.__name__)
+        if not authenticate_token():
+            status = 401
+            return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), status, headers
+        if not request.is_json:
+            status = 400
+            return jsonify({"status": "ERROR", "message": "A JSON was expected in the request body", "time": time.time() - start_time}), status, headers
+        try:
+            data = request.json
+            log_payload("Request:", data)
+            message = controller_function(data)
+            status = 200
+            if decode_response:
+                log_payload("OK - message:", message)
+                return jsonify({"status": "OK", "message": message, "time": time.time() - start_time}), status, headers
+            else:
+                # Respuesta propia del controlador (fichero, texto...): también lleva el X-Request-ID
+                response = make_response(message)
+                response.headers['X-Request-ID'] = request_id
+                return response
+        except Exception as e:
+            status = 400
+            error_message = str(e)
+            logging.error(f"ERROR: {error_message}")
+            return jsonify({"status": "ERROR", "message": "An internal error has occurred. " + error_message, "time": time.time() - start_time}), status, headers
+    finally:
+        end_request_capture(capture_token, failed=status >= 400,
+                            summary=f"{controller_function.__name__} {status}")
+        end_request_log(log_token)
+        reset_request_context(token)
+
+
+def handle_logs_endpoint():
+    """
+    Devuelve en streaming (text/plain) los registros de log que cumplen los filtros de la query string:
+    start/end (fecha ISO), request_id, level (nivel mínimo) y limit (máximo LOG_QUERY_MAX_RECORDS).
+    Usa los índices de los segmentos, así que no recorre los ficheros completos.
+    """
+    start_time = time.time()
     if not authenticate_token():
         return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), 401
-    if not request.is_json:
-        return jsonify({"status": "ERROR", "message": "A JSON was expected in the request body", "time": time.time() - start_time}), 400
+    # Los registros aún en la cola del escritor no aparecerían en la consulta
+    flush_logs(timeout=1)
     try:
-        data = request.json
-        logging.info(
-            {key: value for key, value in data.items() if key != 'password'})
-        message = controller_function(data)
-        if decode_response:
-            logging.info(f"OK - message: {message}")
-            return jsonify({"status": "OK", "message": message, "time": time.time() - start_time}), 200
-        else:
-            return message
+        start = _parse_datetime(request.args.get('start'))
+        end = _parse_datetime(request.args.get('end'))
+        limit = min(int(request.args.get('limit', LOG_QUERY_MAX_RECORDS)), LOG_QUERY_MAX_RECORDS)
+        records = query_logs(get_logs_directory(), start=start, end=end, request_id=request.args.get('request_id'),
+                             level=request.args.get('level'), limit=limit)
+        # Validar los filtros antes de empezar a responder
+        first = next(records, None)
     except Exception as e:
-        error_message = str(e)
-        logging.error(f"ERROR: {error_message}")
-        return jsonify({"status": "ERROR", "message": "An internal error has occurred. " + error_message, "time": time.time() - start_time}), 400
+        return jsonify({"status": "ERROR", "message": f"Invalid log query: {e}", "time": time.time() - start_time}), 400
+
+    def stream():
+        if first is not None:
+            yield first
+            yield from records
+
+    return Response(stream_with_context(stream()), mimetype='text/plain')
+
+
+def _parse_datetime(value):
+    return datetime.fromisoformat(value) if value else None
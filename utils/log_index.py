@@ -0,0 +1,291 @@
+import io
+import os
+import re
+from datetime import datetime, timedelta
+from utils.config import LOG_CAPTURE_MAX_AGE, LOG_INDEX_BUCKET_SECONDS, LOG_QUERY_MAX_RECORDS
+from utils.log_segments import is_compressed, list_segments, open_segment
+from utils.state_store import load_state, save_state
+
+# Registro: "2025-09-08 12:31:19,625 - INFO - [request_id controller browser:driver] mensaje"
+# (el contexto es opcional en logs antiguos; solo se indexa el request id)
+RECORD_PATTERN = re.compile(rb"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ - ([A-Z]+) - (?:\[([^\]\s]+)(?: [^\]]*)?\] )?")
+# Índice de un segmento: .<segmento>.idx.json en el mismo directorio (los ficheros con punto no son segmentos)
+INDEX_FILENAME_PATTERN = re.compile(r"^\.(.+\.log(?:\.gz|\.zst)?)\.idx\.json$")
+
+_LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+
+
+def index_path(segment_path):
+    """Ruta del índice de un segmento"""
+    directory, filename = os.path.split(segment_path)
+    return os.path.join(directory, f".{filename}.idx.json")
+
+
+def update_index(segment_path):
+    """
+    Devuelve el índice de un segmento, actualizándolo si el segmento cambió.
+
+    El índice guarda, por franja de LOG_INDEX_BUCKET_SECONDS, el rango de bytes de sus registros
+    y los niveles que contiene, y por request id el rango de bytes de sus registros. Los offsets
+    son del contenido sin comprimir. En el segmento activo solo se lee lo escrito desde la
+    última actualización; si el fichero se reemplazó (limpieza de registros) se reconstruye.
+
+    Args:
+        segment_path (str): Ruta del segmento
+
+    Returns:
+        dict: {'inode', 'size', 'buckets': {franja: [inicio, fin, [niveles]]},
+               'requests': {request_id: [inicio, fin]}, 'last_request', 'last_bucket'}
+    """
+    stat = os.stat(segment_path)
+    compressed = is_compressed(segment_path)
+    path = index_path(segment_path)
+    index = load_state(path)
+    if index.get('inode') != stat.st_ino or (not compressed and index['size'] > stat.st_size):
+        index = {'inode': stat.st_ino, 'size': 0, 'buckets': {}, 'requests': {},
+                 'last_request': None, 'last_bucket': None}
+    elif compressed or index['size'] == stat.st_size:
+        # Un segmento comprimido no cambia una vez indexado
+        return index
+
+    size = index['size']
+    with open_segment(segment_path, 'rb') as f:
+        _skip_to(f, size)
+        for line in f:
+            if not line.endswith(b'\n') and not compressed:
+                # Línea a medio escribir: se indexará en la siguiente actualización
+                break
+            _index_line(index, line, size)
+            size += len(line)
+
+    if compressed or size != index['size']:
+        index['size'] = size
+        save_state(path, index)
+    return index
+
+
+def discard_index(segment_path):
+    """Elimina el índice de un segmento (tras comprimirlo o borrarlo)"""
+    try:
+        os.remove(index_path(segment_path))
+    except OSError:
+        pass
+
+
+def remove_orphan_indexes(logs_directory):
+    """
+    Elimina los índices cuyo segmento ya no existe
+
+    Returns:
+        int: Número de índices eliminados
+    """
+    removed = 0
+    for file in os.listdir(logs_directory):
+        match = INDEX_FILENAME_PATTERN.match(file)
+        if match and not os.path.exists(os.path.join(logs_directory, match.group(1))):
+            try:
+                os.remove(os.path.join(logs_directory, file))
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def query_logs(logs_directory, start=None, end=None, request_id=None, level=None, limit=LOG_QUERY_MAX_RECORDS):
+    """
+    Busca registros por rango de tiempo, request id y nivel mínimo usando los índices.
+
+    Solo se abren los segmentos del rango de tiempo y, dentro de cada uno, solo se leen los
+    rangos de bytes que el índice marca como candidatos. Los registros se devuelven completos
+    (con sus líneas de continuación) en el orden en que se escribieron. Los registros de una
+    petición capturada (tail sampling) se escriben al terminar la petición con su hora original,
+    así que también se buscan en los segmentos de hasta LOG_CAPTURE_MAX_AGE segundos después de end.
+
+    Args:
+        logs_directory (str): Directorio de logs
+        start (datetime, optional): Registros desde esta fecha
+        end (datetime, optional): Registros hasta esta fecha
+        request_id (str, optional): Solo registros de esta petición
+        level (str, optional): Nivel mínimo ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+        limit (int): Número máximo de registros
+
+    Yields:
+        str: Registro de log
+    """
+    min_level = None
+    if level is not None:
+        if level.upper() not in _LEVELS:
+            raise ValueError(f"Nivel no soportado: {level}. Opciones: {', '.join(_LEVELS)}")
+        min_level = _LEVELS[level.upper()]
+
+    if not os.path.isdir(logs_directory):
+        return
+    returned = 0
+    segments = list_segments(logs_directory)
+    for i, (moment, path) in enumerate(segments):
+        next_moment = segments[i + 1][0] if i + 1 < len(segments) else None
+        if start is not None and next_moment is not None and next_moment < start:
+            continue
+        if end is not None and moment > end + timedelta(seconds=LOG_CAPTURE_MAX_AGE):
+            break
+        try:
+            index = update_index(path)
+        except FileNotFoundError:
+            # Comprimido o eliminado después de listar el directorio
+            continue
+
+        ranges = _candidate_ranges(index, start, end, request_id, min_level)
+        if not ranges:
+            continue
+        for record in _read_ranges(path, ranges):
+            if _matches(record, start, end, request_id, min_level):
+                yield record.decode('utf-8', errors='replace')
+                returned += 1
+                if returned >= limit:
+                    return
+
+
+def _index_line(index, line, offset):
+    end = offset + len(line)
+    match = RECORD_PATTERN.match(line)
+    if match is None:
+        # Línea de continuación: amplía el registro anterior
+        if index['last_bucket'] in index['buckets']:
+            index['buckets'][index['last_bucket']][1] = end
+        if index['last_request'] in index['requests']:
+            index['requests'][index['last_request']][1] = end
+        return
+
+    record_datetime = datetime.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S")
+    bucket = _bucket(record_datetime)
+    entry = index['buckets'].setdefault(bucket, [offset, end, []])
+    entry[1] = end
+    level = match.group(2).decode()
+    if level not in entry[2]:
+        entry[2].append(level)
+    index['last_bucket'] = bucket
+
+    request_id = match.group(3).decode() if match.group(3) else None
+    if request_id and request_id != '-':
+        index['requests'].setdefault(request_id, [offset, end])[1] = end
+    index['last_request'] = request_id
+
+
+def _bucket(record_datetime):
+    seconds = int(record_datetime.timestamp()) // LOG_INDEX_BUCKET_SECONDS * LOG_INDEX_BUCKET_SECONDS
+    return datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _candidate_ranges(index, start, end, request_id, min_level):
+    # Rangos de bytes [inicio, fin) ordenados y sin solapes que pueden contener registros de la consulta
+    ranges = [(0, index['size'])]
+
+    if request_id is not None:
+        if request_id not in index['requests']:
+            return []
+        ranges = _intersect(ranges, [tuple(index['requests'][request_id])])
+
+    if start is not None or end is not None or min_level is not None:
+        start_bucket = _bucket(start) if start is not None else None
+        end_bucket = end.strftime("%Y-%m-%d %H:%M:%S") if end is not None else None
+        selected = []
+        for bucket, (first, last, levels) in index['buckets'].items():
+            if start_bucket is not None and bucket < start_bucket:
+                continue
+            if end_bucket is not None and bucket > end_bucket:
+                continue
+            if min_level is not None and max(_LEVELS.get(level, 0) for level in levels) < min_level:
+                continue
+            selected.append((first, last))
+        ranges = _intersect(ranges, _merge(selected))
+
+    return ranges
+
+
+def _merge(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _intersect(ranges, others):
+    result = []
+    for start, end in ranges:
+        for other_start, other_end in others:
+            low, high = max(start, other_start), min(end, other_end)
+            if low < high:
+                result.append((low, high))
+    return _merge(result)
+
+
+def _read_ranges(path, ranges):
+    # Registros completos (con sus líneas de continuación) que empiezan dentro de los rangos.
+    # Los límites de los rangos siempre son inicios de línea
+    with open_segment(path, 'rb') as f:
+        position = 0
+        pending = None
+        for start, end in ranges:
+            if pending is not None and pending[0] < start:
+                pending = None
+            if pending is None and position < start:
+                _skip_to(f, start, position)
+                position = start
+            record = None
+            while True:
+                if pending is not None:
+                    offset, line = pending
+                    pending = None
+                else:
+                    offset, line = position, f.readline()
+                    position += len(line)
+                if not line:
+                    break
+                is_record = RECORD_PATTERN.match(line) is not None
+                if is_record and offset >= end:
+                    # Primer registro fuera del rango: puede pertenecer al siguiente
+                    pending = (offset, line)
+                    break
+                if is_record:
+                    if record is not None:
+                        yield record
+                    record = line
+                elif record is not None:
+                    record += line
+            if record is not None:
+                yield record
+
+
+def _skip_to(f, offset, position=0):
+    # Los segmentos comprimidos no siempre permiten seek: se avanza leyendo
+    try:
+        f.seek(offset)
+        return
+    except (OSError, io.UnsupportedOperation):
+        pass
+    remaining = offset - position
+    while remaining > 0:
+        chunk = f.read(min(remaining, 1024 * 1024))
+        if not chunk:
+            return
+        remaining -= len(chunk)
+
+
+def _matches(record, start, end, request_id, min_level):
+    match = RECORD_PATTERN.match(record)
+    if match is None:
+        return False
+    if start is not None or end is not None:
+        record_datetime = datetime.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S")
+        if start is not None and record_datetime < start.replace(microsecond=0):
+            return False
+        if end is not None and record_datetime > end:
+            return False
+    if request_id is not None and (match.group(3) or b'').decode() != request_id:
+        return False
+    if min_level is not None and _LEVELS.get(match.group(2).decode(), 0) < min_level:
+        return False
+    return True
@@ -0,0 +1,173 @@
+import gzip
+import io
+import logging
+import os
+import re
+import shutil
+from datetime import datetime
+from utils.config import LOG_COMPRESSION
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Segmentos de log: YYYY-MM-DD_HH-MM-SS.log, opcionalmente comprimidos (.log.gz / .log.zst)
+LOG_FILENAME_PATTERN = r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.log(\.gz|\.zst)?$"
+RECORD_TIMESTAMP_PATTERN = re.compile(rb"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ - ")
+
+_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def segment_name(moment):
+    """Nombre del segmento que empieza en `moment` (datetime)"""
+    return moment.strftime("%Y-%m-%d_%H-%M-%S") + ".log"
+
+
+def segment_datetime(filename):
+    """
+    Fecha de inicio de un segmento a partir de su nombre
+
+    Returns:
+        datetime | None: None si el nombre no es de un segmento de log
+    """
+    match = re.match(LOG_FILENAME_PATTERN, filename)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S")
+
+
+def is_compressed(path):
+    return path.endswith('.gz') or path.endswith('.zst')
+
+
+def open_segment(path, mode='rb', method=None):
+    """
+    Abre un segmento de log (comprimido o no) como fichero binario
+
+    Args:
+        path (str): Ruta del segmento
+        mode (str): 'rb' o 'wb'
+        method (str, optional): 'gzip', 'zstd' o 'none'. Por defecto se deduce de la extensión
+
+    Returns:
+        Fichero binario de lectura/escritura en streaming
+    """
+    if method is None:
+        method = 'gzip' if path.endswith('.gz') else 'zstd' if path.endswith('.zst') else 'none'
+    if method == 'gzip':
+        return gzip.open(path, mode)
+    if method == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard no está instalado: no se pueden leer/escribir segmentos .zst")
+        if 'r' in mode:
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True))
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+    return open(path, mode)
+
+
+def compress_segment(path, method=LOG_COMPRESSION):
+    """
+    Comprime un segmento cerrado (streaming a un temporal + reemplazo atómico) y borra el original.
+
+    Args:
+        path (str): Ruta del segmento .log
+        method (str): 'gzip', 'zstd' o 'none' (zstd sin la librería instalada usa gzip)
+
+    Returns:
+        str: Ruta del segmento resultante
+    """
+    if method not in _EXTENSIONS or is_compressed(path):
+        return path
+    if method == 'zstd' and zstandard is None:
+        logging.warning("zstandard no está instalado, se usa gzip para comprimir los logs")
+        method = 'gzip'
+
+    target = path + _EXTENSIONS[method]
+    temp_path = target + '.tmp'
+    try:
+        with open(path, 'rb') as source, open_segment(temp_path, 'wb', method) as output:
+            shutil.copyfileobj(source, output, 1024 * 1024)
+        os.replace(temp_path, target)
+        os.remove(path)
+        return target
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def list_segments(logs_directory):
+    """
+    Segmentos de log del directorio ordenados cronológicamente
+
+    Returns:
+        list: [(datetime de inicio, ruta)]
+    """
+    segments = []
+    for file in os.listdir(logs_directory):
+        moment = segment_datetime(file)
+        if moment is not None:
+            segments.append((moment, os.path.join(logs_directory, file)))
+    return sorted(segments)
+
+
+def iter_log_lines(logs_directory, start=None, end=None):
+    """
+    Recorre en streaming las líneas de todos los segmentos (comprimidos o no) en orden cronológico.
+
+    Los segmentos que terminan antes de `start` (empieza el siguiente) o empiezan después
+    de `end` no se abren. Las líneas de continuación (sin timestamp) siguen a su registro.
+
+    Args:
+        logs_directory (str): Directorio de logs
+        start (datetime, optional): Solo registros desde esta fecha
+        end (datetime, optional): Solo registros hasta esta fecha
+
+    Yields:
+        str: Línea de log (con salto de línea)
+    """
+    segments = list_segments(logs_directory)
+    for i, (moment, path) in enumerate(segments):
+        next_moment = segments[i + 1][0] if i + 1 < len(segments) else None
+        if start is not None and next_moment is not None and next_moment < start:
+            continue
+        if end is not None and moment > end:
+            break
+        f = _open_existing(path)
+        if f is None:
+            continue
+        with f:
+            keep = True
+            for line in f:
+                record_datetime = line_timestamp(line)
+                if record_datetime is not None:
+                    keep = (start is None or record_datetime >= start) and \
+                        (end is None or record_datetime <= end)
+                if keep:
+                    yield line.decode('utf-8', errors='replace')
+
+
+def _open_existing(path):
+    # El segmento pudo comprimirse (o eliminarse) después de listar el directorio
+    for candidate in [path] + [path + extension for extension in _EXTENSIONS.values()]:
+        try:
+            return open_segment(candidate, 'rb')
+        except (FileNotFoundError, RuntimeError):
+            continue
+    return None
+
+
+def line_timestamp(line):
+    """
+    Timestamp de una línea de log en bytes ("2025-09-08 12:31:19,625 - INFO - mensaje")
+
+    Returns:
+        datetime | None: None si la línea no empieza por un timestamp válido
+    """
+    match = RECORD_TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
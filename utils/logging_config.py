@@ -1,48 +1,570 @@
+import atexit
+import contextvars
 import os
 import logging
+import queue
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
 from datetime import datetime, timedelta
-from utils.config import AUTO_DELETE_LOGS, STAGE, LOG_FILE_DELETION_DAYS
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from utils.artifact_store import prune_artifacts
+from utils.config import (
+    ARTIFACT_DIRECTORY,
+    AUTO_DELETE_LOGS,
+    STAGE,
+    LOG_CAPTURE_MAX_RECORDS,
+    LOG_FILE_DELETION_DAYS,
+    LOG_OVERFLOW_POLICY,
+    LOG_QUEUE_SIZE,
+    LOG_RETENTION_INTERVAL,
+    LOG_RETENTION_LOCK_TIMEOUT,
+    LOG_ROTATION_HOURLY,
+    LOG_ROTATION_MAX_BYTES,
+    LOG_SAMPLE_RATE,
+    LOG_SLOW_REQUEST_SECONDS,
+    LOG_TAIL_SAMPLING
+)
 from utils.error import messageError
-import re
-
+from utils.log_index import discard_index, remove_orphan_indexes, update_index
+from utils.log_segments import (
+    LOG_FILENAME_PATTERN,
+    RECORD_TIMESTAMP_PATTERN,
+    compress_segment,
+    is_compressed,
+    line_timestamp,
+    open_segment,
+    segment_name
+)
+from utils.state_store import load_state, save_state
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(request_id)s%(log_context)s] %(message)s'
+# Índice de la limpieza ({'last_run', 'files': {nombre: {first, last, size, mtime}}}) y su lock
+LOG_INDEX_FILENAME = '.index.json'
+LOG_RETENTION_LOCK_FILENAME = '.retention.lock'
 
 # Global variable to track the current log file path
 _current_log_file = None
 
+# Pipeline de logs: QueueHandler en el logger raíz -> cola acotada -> QueueListener -> _SegmentFileHandler
+_queue = None
+_queue_handler = None
+_listener = None
+_file_handler = None
+_pipeline_lock = threading.Lock()
+# Hilo que comprime los segmentos cerrados
+_compressor = None
+
+# Hilo de limpieza de logs en segundo plano
+_janitor = None
+
+# Contexto de la petición en curso (request_id, controller, browser, driver_id), añadido a cada registro.
+# Cada petición (hilo o tarea asyncio) tiene su propio diccionario; fuera de una petición no hay contexto
+_request_context = contextvars.ContextVar('request_context', default=None)
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._:-]{1,64}$')
+REQUEST_CONTEXT_FIELDS = ('request_id', 'controller', 'browser', 'driver_id')
+
+# Handlers adicionales por controlador: {controlador: [handler]}, usados desde el hilo escritor
+_controller_handlers = {}
+
+
+def bind_request_context(request_id=None, controller=None):
+    """
+    Empieza el contexto de log de la petición en curso.
+
+    Args:
+        request_id (str, optional): Id de correlación recibido (cabecera X-Request-ID).
+            Si falta o no es válido se genera uno
+        controller (str, optional): Nombre del controlador que atiende la petición
+
+    Returns:
+        tuple: (request_id, token para reset_request_context)
+    """
+    if not request_id or not _REQUEST_ID_PATTERN.match(request_id):
+        request_id = uuid.uuid4().hex[:16]
+    context = {'request_id': request_id, 'controller': controller, 'browser': None, 'driver_id': None}
+    return request_id, _request_context.set(context)
+
+
+def update_request_context(**fields):
+    """
+    Actualiza campos del contexto de la petición en curso (p. ej. browser y driver_id al abrir el navegador).
+    Fuera de una petición no hace nada.
+
+    Args:
+        **fields: Campos de REQUEST_CONTEXT_FIELDS
+    """
+    context = _request_context.get()
+    if context is None:
+        return
+    for key, value in fields.items():
+        if key not in REQUEST_CONTEXT_FIELDS:
+            raise ValueError(f"Campo de contexto no soportado: {key}")
+        context[key] = value
+
+
+def reset_request_context(token):
+    """Restaura el contexto anterior a bind_request_context"""
+    _request_context.reset(token)
+
+
+def get_request_context():
+    """
+    Returns:
+        dict: Copia del contexto de la petición en curso (vacío fuera de una petición)
+    """
+    context = _request_context.get()
+    return dict(context) if context else {}
+
+
+def get_request_id():
+    context = _request_context.get()
+    return context['request_id'] if context else '-'
+
+
+class _RequestContextFilter(logging.Filter):
+    """Añade el contexto de la petición al registro en el hilo que registra (antes de encolarlo)"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            context = _request_context.get() or {}
+            for key in REQUEST_CONTEXT_FIELDS:
+                setattr(record, key, context.get(key))
+            record.request_id = record.request_id or '-'
+            # Texto que sigue al request id en la línea: "[id controller browser:driver_id]"
+            driver = ':'.join(value for value in (record.browser, record.driver_id) if value)
+            record.log_context = ''.join(f" {detail}" for detail in (record.controller, driver) if detail)
+        return True
+
+
+def add_controller_handler(controller, handler):
+    """
+    Envía también a `handler` los registros de las peticiones de un controlador
+    (p. ej. un FileHandler propio para depurar ese controlador). El handler se usa desde el hilo escritor.
+
+    Args:
+        controller (str): Nombre de la función del controlador
+        handler (logging.Handler): Handler adicional
+    """
+    if handler.formatter is None:
+        handler.setFormatter(_log_formatter())
+    with _pipeline_lock:
+        _controller_handlers.setdefault(controller, []).append(handler)
+
+
+def remove_controller_handler(controller, handler):
+    with _pipeline_lock:
+        handlers = _controller_handlers.get(controller, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            _controller_handlers.pop(controller, None)
+
+
+class _ControllerRouter(logging.Handler):
+    """Handler del hilo escritor que reenvía cada registro a los handlers de su controlador"""
+
+    def emit(self, record):
+        controller = getattr(record, 'controller', None)
+        if not controller or controller not in _controller_handlers:
+            return
+        for handler in list(_controller_handlers.get(controller, [])):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+# Registros DEBUG/INFO de la petición en curso pendientes de la decisión de tail sampling
+_capture = contextvars.ContextVar('log_capture', default=None)
+_capture_stats = {'kept': 0, 'summarized': 0}
+
+
+class _RequestCapture:
+    """Buffer circular con los registros DEBUG/INFO de una petición"""
+
+    def __init__(self, max_records):
+        self.records = deque(maxlen=max_records)
+        self.total = 0
+        self.error = False
+        self.started = time.monotonic()
+
+    def add(self, record):
+        self.records.append(record)
+        self.total += 1
+
+
+def start_request_capture(max_records=LOG_CAPTURE_MAX_RECORDS):
+    """
+    Empieza a guardar en memoria los registros DEBUG/INFO de la petición en curso.
+    WARNING y superiores se escriben siempre en el momento.
+
+    Returns:
+        Token para end_request_capture (None si LOG_TAIL_SAMPLING está deshabilitado)
+    """
+    if not LOG_TAIL_SAMPLING:
+        return None
+    return _capture.set(_RequestCapture(max_records))
+
+
+def end_request_capture(token, failed=False, summary='', slow_threshold=LOG_SLOW_REQUEST_SECONDS,
+                        sample_rate=LOG_SAMPLE_RATE):
+    """
+    Termina la captura de la petición: sus registros se escriben completos si falló (failed o algún
+    ERROR registrado), si tardó más de slow_threshold o si sale en el muestreo (sample_rate), con su
+    hora original. Si no, solo se escribe una línea de resumen.
+
+    Args:
+        token: Token de start_request_capture
+        failed (bool): Si la petición terminó con error
+        summary (str): Texto de la línea de resumen (p. ej. controlador y estado)
+        slow_threshold (float): Segundos a partir de los que la petición se considera lenta
+        sample_rate (float): Fracción de peticiones correctas que se escriben completas
+
+    Returns:
+        str | None: Motivo por el que se escribió completa ('error', 'slow', 'sampled', o 'disabled' sin
+            tail sampling) o None si se resumió
+    """
+    if token is None:
+        return 'disabled'
+    capture = _capture.get()
+    _capture.reset(token)
+    if capture is None:
+        return 'disabled'
+
+    elapsed = time.monotonic() - capture.started
+    if failed or capture.error:
+        reason = 'error'
+    elif elapsed >= slow_threshold:
+        reason = 'slow'
+    elif random.random() < sample_rate:
+        reason = 'sampled'
+    else:
+        reason = None
+
+    with _pipeline_lock:
+        _capture_stats['kept' if reason else 'summarized'] += 1
+        handler = _queue_handler
+
+    if reason is None:
+        logging.info(f"Request summary: {summary} - {elapsed:.2f}s, {capture.total} records not written")
+        return None
+
+    if handler is not None:
+        # Los registros se escriben detrás de otros más recientes (WARNING, otras peticiones) con su hora
+        # original: el índice los asigna a sus franjas y query_logs busca hasta LOG_CAPTURE_MAX_AGE después
+        for record in capture.records:
+            handler.put(record)
+    if capture.total > len(capture.records):
+        logging.info(f"Request log buffer full: the first {capture.total - len(capture.records)} records were lost")
+    return reason
+
+
+def _log_formatter():
+    # Los registros que no pasan por el filtro (p. ej. escritos directamente en el handler) llevan '-'
+    return logging.Formatter(LOG_FORMAT, defaults={'request_id': '-', 'log_context': ''})
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler que nunca bloquea al hilo que registra (salvo con la política 'block').
+
+    Con 'drop_debug' los registros DEBUG se descartan cuando la cola pasa de la mitad,
+    los INFO cuando pasa del 90% y los WARNING o superiores solo si está llena.
+    Con 'drop_new' se descarta cualquier registro cuando la cola está llena.
+    """
+
+    def __init__(self, log_queue, policy=LOG_OVERFLOW_POLICY):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = {}
+
+    def enqueue(self, record):
+        capture = _capture.get()
+        if capture is not None:
+            if record.levelno >= logging.ERROR:
+                capture.error = True
+            if record.levelno < logging.WARNING:
+                # Tail sampling: se decide al terminar la petición si se escribe
+                capture.add(record)
+                return
+        self.put(record)
+
+    def put(self, record):
+        if self.policy == 'block':
+            self.queue.put(record)
+            return
+        if self.policy == 'drop_debug' and self.queue.maxsize > 0:
+            used = self.queue.qsize() / self.queue.maxsize
+            if (record.levelno < logging.INFO and used >= 0.5) or \
+                    (record.levelno < logging.WARNING and used >= 0.9):
+                self._drop(record)
+                return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop(record)
+
+    def _drop(self, record):
+        self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+
+class _SegmentFileHandler(logging.FileHandler):
+    """
+    FileHandler que empieza un segmento nuevo (YYYY-MM-DD_HH-MM-SS.log) al superar
+    LOG_ROTATION_MAX_BYTES o, con LOG_ROTATION_HOURLY, al cambiar de hora.
+    El segmento cerrado se comprime en segundo plano (LOG_COMPRESSION).
+    """
+
+    def __init__(self, filename, max_bytes=LOG_ROTATION_MAX_BYTES, hourly=LOG_ROTATION_HOURLY):
+        super().__init__(filename, encoding='utf-8')
+        self.max_bytes = max_bytes
+        self.hourly = hourly
+        self.opened_hour = _hour(datetime.now())
+
+    def emit(self, record):
+        try:
+            if self.should_rollover(record):
+                self.do_rollover(datetime.fromtimestamp(record.created))
+        except Exception:
+            self.handleError(record)
+        super().emit(record)
+
+    def _open(self):
+        # El segmento abierto para escribir queda marcado como activo para la limpieza (ver _is_segment_closed)
+        stream = super()._open()
+        _lock_segment(stream)
+        return stream
+
+    def should_rollover(self, record):
+        if self.stream is None:
+            return False
+        if self.hourly and _hour(datetime.fromtimestamp(record.created)) != self.opened_hour:
+            return True
+        return self.max_bytes > 0 and self.stream.tell() >= self.max_bytes
+
+    def switch_to(self, log_filepath):
+        # Cambia de fichero sin perder registros: emit() y este cambio comparten el lock del handler
+        self.acquire()
+        try:
+            previous = self.baseFilename
+            self.close()
+            self.baseFilename = os.path.abspath(log_filepath)
+            self.stream = self._open()
+            self.opened_hour = _hour(datetime.now())
+            return previous
+        finally:
+            self.release()
+
+    def do_rollover(self, moment):
+        global _current_log_file
+
+        new_path = _create_segment(os.path.dirname(self.baseFilename), moment)
+        previous = self.switch_to(new_path)
+        _current_log_file = new_path
+        _compress_in_background(previous)
+
+
+def _create_segment(directory, moment):
+    # Crea el segmento con O_EXCL: si otro worker ya usa ese nombre (o está comprimido) se prueba el segundo siguiente
+    while True:
+        path = os.path.join(directory, segment_name(moment))
+        if not (os.path.exists(path + '.gz') or os.path.exists(path + '.zst')):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return path
+            except FileExistsError:
+                pass
+        moment += timedelta(seconds=1)
+
+
+def _lock_segment(stream):
+    # Lock compartido sobre el segmento mientras un worker lo tiene abierto para escribir. Se libera al
+    # cerrarlo (rotación) o si el proceso muere, así que no quedan marcas huérfanas
+    if fcntl is None:
+        return
+    try:
+        fcntl.flock(stream.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+    except OSError:
+        pass
+
+
+def _is_segment_closed(file_path):
+    # Un segmento sin comprimir está cerrado si ningún worker tiene su lock (solo entonces se puede
+    # reescribir: el FileHandler de un worker seguiría escribiendo en el inode reemplazado).
+    # Sin fcntl no se puede saber y se trata como activo
+    if fcntl is None:
+        return False
+    try:
+        with open(file_path, 'rb') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+    except OSError:
+        return False
+
+
+def _hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _compress_in_background(log_filepath):
+    global _compressor
+
+    with _pipeline_lock:
+        if _compressor is None:
+            _compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-compress')
+        compressor = _compressor
+
+    def compress():
+        try:
+            compressed = compress_segment(log_filepath)
+            discard_index(log_filepath)
+            # El índice del segmento comprimido se crea ahora, no en la primera consulta
+            update_index(compressed)
+        except Exception as e:
+            logging.warning(f"Error compressing log segment {os.path.basename(log_filepath)}: {str(e)}")
+
+    compressor.submit(compress)
+
 
 def configure_logger():
     try:
         global _current_log_file
 
-        # Get the current date and time to use in the log file name
-        current_datetime = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        # Create the logs directory if it does not exist
-        base_directory = '/app' if os.environ.get('DOCKERIZED', False) else ''
+        if _listener is None:
+            # Create the logs directory if it does not exist
+            logs_directory = get_logs_directory()
+            os.makedirs(logs_directory, exist_ok=True)
 
-        logs_directory = os.path.join(base_directory, 'logs')
-        os.makedirs(logs_directory, exist_ok=True)
+            # The log file is named after the current date and time (each worker gets its own file)
+            log_filepath = _create_segment(logs_directory, datetime.now())
 
-        # Configure the name of the log file with the date, time, and incident number
-        log_filename = f"{current_datetime}.log"
-        log_filepath = os.path.join(logs_directory, log_filename)
-        _current_log_file = log_filepath
+            # Requests only enqueue records; a background thread writes them to the file
+            _set_log_file(log_filepath)
 
-        # Configure the logging system to write to the dynamically created file
-        logging.basicConfig(filename=log_filepath, level=logging.INFO,
-                            format='%(asctime)s - %(levelname)s - %(message)s')
-
-        # Log the initiation of submission of information
-        logging.info("Initiating log")
-        logging.info(f"Stage: {STAGE}")
+            # Log the initiation of submission of information
+            logging.info("Initiating log")
+            logging.info(f"Stage: {STAGE}")
 
         if AUTO_DELETE_LOGS:
-            delete_old_logs()
+            # Retention runs in a background thread, not on every request
+            schedule_log_retention()
 
     except Exception as e:
         # In case of error, log the error and raise an exception
         raise messageError("Error setting up logging")
 
 
+def _set_log_file(log_filepath):
+    """
+    Hace que los logs se escriban en log_filepath.
+
+    La primera vez instala el pipeline: QueueHandler en el logger raíz con una cola acotada
+    (LOG_QUEUE_SIZE) y un QueueListener que escribe en un _SegmentFileHandler desde su propio hilo.
+    Las siguientes veces solo cambia el fichero del handler (sin perder registros encolados).
+    """
+    global _current_log_file, _queue, _queue_handler, _listener, _file_handler
+
+    with _pipeline_lock:
+        if _file_handler is not None:
+            _file_handler.switch_to(log_filepath)
+            _current_log_file = log_filepath
+            return
+
+        _file_handler = _SegmentFileHandler(log_filepath)
+        _file_handler.setFormatter(_log_formatter())
+        _queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = _BoundedQueueHandler(_queue)
+        _queue_handler.addFilter(_RequestContextFilter())
+        _listener = QueueListener(_queue, _file_handler, _ControllerRouter(), respect_handler_level=True)
+        _listener.start()
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(logging.INFO)
+        _current_log_file = log_filepath
+
+
+def flush_logs(timeout=5):
+    """
+    Espera a que el hilo escritor vacíe la cola y vuelca el fichero a disco.
+
+    Args:
+        timeout (float): Segundos máximos de espera
+
+    Returns:
+        bool: True si la cola quedó vacía
+    """
+    if _listener is None:
+        return True
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+    _file_handler.flush()
+    return not _queue.unfinished_tasks
+
+
+def get_logging_stats():
+    """
+    Devuelve el estado de la cola de logs y los registros descartados por nivel
+
+    Returns:
+        dict: {'queued', 'capacity', 'policy', 'dropped': {nivel: número},
+               'captured': {'kept', 'summarized'} (peticiones escritas completas / resumidas)}
+    """
+    with _pipeline_lock:
+        captured = dict(_capture_stats)
+    if _queue_handler is None:
+        return {'queued': 0, 'capacity': LOG_QUEUE_SIZE, 'policy': LOG_OVERFLOW_POLICY, 'dropped': {},
+                'captured': captured}
+    return {
+        'queued': _queue.qsize(),
+        'capacity': _queue.maxsize,
+        'policy': _queue_handler.policy,
+        'dropped': dict(_queue_handler.dropped),
+        'captured': captured
+    }
+
+
+def shutdown_logging():
+    """Vacía la cola, detiene el hilo escritor y cierra el fichero (se llama al salir del proceso)."""
+    global _queue, _queue_handler, _listener, _file_handler, _compressor
+
+    compressor = None
+    with _pipeline_lock:
+        if _listener is None:
+            return
+        dropped = dict(_queue_handler.dropped)
+        logging.getLogger().removeHandler(_queue_handler)
+        # stop() procesa los registros pendientes antes de terminar el hilo
+        _listener.stop()
+        if dropped:
+            _file_handler.handle(logging.makeLogRecord({
+                'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': f"Log queue overflow, dropped records: {dropped}"}))
+        _file_handler.close()
+        _queue = _queue_handler = _listener = _file_handler = None
+        compressor, _compressor = _compressor, None
+
+    if compressor is not None:
+        # Terminar las compresiones pendientes antes de salir
+        compressor.shutdown(wait=True)
+
+
+atexit.register(shutdown_logging)
+
+
 def _rotate_log_if_needed(logs_directory, current_datetime):
     """
     Verifica si el archivo de log actual es muy antiguo y crea uno nuevo si es necesario.
@@ -62,8 +584,7 @@ def _rotate_log_if_needed(logs_directory, current_datetime):
     try:
         # Extraer el timestamp del nombre del archivo
         filename = os.path.basename(_current_log_file)
-        match = re.match(
-            r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.log", filename)
+        match = re.match(LOG_FILENAME_PATTERN, filename)
 
         if match:
             log_datetime = datetime.strptime(
@@ -73,23 +594,11 @@ def _rotate_log_if_needed(logs_directory, current_datetime):
             # Si el archivo actual tiene más de LOG_FILE_DELETION_DAYS días, crear uno nuevo
             if difference.days >= LOG_FILE_DELETION_DAYS:
                 # Crear nuevo archivo de log
-                new_datetime = current_datetime.strftime("%Y-%m-%d_%H-%M-%S")
-                new_log_filename = f"{new_datetime}.log"
-                new_log_filepath = os.path.join(
-                    logs_directory, new_log_filename)
-
-                # Reinicializar el logger con el nuevo archivo
-                logging.shutdown()
-
-                # Crear nuevo logger
-                logging.basicConfig(
-                    filename=new_log_filepath,
-                    level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    force=True
-                )
-
-                _current_log_file = new_log_filepath
+                new_log_filepath = _create_segment(logs_directory, current_datetime)
+                new_log_filename = os.path.basename(new_log_filepath)
+
+                # Cambiar el fichero del escritor (los registros encolados no se pierden)
+                _set_log_file(new_log_filepath)
                 logging.info(
                     f"Log rotated: switching from {filename} to {new_log_filename}")
 
@@ -97,126 +606,350 @@ def _rotate_log_if_needed(logs_directory, current_datetime):
         logging.warning(f"Error during log rotation: {str(e)}")
 
 
-def delete_old_logs():
+def get_logs_directory():
+    base_directory = '/app' if os.environ.get('DOCKERIZED', False) else ''
+    return os.path.join(base_directory, 'logs')
+
+
+def schedule_log_retention(interval=LOG_RETENTION_INTERVAL):
     """
-    Realiza rotación de logs y eliminación de archivos antiguos:
+    Arranca (una vez por proceso) el hilo que ejecuta run_log_retention() cada `interval` segundos.
 
-    Proceso:
-    1. Verifica si el archivo de log actual es muy antiguo (> LOG_FILE_DELETION_DAYS)
-    2. Si es muy antiguo, crea uno nuevo y reinicializa el logger
-    3. Elimina archivos completos que tengan más de LOG_FILE_DELETION_DAYS días
-    4. De los archivos que sobreviven, elimina registros que tengan más de LOG_FILE_DELETION_DAYS días
+    Args:
+        interval (float): Segundos entre ejecuciones
+    """
+    global _janitor
+
+    with _pipeline_lock:
+        if _janitor is not None and _janitor.is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    run_log_retention()
+                except Exception as e:
+                    logging.error(f"Error in log retention: {str(e)}")
+                time.sleep(interval)
+
+        _janitor = threading.Thread(target=loop, name='log-retention', daemon=True)
+        _janitor.start()
+
+
+def run_log_retention(logs_directory=None, force=False):
+    """
+    Ejecuta la limpieza de logs si no se ha ejecutado en el último LOG_RETENTION_INTERVAL.
 
-    Esto garantiza que el servicio siempre tenga un archivo válido para escribir logs,
-    evitando pérdida de datos cuando se eliminan archivos antiguos.
+    Un fichero de lock en el directorio de logs garantiza que solo un worker la ejecuta a la vez;
+    el momento de la última ejecución se guarda en el índice, compartido por todos los workers.
+    La rotación del fichero propio sí se comprueba en cada worker, aunque otro haga la limpieza.
+
+    Args:
+        logs_directory (str, optional): Directorio de logs (default: logs/)
+        force (bool): Ejecutar aunque no haya pasado el intervalo
+
+    Returns:
+        bool: True si se ejecutó la limpieza
+    """
+    logs_directory = logs_directory or get_logs_directory()
+    os.makedirs(logs_directory, exist_ok=True)
+    index_path = os.path.join(logs_directory, LOG_INDEX_FILENAME)
+    lock_path = os.path.join(logs_directory, LOG_RETENTION_LOCK_FILENAME)
+
+    # Cada worker rota su propio fichero activo: el last_run compartido no debe impedirlo
+    _rotate_log_if_needed(logs_directory, datetime.now())
+
+    if not force and _recently_run(index_path):
+        return False
+    if not _acquire_lock(lock_path):
+        return False
+    try:
+        # Otro worker pudo terminar justo antes de obtener el lock
+        if not force and _recently_run(index_path):
+            return False
+        delete_old_logs(logs_directory)
+        # Las capturas y descargas del almacén de artefactos tienen su propia retención
+        prune_artifacts(os.path.join(logs_directory, ARTIFACT_DIRECTORY))
+        return True
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def _recently_run(index_path):
+    return time.time() - load_state(index_path).get('last_run', 0) < LOG_RETENTION_INTERVAL
+
+
+def _acquire_lock(lock_path):
+    for _ in range(2):
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                # Lock abandonado (worker caído a mitad de limpieza): se libera
+                if time.time() - os.path.getmtime(lock_path) < LOG_RETENTION_LOCK_TIMEOUT:
+                    return False
+                os.remove(lock_path)
+            except OSError:
+                return False
+    return False
+
+
+def delete_old_logs(logs_directory=None):
+    """
+    Realiza la eliminación de archivos antiguos (la rotación la hace run_log_retention en cada worker):
+
+    Proceso:
+    1. Actualiza el índice (primer/último timestamp y tamaño de cada archivo) leyendo solo
+       el principio y el final de los archivos que cambiaron
+    2. Elimina archivos cuyo último registro tenga más de LOG_FILE_DELETION_DAYS días
+    3. Solo abre para limpiar registros los segmentos cerrados que cruzan el límite (primer
+       registro antiguo). Los segmentos activos de cualquier worker (con el lock de _lock_segment)
+       no se reescriben: se limpian cuando rotan o se eliminan enteros cuando caduca su último registro
     """
     try:
         current_datetime = datetime.now()
-        base_directory = '/app' if os.environ.get('DOCKERIZED', False) else ''
-        logs_directory = os.path.join(base_directory, 'logs')
+        logs_directory = logs_directory or get_logs_directory()
         os.makedirs(logs_directory, exist_ok=True)
+        index_path = os.path.join(logs_directory, LOG_INDEX_FILENAME)
 
-        # Paso 0: Verificar y rotar el archivo de log actual si es muy antiguo
-        _rotate_log_if_needed(logs_directory, current_datetime)
+        index = load_state(index_path)
+        previous = index.get('files', {})
+        entries = {}
 
-        files = os.listdir(logs_directory)
-        surviving_files = []
-
-        # Paso 1: Eliminar archivos completos antiguos (más de LOG_FILE_DELETION_DAYS días)
-        for file in files:
+        for file in os.listdir(logs_directory):
+            if file.startswith('.') or file.endswith('.tmp') or file == ARTIFACT_DIRECTORY:
+                continue
             # Check if the filename matches the expected format (e.g., '2025-02-26_11-13-20.log')
-            match = re.match(
-                r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.log", file)
-            if match:
-                file_datetime = datetime.strptime(
-                    match.group(1), "%Y-%m-%d_%H-%M-%S")
-                difference = current_datetime - file_datetime
-
-                if difference.days > LOG_FILE_DELETION_DAYS:
-                    file_path = os.path.join(logs_directory, file)
-                    os.remove(file_path)
-                    logging.info(f"Deleted old log file: {file}")
-                else:
-                    surviving_files.append(file)
-            else:
+            match = re.match(LOG_FILENAME_PATTERN, file)
+            if not match:
                 # Log or handle any files that don't match the expected pattern
                 logging.warning(f"Skipping file with invalid format: {file}")
+                continue
 
-        # Paso 2: Limpiar registros antiguos de archivos que sobreviven
-        for file in surviving_files:
             file_path = os.path.join(logs_directory, file)
-            _clean_old_records_from_file(file_path, current_datetime)
+            try:
+                stat = os.stat(file_path)
+                entry = previous.get(file)
+                if not entry or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+                    entry = _scan_log_file(file_path, stat)
+            except FileNotFoundError:
+                # Segmento comprimido en segundo plano mientras se recorría el directorio
+                continue
+
+            # Sin registros con fecha se usa la fecha del nombre del archivo
+            file_datetime = datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S")
+            first = _parse_timestamp(entry['first']) if entry['first'] else file_datetime
+            last = _parse_timestamp(entry['last']) if entry['last'] else file_datetime
+
+            if _is_expired(last, current_datetime):
+                os.remove(file_path)
+                discard_index(file_path)
+                logging.info(f"Deleted old log file: {file}")
+                continue
+
+            if _is_expired(first, current_datetime) and (is_compressed(file_path) or _is_segment_closed(file_path)):
+                # El segmento cerrado cruza el límite: limpiar sus registros antiguos
+                _clean_old_records_from_file(file_path, current_datetime)
+                if not os.path.exists(file_path):
+                    continue
+                entry = _scan_log_file(file_path, os.stat(file_path))
+            entries[file] = entry
+
+        save_state(index_path, {'last_run': time.time(), 'files': entries})
+        remove_orphan_indexes(logs_directory)
 
     except Exception as e:
         raise messageError("Error deleting old logs")
 
 
+def _scan_log_file(file_path, stat):
+    # Primer y último timestamp del archivo. En los no comprimidos solo se lee el principio y el final;
+    # los comprimidos no cambian, así que se recorren una sola vez y quedan en el índice
+    first = last = None
+    with open_segment(file_path, 'rb') as f:
+        for line in f:
+            match = RECORD_TIMESTAMP_PATTERN.match(line)
+            if match:
+                first = match.group(1).decode()
+                break
+        if first is not None:
+            if is_compressed(file_path):
+                lines = f
+            else:
+                f.seek(max(stat.st_size - 65536, 0))
+                lines = f.read().splitlines()
+            for line in lines:
+                match = RECORD_TIMESTAMP_PATTERN.match(line)
+                if match:
+                    last = match.group(1).decode()
+    return {'first': first, 'last': last or first, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _parse_timestamp(value):
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+def _is_expired(record_datetime, current_datetime):
+    return (current_datetime - record_datetime).days > LOG_FILE_DELETION_DAYS
+
+
 def _clean_old_records_from_file(file_path, current_datetime):
     """
     Limpia registros antiguos (más de LOG_FILE_DELETION_DAYS días) de un archivo de log específico.
     Si el archivo quedaría vacío después de la limpieza, lo elimina completamente.
 
+    El archivo se sustituye por otro (otro inode): no usar con un segmento que algún proceso
+    tenga abierto para escribir. La retención solo lo usa con segmentos cerrados.
+
+    Los registros están ordenados por tiempo (salvo los escritos al final de una petición con su
+    hora original, como mucho LOG_CAPTURE_MAX_AGE antes), así que el punto de corte se busca con
+    una búsqueda binaria sobre offsets (resincronizando al inicio de línea). La parte anterior
+    se filtra línea a línea y el resto se copia tal cual a un archivo nuevo que sustituye al
+    original de forma atómica. La memoria es constante. Los segmentos comprimidos no permiten
+    seek: se leen hasta el primer registro que se conserva y el resto se copia sin interpretarlo.
+
     Args:
         file_path (str): Ruta completa al archivo de log
         current_datetime (datetime): Fecha y hora actual para comparar
     """
-    try:
-        # Leer todas las líneas del archivo
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        # Filtrar líneas que no sean muy antiguas
-        filtered_lines = []
-        records_removed = 0
-
-        for line in lines:
-            # Extraer timestamp del registro usando regex
-            # Formato esperado: "2025-09-08 12:31:19,625 - INFO - mensaje"
-            timestamp_match = re.match(
-                r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ - ", line)
-
-            if timestamp_match:
-                try:
-                    # Parsear la fecha del registro
-                    record_datetime = datetime.strptime(
-                        timestamp_match.group(1), "%Y-%m-%d %H:%M:%S")
-
-                    # Calcular diferencia en días
-                    difference = current_datetime - record_datetime
-
-                    # Mantener registros de menos de LOG_FILE_DELETION_DAYS días
-                    if difference.days <= LOG_FILE_DELETION_DAYS:
-                        filtered_lines.append(line)
-                    else:
-                        records_removed += 1
-
-                except ValueError:
-                    # Si hay error parseando la fecha, mantener la línea
-                    filtered_lines.append(line)
-            else:
-                # Si no tiene formato de timestamp reconocible, mantener la línea
-                filtered_lines.append(line)
-
-        # Verificar si el archivo quedaría vacío o solo con líneas vacías
-        content_lines = [line for line in filtered_lines if line.strip()]
+    if is_compressed(file_path):
+        _clean_old_records_from_segment(file_path, current_datetime)
+        return
 
-        if not content_lines:
+    temp_path = None
+    try:
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as source:
+            offset = _find_cutoff_offset(source, size, current_datetime)
+            if offset == 0:
+                return
+
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or '.', suffix='.tmp')
+            records_removed = 0
+            has_content = False
+            with os.fdopen(fd, 'wb') as target:
+                # Parte antigua: se conservan solo los registros recientes (y sus líneas de continuación)
+                source.seek(0)
+                remaining = offset
+                keep = True
+                while remaining > 0:
+                    line = source.readline()
+                    if not line:
+                        break
+                    remaining -= len(line)
+                    record_datetime = line_timestamp(line)
+                    if record_datetime is not None:
+                        keep = not _is_expired(record_datetime, current_datetime)
+                        if not keep:
+                            records_removed += 1
+                    if keep:
+                        target.write(line)
+                        has_content = has_content or bool(line.strip())
+
+                # Parte reciente: copia secuencial sin interpretar las líneas
+                source.seek(offset)
+                shutil.copyfileobj(source, target, 1024 * 1024)
+                has_content = has_content or offset < size
+
+        filename = os.path.basename(file_path)
+        if not has_content:
             # Si no hay contenido útil, eliminar el archivo completo
             os.remove(file_path)
-            filename = os.path.basename(file_path)
             logging.info(f"Deleted empty log file after cleaning: {filename}")
         elif records_removed > 0:
-            # Solo reescribir el archivo si se removieron registros y hay contenido
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(filtered_lines)
-
-            filename = os.path.basename(file_path)
+            # Solo reemplazar el archivo si se removieron registros y hay contenido
+            os.replace(temp_path, file_path)
+            temp_path = None
             logging.info(
                 f"Cleaned {records_removed} old records from {filename}")
 
     except Exception as e:
         logging.error(f"Error cleaning old records from {file_path}: {str(e)}")
         # No lanzar excepción para no afectar el procesamiento de otros archivos
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _find_cutoff_offset(f, size, current_datetime):
+    """
+    Búsqueda binaria del offset del primer registro no caducado (size si todos lo están).
+    Son O(log n) seeks con lecturas de unas pocas líneas cada uno.
+    """
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        _, record_datetime = _record_at(f, middle, size)
+        if record_datetime is None or not _is_expired(record_datetime, current_datetime):
+            high = middle
+        else:
+            low = middle + 1
+    return _record_at(f, low, size)[0]
+
+
+def _record_at(f, position, size):
+    # Primer registro con timestamp que empieza en position o después: (offset, datetime)
+    if position == 0:
+        f.seek(0)
+    else:
+        # Resincronizar al inicio de línea (si position ya lo es, se lee solo el salto anterior)
+        f.seek(position - 1)
+        f.readline()
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line:
+            return size, None
+        record_datetime = line_timestamp(line)
+        if record_datetime is not None:
+            return offset, record_datetime
+
+
+def _clean_old_records_from_segment(file_path, current_datetime):
+    # Segmento comprimido: se descomprime y recomprime en streaming. Solo se interpretan las líneas hasta
+    # el primer registro que se conserva; el resto se copia tal cual
+    temp_path = file_path + '.tmp'
+    method = 'gzip' if file_path.endswith('.gz') else 'zstd'
+    try:
+        records_removed = 0
+        has_content = False
+        with open_segment(file_path, 'rb') as source, open_segment(temp_path, 'wb', method) as target:
+            while True:
+                line = source.readline()
+                if not line:
+                    break
+                record_datetime = line_timestamp(line)
+                if record_datetime is None:
+                    # Líneas de continuación: se conservan solo las previas al primer registro
+                    if not records_removed:
+                        target.write(line)
+                        has_content = has_content or bool(line.strip())
+                    continue
+                if _is_expired(record_datetime, current_datetime):
+                    records_removed += 1
+                    continue
+                target.write(line)
+                has_content = True
+                shutil.copyfileobj(source, target, 1024 * 1024)
+                break
+
+        filename = os.path.basename(file_path)
+        if not has_content:
+            os.remove(file_path)
+            logging.info(f"Deleted empty log file after cleaning: {filename}")
+        elif records_removed > 0:
+            os.replace(temp_path, file_path)
+            logging.info(f"Cleaned {records_removed} old records from {filename}")
+
+    except Exception as e:
+        logging.error(f"Error cleaning old records from {file_path}: {str(e)}")
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
 
 # INFO
@@ -232,12 +965,26 @@ def _clean_old_records_from_file(file_path, current_datetime):
 # log.critical(msg): Used for critical severity messages that indicate serious problems that have caused the program to terminate or require immediate action.
 
 # CONFIGURACIÓN DE LIMPIEZA DE LOGS:
-# - AUTO_DELETE_LOGS: Si está habilitado, se ejecuta automáticamente la limpieza de logs
+# - AUTO_DELETE_LOGS: Si está habilitado, se ejecuta automáticamente la limpieza de logs en un hilo en segundo plano
+# - LOG_RETENTION_INTERVAL: La limpieza se ejecuta como mucho una vez por intervalo entre todos los workers
+#   (lock en logs/.retention.lock, última ejecución e índice de archivos en logs/.index.json)
+# - Índice: primer/último timestamp y tamaño de cada archivo; solo se abren los archivos que cruzan el límite
 # - LOG_FILE_DELETION_DAYS: Número de días después de los cuales se eliminan logs y registros (configurado en config.py)
 # - Archivos completos: Se eliminan archivos de log que tengan más de LOG_FILE_DELETION_DAYS días de antigüedad
-# - Registros individuales: De los archivos que sobreviven, se eliminan registros más antiguos de LOG_FILE_DELETION_DAYS días
+# - Registros individuales: De los archivos cerrados que sobreviven, se eliminan registros más antiguos de
+#   LOG_FILE_DELETION_DAYS días (búsqueda binaria del punto de corte y copia del resto). Los segmentos activos
+#   de cada worker tienen un lock (fcntl.flock) y no se reescriben
 # - Archivos vacíos: Si un archivo queda sin contenido útil después de la limpieza, se elimina completamente
 # - Rotación automática: Si el archivo de log actual es muy antiguo, se crea uno nuevo automáticamente
-# - Los archivos se identifican por su formato de nombre: YYYY-MM-DD_HH-MM-SS.log
+# - Los archivos se identifican por su formato de nombre: YYYY-MM-DD_HH-MM-SS.log (o .log.gz / .log.zst si están comprimidos)
+# - Rotación por tamaño/hora: LOG_ROTATION_MAX_BYTES y LOG_ROTATION_HOURLY; el segmento cerrado se comprime
+#   en segundo plano (LOG_COMPRESSION). utils/log_segments.iter_log_lines lee todos los segmentos en orden
 # - Los registros se identifican por su timestamp en formato: YYYY-MM-DD HH:MM:SS,milliseconds
+# - Almacén de artefactos (logs/artifacts): capturas y descargas por hash de contenido, con su propia retención
+#   (ARTIFACT_MAX_BYTES, ARTIFACT_MAX_AGE_DAYS) aplicada por el mismo hilo de limpieza
+# - Tail sampling (LOG_TAIL_SAMPLING): los DEBUG/INFO de cada petición se guardan en memoria y solo se escriben
+#   si falla, es lenta o sale en el muestreo (LOG_SAMPLE_RATE); si no, se escribe una línea de resumen
+# - Cada registro lleva el contexto de la petición ([request_id controller browser:driver_id], cabecera X-Request-ID)
+#   en contextvars, así que las peticiones concurrentes (hilos o asyncio) no se mezclan; cada segmento tiene un índice
+#   .<segmento>.idx.json (franjas de tiempo y request ids -> offsets) que usa el endpoint /logs (utils/log_index.py)
 # - ROTACIÓN SEGURA: El servicio siempre tendrá un archivo válido donde escribir, evitando pérdida de logs
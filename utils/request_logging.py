@@ -0,0 +1,120 @@
+import contextvars
+import hashlib
+import json
+import logging
+from utils.config import LOG_MAX_ITEMS, LOG_MAX_REQUEST_BYTES, LOG_MAX_VALUE_LENGTH, LOG_SENSITIVE_KEYS
+
+REDACTED = '***'
+# Caracteres que se conservan al principio de un valor truncado
+_PREVIEW_LENGTH = 32
+
+# Bytes que aún puede registrar la petición en curso ([restantes]); None fuera de una petición
+_budget = contextvars.ContextVar('request_log_budget', default=None)
+
+
+def summarize_payload(data, sensitive_keys=LOG_SENSITIVE_KEYS, max_value_length=LOG_MAX_VALUE_LENGTH,
+                      max_items=LOG_MAX_ITEMS):
+    """
+    Copia de un payload apta para el log: oculta las claves sensibles a cualquier profundidad y
+    sustituye los valores largos (texto, bytes, base64...) por un resumen con su tamaño y hash.
+
+    Args:
+        data: Payload (dict, list, str, bytes o escalar)
+        sensitive_keys (list): Claves cuyo valor se oculta (sin distinguir mayúsculas)
+        max_value_length (int): Longitud máxima de un valor de texto
+        max_items (int): Elementos máximos de cada lista o diccionario
+
+    Returns:
+        Payload resumido (mismos tipos contenedores)
+    """
+    sensitive = {key.lower() for key in sensitive_keys}
+    return _summarize(data, sensitive, max_value_length, max_items)
+
+
+def format_payload(data, max_bytes=LOG_MAX_REQUEST_BYTES, **options):
+    """
+    Texto del payload resumido (JSON, o el propio texto si es una cadena) recortado a max_bytes
+
+    Args:
+        data: Payload
+        max_bytes (int): Bytes máximos del texto
+        **options: Opciones de summarize_payload
+
+    Returns:
+        str: Texto para el log
+    """
+    summary = summarize_payload(data, **options)
+    text = summary if isinstance(summary, str) else json.dumps(summary, ensure_ascii=False, default=str)
+    return _truncate_bytes(text, max_bytes)
+
+
+def start_request_log(max_bytes=LOG_MAX_REQUEST_BYTES):
+    """
+    Empieza el presupuesto de bytes registrados de la petición en curso
+
+    Returns:
+        Token para end_request_log
+    """
+    return _budget.set([max_bytes])
+
+
+def end_request_log(token):
+    _budget.reset(token)
+
+
+def log_payload(label, data, level=logging.INFO, **options):
+    """
+    Registra un payload resumido, descontándolo del presupuesto de la petición en curso.
+    Cuando el presupuesto se agota, solo se registra que se omitió.
+
+    Args:
+        label (str): Prefijo del registro
+        data: Payload
+        level (int): Nivel del registro (default: INFO)
+        **options: Opciones de summarize_payload
+    """
+    if not logging.getLogger().isEnabledFor(level):
+        # Ni se resume ni se serializa un payload que no se va a escribir
+        return
+    budget = _budget.get()
+    max_bytes = LOG_MAX_REQUEST_BYTES if budget is None else budget[0]
+    if max_bytes <= 0:
+        logging.log(level, f"{label} [omitted: request log limit of {LOG_MAX_REQUEST_BYTES} bytes reached]")
+        return
+    text = format_payload(data, max_bytes=max_bytes, **options)
+    if budget is not None:
+        budget[0] -= len(text.encode('utf-8'))
+    logging.log(level, f"{label} {text}")
+
+
+def _summarize(value, sensitive, max_value_length, max_items):
+    if isinstance(value, dict):
+        summary = {}
+        for i, (key, item) in enumerate(value.items()):
+            if i >= max_items:
+                summary['...'] = f"{len(value) - max_items} more keys"
+                break
+            if str(key).lower() in sensitive:
+                summary[key] = REDACTED
+            else:
+                summary[key] = _summarize(item, sensitive, max_value_length, max_items)
+        return summary
+    if isinstance(value, (list, tuple)):
+        summary = [_summarize(item, sensitive, max_value_length, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            summary.append(f"... {len(value) - max_items} more items")
+        return summary
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes sha256:{hashlib.sha256(value).hexdigest()[:12]}>"
+    if isinstance(value, str) and len(value) > max_value_length:
+        digest = hashlib.sha256(value.encode('utf-8', errors='replace')).hexdigest()[:12]
+        return f"{value[:_PREVIEW_LENGTH]}...<{len(value)} chars sha256:{digest}>"
+    return value
+
+
+def _truncate_bytes(text, max_bytes):
+    encoded = text.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text
+    suffix = f"...<truncated, {len(encoded)} bytes>"
+    return encoded[:max(max_bytes - len(suffix), 0)].decode('utf-8', errors='ignore') + suffix
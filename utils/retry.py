@@ -0,0 +1,243 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidArgumentException,
+    InvalidSelectorException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException
+)
+from urllib3.exceptions import MaxRetryError, ProtocolError
+from urllib3.exceptions import TimeoutError as ConnectionTimeoutError
+from utils.config import (
+    CIRCUIT_BREAKER,
+    CIRCUIT_BREAKER_COOLDOWN,
+    CIRCUIT_BREAKER_ERROR_RATE,
+    CIRCUIT_BREAKER_MIN_CALLS,
+    CIRCUIT_BREAKER_WINDOW,
+    RETRY_BASE_DELAY,
+    RETRY_JITTER,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY
+)
+from utils.error import CircuitOpenError
+
+# Tipos de error que cuentan para el circuit breaker (salud del sitio, no del elemento)
+SITE_ERRORS = ('timeout', 'network')
+# Errores de conexión con el navegador o el sitio (transitorios). Los WebDriverException solo
+# lo son si el navegador informa un error de red (net::ERR_*)
+_NETWORK_ERRORS = (ConnectionError, TimeoutError, ConnectionTimeoutError, ProtocolError, MaxRetryError)
+
+# {dominio: {'state': 'closed' | 'open' | 'half_open', 'events': deque[(timestamp, fallo)], 'opened_at',
+#            'probing': prueba semiabierta en curso, 'probe_started'}}
+_breakers = {}
+_lock = threading.Lock()
+
+
+def classify_error(error):
+    """
+    Clasifica una excepción para decidir si se reintenta y cómo.
+
+    Solo los timeouts y los errores de conexión/red se consideran transitorios; cualquier otro
+    error (NoSuchElement, JavascriptException, sesión inválida, alerta abierta...) es 'fatal'.
+
+    Args:
+        error (Exception | None): Excepción producida (None = la acción no se verificó)
+
+    Returns:
+        str: 'stale', 'intercepted', 'timeout', 'network', 'fatal' o 'unverified'
+    """
+    if error is None:
+        return 'unverified'
+    if isinstance(error, StaleElementReferenceException):
+        return 'stale'
+    if isinstance(error, (ElementClickInterceptedException, ElementNotInteractableException)):
+        return 'intercepted'
+    if isinstance(error, TimeoutException):
+        return 'timeout'
+    if isinstance(error, (InvalidSelectorException, InvalidArgumentException)):
+        return 'fatal'
+    if isinstance(error, _NETWORK_ERRORS):
+        return 'network'
+    if isinstance(error, WebDriverException) and 'net::ERR_' in (error.msg or str(error)):
+        return 'network'
+    return 'fatal'
+
+
+class RetryPolicy:
+    """
+    Política de reintentos con backoff exponencial, jitter y reintento según el tipo de error.
+
+    Args:
+        max_attempts (int): Número máximo de intentos (incluido el primero)
+        base_delay (float): Espera base en segundos tras el primer fallo
+        max_delay (float): Espera máxima en segundos
+        jitter (float): Fracción aleatoria que se resta a cada espera (0 = sin jitter, 1 = full jitter)
+        retry_on (tuple): Tipos de error (ver classify_error) que se reintentan
+        immediate (tuple): Tipos de error que se reintentan sin esperar
+    """
+
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+                 jitter=RETRY_JITTER, retry_on=('stale', 'intercepted', 'timeout', 'network', 'unverified'),
+                 immediate=('stale',)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = retry_on
+        self.immediate = immediate
+
+    def should_retry(self, error, attempt):
+        """Indica si se debe reintentar tras el fallo del intento `attempt` (empezando en 0)"""
+        return attempt + 1 < self.max_attempts and classify_error(error) in self.retry_on
+
+    def delay(self, attempt, error=None):
+        """Segundos de espera tras el fallo del intento `attempt` (empezando en 0)"""
+        if error is not None and classify_error(error) in self.immediate:
+            return 0
+        delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        return delay * (1 - self.jitter * random.random())
+
+    def call(self, func, *args, url=None, **kwargs):
+        """
+        Ejecuta func(*args, **kwargs) con reintentos. Si se indica url, se comprueba y
+        actualiza el circuit breaker del dominio.
+
+        Returns:
+            Valor devuelto por func
+
+        Raises:
+            CircuitOpenError: Si el circuito del dominio está abierto
+            Exception: El último error si no se reintenta o se agotan los intentos
+        """
+        for attempt in range(self.max_attempts):
+            if url:
+                check_circuit(url)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if url:
+                    record_result(url, False, classify_error(e))
+                if not self.should_retry(e, attempt):
+                    raise
+                delay = self.delay(attempt, e)
+                logging.info(f"🔄 Reintento {attempt + 2}/{self.max_attempts} en {delay:.2f}s ({classify_error(e)})")
+                time.sleep(delay)
+                continue
+            if url:
+                record_result(url, True)
+            return result
+
+
+def check_circuit(url, claim=True):
+    """
+    Falla rápido si el circuito del dominio está abierto. Pasado el enfriamiento
+    (CIRCUIT_BREAKER_COOLDOWN) el circuito queda semiabierto y deja pasar una sola prueba;
+    el resto de llamadas fallan hasta que la prueba registre su resultado (o pase otro
+    enfriamiento sin que lo haga).
+
+    Args:
+        url (str): URL de destino
+        claim (bool): Si False solo se consulta el estado, sin ocupar la prueba del circuito
+            semiabierto (para comprobar antes de una llamada que la ocupará con RetryPolicy.call)
+
+    Raises:
+        CircuitOpenError: Si el circuito está abierto
+    """
+    if not CIRCUIT_BREAKER:
+        return
+    domain = _domain(url)
+    with _lock:
+        breaker = _breakers.get(domain)
+        if breaker is None or breaker['state'] == 'closed':
+            return
+        now = time.time()
+        if breaker['state'] == 'open':
+            remaining = breaker['opened_at'] + CIRCUIT_BREAKER_COOLDOWN - now
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"Circuito abierto para {domain}: demasiados errores recientes (reintento en {remaining:.0f}s)")
+            if not claim:
+                return
+            breaker['state'] = 'half_open'
+            logging.info(f"Circuito semiabierto para {domain}, probando de nuevo")
+        elif breaker.get('probing') and now - breaker['probe_started'] < CIRCUIT_BREAKER_COOLDOWN:
+            raise CircuitOpenError(f"Circuito semiabierto para {domain}: esperando el resultado de la prueba")
+        if claim:
+            breaker['probing'] = True
+            breaker['probe_started'] = now
+
+
+def record_result(url, success, kind=None):
+    """
+    Registra el resultado de una operación contra un dominio.
+
+    Solo los errores de salud del sitio (SITE_ERRORS) cuentan como fallo; el resto
+    (elementos obsoletos, interceptados...) se ignoran y, si eran la prueba del circuito
+    semiabierto, solo la liberan para que otra llamada pueda probar.
+
+    Args:
+        url (str): URL de destino
+        success (bool): Si la operación tuvo éxito
+        kind (str, optional): Tipo de error de classify_error
+    """
+    if not CIRCUIT_BREAKER or not url:
+        return
+    domain = _domain(url)
+    now = time.time()
+    with _lock:
+        if not success and kind not in SITE_ERRORS:
+            if domain in _breakers:
+                _breakers[domain]['probing'] = False
+            return
+        breaker = _breakers.setdefault(domain, {'state': 'closed', 'events': deque(), 'opened_at': 0.0,
+                                                'probing': False, 'probe_started': 0.0})
+        breaker['probing'] = False
+        events = breaker['events']
+        events.append((now, not success))
+        while events and events[0][0] < now - CIRCUIT_BREAKER_WINDOW:
+            events.popleft()
+
+        if breaker['state'] == 'half_open':
+            # La prueba decide: éxito cierra el circuito, fallo lo vuelve a abrir
+            breaker['state'] = 'closed' if success else 'open'
+            if success:
+                events.clear()
+            else:
+                breaker['opened_at'] = now
+            return
+
+        failures = sum(1 for _, failed in events if failed)
+        if breaker['state'] == 'closed' and len(events) >= CIRCUIT_BREAKER_MIN_CALLS \
+                and failures / len(events) >= CIRCUIT_BREAKER_ERROR_RATE:
+            breaker['state'] = 'open'
+            breaker['opened_at'] = now
+            logging.warning(f"⚠️ Circuito abierto para {domain}: {failures}/{len(events)} errores recientes")
+
+
+def get_circuit_stats():
+    """
+    Devuelve el estado del circuit breaker de cada dominio
+
+    Returns:
+        dict: {dominio: {'state', 'calls', 'failures'}}
+    """
+    with _lock:
+        return {
+            domain: {
+                'state': breaker['state'],
+                'calls': len(breaker['events']),
+                'failures': sum(1 for _, failed in breaker['events'] if failed)
+            }
+            for domain, breaker in _breakers.items()
+        }
+
+
+def _domain(url):
+    return urlparse(url).netloc or url
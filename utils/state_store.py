@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from utils.config import STATE_LOCK_TIMEOUT
+
+
+def load_state(path):
+    """
+    Carga un fichero de estado JSON.
+
+    Args:
+        path (str): Ruta del fichero
+
+    Returns:
+        dict: Contenido del fichero, o un diccionario vacío si no existe o está corrupto
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.warning(f"No se pudo cargar el estado {path}: {e}")
+        return {}
+
+
+def save_state(path, data):
+    """
+    Guarda un fichero de estado JSON de forma atómica (fichero temporal + os.replace),
+    para que otros procesos nunca lean un fichero a medias.
+
+    Args:
+        path (str): Ruta del fichero
+        data (dict): Datos serializables a JSON
+
+    Returns:
+        bool: True si se guardó; False si falló (el error se registra como aviso)
+    """
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+        return True
+    except Exception as e:
+        logging.warning(f"No se pudo guardar el estado {path}: {e}")
+        return False
+
+
+@contextmanager
+def state_lock(path, timeout=STATE_LOCK_TIMEOUT):
+    """
+    Lock entre procesos (y hilos) para leer, modificar y guardar un fichero de estado sin perder
+    los cambios de otro worker. Es un fichero <path>.lock creado con O_EXCL; se espera a que se
+    libere, y uno más antiguo que `timeout` segundos se considera abandonado y se elimina.
+
+    Args:
+        path (str): Ruta del fichero de estado
+        timeout (float): Antigüedad máxima del lock de otro proceso
+    """
+    lock_path = path + '.lock'
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) >= timeout:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
@@ -0,0 +1,158 @@
+import atexit
+import threading
+import time
+from urllib.parse import urlparse
+from utils.config import STRATEGY_MEMORY, STRATEGY_MEMORY_FILE, STRATEGY_MEMORY_HALF_LIFE_DAYS
+from utils.state_store import load_state, save_state, state_lock
+
+# Segundos mínimos entre escrituras del fichero de estado
+SAVE_INTERVAL = 30
+
+# {"accion|dominio|locator": {"metodo": [exitos, fallos, timestamp]}}
+_memory = None
+# Resultados registrados en este proceso desde el último guardado ({clave: {metodo: [exitos, fallos]}}):
+# se suman a los del fichero, que otros workers también actualizan
+_pending = {}
+_last_save = 0.0
+_lock = threading.Lock()
+
+
+def strategy_key(action, url, locator=None):
+    """
+    Construye la clave de memoria para una acción, el dominio de la URL y el locator.
+
+    Args:
+        action (str): 'click' o 'write'
+        url (str): URL actual del driver
+        locator (tuple, optional): Locator (By, valor) del elemento. None = todo el dominio
+
+    Returns:
+        str: Clave de memoria
+    """
+    domain = urlparse(url or '').netloc or url or '*'
+    target = f"{locator[0]}={locator[1]}" if locator else '*'
+    return f"{action}|{domain}|{target}"
+
+
+def order_methods(key, methods):
+    """
+    Ordena los métodos de la escalera por probabilidad de éxito estimada (con decaimiento).
+
+    Los métodos sin historial conservan el orden por defecto.
+
+    Args:
+        key (str): Clave de strategy_key()
+        methods (list): Nombres de métodos en el orden por defecto
+
+    Returns:
+        list: Métodos ordenados, el más probable primero
+    """
+    if not STRATEGY_MEMORY:
+        return list(methods)
+
+    with _lock:
+        stats = _load().get(key, {})
+        scores = {name: _success_rate(stats.get(name)) for name in methods}
+    return sorted(methods, key=lambda name: -scores[name])
+
+
+def record_outcome(key, method, success):
+    """
+    Registra el resultado de un método de la escalera.
+
+    Args:
+        key (str): Clave de strategy_key()
+        method (str): Nombre del método
+        success (bool): True si el método funcionó
+    """
+    if not STRATEGY_MEMORY:
+        return
+
+    with _lock:
+        entry = _load().setdefault(key, {})
+        successes, failures = _decayed(entry.get(method))
+        if success:
+            successes += 1
+        else:
+            failures += 1
+        entry[method] = [round(successes, 4), round(failures, 4), time.time()]
+        delta = _pending.setdefault(key, {}).setdefault(method, [0, 0])
+        delta[0 if success else 1] += 1
+
+        if time.time() - _last_save >= SAVE_INTERVAL:
+            _save()
+
+
+def get_strategy_stats():
+    """
+    Devuelve las estadísticas de la memoria para ver qué sitios necesitan qué método.
+
+    Returns:
+        dict: {clave: {metodo: {'successes', 'failures', 'success_rate'}}}
+    """
+    with _lock:
+        result = {}
+        for key, entry in _load().items():
+            result[key] = {}
+            for method, values in entry.items():
+                successes, failures = _decayed(values)
+                result[key][method] = {
+                    'successes': round(successes, 2),
+                    'failures': round(failures, 2),
+                    'success_rate': round(_success_rate(values), 2)
+                }
+        return result
+
+
+def save_strategies():
+    """Persiste la memoria en STRATEGY_MEMORY_FILE (se llama también al salir del proceso)."""
+    with _lock:
+        if _memory is not None:
+            _save()
+
+
+def _decayed(values):
+    # Aplica el decaimiento exponencial (vida media STRATEGY_MEMORY_HALF_LIFE_DAYS) a los contadores
+    if not values:
+        return 0.0, 0.0
+    successes, failures, timestamp = values
+    age_days = max(time.time() - timestamp, 0) / 86400
+    factor = 0.5 ** (age_days / STRATEGY_MEMORY_HALF_LIFE_DAYS)
+    return successes * factor, failures * factor
+
+
+def _success_rate(values):
+    # Estimador de Laplace: sin historial todos los métodos valen 0.5
+    successes, failures = _decayed(values)
+    return (successes + 1) / (successes + failures + 2)
+
+
+def _load():
+    # Debe llamarse con _lock adquirido
+    global _memory
+    if _memory is None:
+        _memory = load_state(STRATEGY_MEMORY_FILE)
+    return _memory
+
+
+def _save():
+    # Debe llamarse con _lock adquirido. Se relee el fichero bajo un lock de fichero y se le suman los
+    # resultados nuevos de este proceso, para no pisar los de otros workers. Si no se puede guardar,
+    # los resultados siguen pendientes para el siguiente guardado
+    global _memory, _pending, _last_save
+    _last_save = time.time()
+    with state_lock(STRATEGY_MEMORY_FILE):
+        memory = load_state(STRATEGY_MEMORY_FILE)
+        for key, methods in _pending.items():
+            entry = memory.setdefault(key, {})
+            for method, (successes, failures) in methods.items():
+                stored_successes, stored_failures = _decayed(entry.get(method))
+                entry[method] = [round(stored_successes + successes, 4),
+                                 round(stored_failures + failures, 4), _last_save]
+        if not save_state(STRATEGY_MEMORY_FILE, memory):
+            return
+    _memory = memory
+    _pending = {}
+
+
+atexit.register(save_strategies)
@@ -0,0 +1,54 @@
+import math
+import random
+from utils.config import TYPING_MAX_DURATION
+
+# Parámetros del modelo (segundos). Las pausas entre teclas siguen una log-normal,
+# más rápidas dentro de una palabra (ráfagas) y más largas tras espacios y signos de puntuación.
+KEY_MEDIAN = 0.12
+KEY_SIGMA = 0.35
+BURST_FACTOR = 0.75
+WORD_PAUSE_MEDIAN = 0.25
+THINK_PAUSE_PROBABILITY = 0.03
+THINK_PAUSE_RANGE = (0.4, 1.2)
+MIN_DELAY = 0.02
+
+_WORD_BOUNDARIES = set(" \t\n.,;:!?-_/@")
+
+
+def build_keystroke_delays(text, max_duration=TYPING_MAX_DURATION, rng=None):
+    """
+    Genera las pausas previas a cada tecla para simular escritura humana.
+
+    La suma total nunca supera max_duration: si el modelo la excede, todas las pausas
+    se escalan proporcionalmente (se conserva el ritmo relativo).
+
+    Args:
+        text (str): Texto a escribir
+        max_duration (float): Duración máxima total en segundos
+        rng (random.Random, optional): Generador aleatorio (para resultados reproducibles)
+
+    Returns:
+        list: Una pausa (segundos) por carácter; la primera es 0
+    """
+    if not text:
+        return []
+    rng = rng or random
+
+    delays = [0.0]
+    for previous, char in zip(text, text[1:]):
+        delay = rng.lognormvariate(math.log(KEY_MEDIAN), KEY_SIGMA)
+        if previous in _WORD_BOUNDARIES:
+            # Pausa al empezar una palabra nueva
+            delay += rng.lognormvariate(math.log(WORD_PAUSE_MEDIAN), KEY_SIGMA)
+            if rng.random() < THINK_PAUSE_PROBABILITY:
+                delay += rng.uniform(*THINK_PAUSE_RANGE)
+        elif char not in _WORD_BOUNDARIES:
+            # Ráfaga dentro de la palabra
+            delay *= BURST_FACTOR
+        delays.append(max(delay, MIN_DELAY))
+
+    total = sum(delays)
+    if max_duration is not None and total > max_duration:
+        scale = max_duration / total
+        delays = [delay * scale for delay in delays]
+    return delays